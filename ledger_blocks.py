@@ -0,0 +1,308 @@
+"""
+Ledger Block Layer
+Indigenous Hardware Verification System
+
+Batches custody event digests into hash-linked blocks, each committing to
+its events through a Merkle root. An inclusion proof for one event is the
+list of sibling hashes on its path to the root, so an auditor holding a
+block's root can check a single event with O(log n) hashes.
+
+Sealed blocks are appended to a block log when the builder has a path, so
+headers (and the proofs issued against them) survive a restart; events are
+matched back to their persisted leaves by digest while the tracker replays
+the ledger.
+"""
+
+import datetime
+import hashlib
+import json
+import os
+import struct
+import zlib
+from array import array
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+# Block log record: payload length, CRC-32 of the payload and header length, then
+# the JSON header followed by the block's raw 32-byte leaf hashes
+BLOCK_RECORD = struct.Struct("<IIH")
+
+# Domain separation keeps a leaf from ever being read as an interior node
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+
+def merkle_leaf(event_digest: str) -> bytes:
+    """Leaf hash for a custody event's hex signature"""
+    return hashlib.sha256(LEAF_PREFIX + bytes.fromhex(event_digest)).digest()
+
+def merkle_parent(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(NODE_PREFIX + left + right).digest()
+
+def merkle_levels(leaves: List[bytes]) -> List[List[bytes]]:
+    """Build every tree level from the leaves up; an unpaired last node is promoted unchanged"""
+    levels = [list(leaves)]
+    while len(levels[-1]) > 1:
+        level = levels[-1]
+        parents = [merkle_parent(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            parents.append(level[-1])
+        levels.append(parents)
+    return levels
+
+def verify_inclusion_proof(proof: Dict, merkle_root: Optional[str] = None) -> bool:
+    """Recompute the Merkle root from a proof's event digest and sibling path
+
+    Pass the ``merkle_root`` of a block header obtained from a trusted source;
+    without it the proof is only checked against its own claimed root.
+    """
+    node = merkle_leaf(proof["event_digest"])
+    for sibling, side in proof["path"]:
+        sibling = bytes.fromhex(sibling)
+        node = merkle_parent(sibling, node) if side == "L" else merkle_parent(node, sibling)
+    return node.hex() == (merkle_root or proof["merkle_root"])
+
+@dataclass
+class LedgerBlock:
+    height: int
+    previous_hash: str
+    merkle_root: str
+    event_count: int
+    sealed_at: str
+    block_hash: str
+    levels: List[List[bytes]] = field(repr=False, default_factory=list)
+    # Concatenated leaf hashes of a block read back from the block log or a snapshot; its tree is rebuilt on first use
+    packed_leaves: bytes = field(repr=False, default=b"")
+
+    def tree(self) -> List[List[bytes]]:
+        if not self.levels:
+            leaves = self.packed_leaves
+            self.levels = merkle_levels([leaves[i:i + 32] for i in range(0, len(leaves), 32)])
+            self.packed_leaves = b""
+        return self.levels
+
+    def leaf_bytes(self) -> bytes:
+        return self.packed_leaves or b"".join(self.levels[0])
+
+    def header(self) -> Dict:
+        return {
+            "height": self.height,
+            "previous_hash": self.previous_hash,
+            "merkle_root": self.merkle_root,
+            "event_count": self.event_count,
+            "sealed_at": self.sealed_at,
+            "block_hash": self.block_hash
+        }
+
+class BlockBuilder:
+    """Collects custody event digests and seals them into Merkle blocks
+
+    Every event gets a location (block height, leaf index) recorded per
+    component, so a proof for ``(component_id, event_index)`` is found
+    without scanning blocks. Events still pending are sealed on demand when
+    a proof for one of them is requested.
+    """
+
+    GENESIS_HASH = "0" * 64
+
+    def __init__(self, block_size: int = 1024, path: Optional[str] = None, read_only: bool = False):
+        self.block_size = max(1, block_size)
+        self.path = path
+        self.read_only = read_only
+        self.blocks: List[LedgerBlock] = []
+        self._pending: List[bytes] = []
+        # component_id -> per-event location packed as height * block_size + leaf index
+        self._locations: Dict[str, array] = {}
+        # Leaf hash -> location of persisted events a replay has not matched yet
+        self._unclaimed: Optional[Dict[bytes, int]] = None
+        self._log = None
+        if path is not None:
+            self._load()
+            if not read_only:
+                self._log = open(path, "ab")
+
+    def _load(self):
+        """Read sealed blocks from the block log, dropping a torn or out-of-sequence tail"""
+        if not os.path.exists(self.path):
+            return
+        offset = 0
+        with open(self.path, "rb") as f:
+            while True:
+                prefix = f.read(BLOCK_RECORD.size)
+                if len(prefix) < BLOCK_RECORD.size:
+                    break
+                length, crc, header_length = BLOCK_RECORD.unpack(prefix)
+                payload = f.read(length)
+                if len(payload) < length or zlib.crc32(payload) != crc:
+                    break
+                header = json.loads(payload[:header_length])
+                previous_hash = self.blocks[-1].block_hash if self.blocks else self.GENESIS_HASH
+                if header["height"] != len(self.blocks) or header["previous_hash"] != previous_hash:
+                    break
+                if not self.blocks:
+                    # The log pins the block size its locations were packed with
+                    self.block_size = header.pop("block_size")
+                header.pop("block_size", None)
+                self.blocks.append(LedgerBlock(**header, packed_leaves=payload[header_length:]))
+                offset += BLOCK_RECORD.size + length
+        if not self.read_only and offset != os.path.getsize(self.path):
+            with open(self.path, "r+b") as f:
+                f.truncate(offset)
+
+    def _encode(self, block: LedgerBlock) -> bytes:
+        header = json.dumps(dict(block.header(), block_size=self.block_size), separators=(",", ":")).encode()
+        payload = header + block.leaf_bytes()
+        return BLOCK_RECORD.pack(len(payload), zlib.crc32(payload), len(header)) + payload
+
+    def _persist(self, block: LedgerBlock):
+        if self._log is None:
+            return
+        self._log.write(self._encode(block))
+        self._log.flush()
+        os.fsync(self._log.fileno())
+
+    def begin_replay(self, from_height: int = 0):
+        """Match events re-added from here on to their leaves in blocks ``from_height`` onwards
+
+        Replayed events that were sealed before a restart get back their
+        original block location instead of being queued again, so block
+        hashes and earlier inclusion proofs stay valid whatever order the
+        ledger is replayed in.
+        """
+        self._unclaimed = {}
+        for block in self.blocks[from_height:]:
+            base = block.height * self.block_size
+            leaves = block.leaf_bytes()
+            for index in range(block.event_count):
+                self._unclaimed[leaves[index * 32:index * 32 + 32]] = base + index
+
+    def end_replay(self):
+        """Stop matching events to persisted leaves; unmatched ones stay sealed but unreferenced"""
+        self._unclaimed = None
+
+    def reset_component(self, component_id: str):
+        """Forget event locations of a re-registered component (its old blocks stay sealed)"""
+        self._locations[component_id] = array("q")
+
+    def add_event(self, component_id: str, event_digest: str):
+        """Queue the next custody event of a component, sealing a block once it is full"""
+        locations = self._locations.get(component_id)
+        if locations is None:
+            locations = self._locations[component_id] = array("q")
+        leaf = merkle_leaf(event_digest)
+        if self._unclaimed:
+            location = self._unclaimed.pop(leaf, None)
+            if location is not None:
+                locations.append(location)
+                return
+        locations.append(len(self.blocks) * self.block_size + len(self._pending))
+        self._pending.append(leaf)
+        if len(self._pending) >= self.block_size:
+            self.seal()
+
+    def seal(self) -> Optional[LedgerBlock]:
+        """Seal the pending events into a new block (None if nothing is pending)"""
+        if not self._pending:
+            return None
+
+        levels = merkle_levels(self._pending)
+        height = len(self.blocks)
+        previous_hash = self.blocks[-1].block_hash if self.blocks else self.GENESIS_HASH
+        merkle_root = levels[-1][0].hex()
+        sealed_at = datetime.datetime.now().isoformat()
+        header_data = f"{height}|{previous_hash}|{merkle_root}|{len(self._pending)}|{sealed_at}"
+
+        block = LedgerBlock(
+            height=height,
+            previous_hash=previous_hash,
+            merkle_root=merkle_root,
+            event_count=len(self._pending),
+            sealed_at=sealed_at,
+            block_hash=hashlib.sha256(header_data.encode()).hexdigest(),
+            levels=levels
+        )
+        self._persist(block)
+        self.blocks.append(block)
+        self._pending = []
+        return block
+
+    def to_state(self) -> Dict:
+        """Plain-data form for tracker snapshots (pending events must be sealed first)
+
+        Blocks themselves are only included when there is no block log to
+        read them back from.
+        """
+        state = {
+            "block_size": self.block_size,
+            "block_count": len(self.blocks),
+            "locations": {component_id: loc.tobytes() for component_id, loc in self._locations.items()}
+        }
+        if self.path is None:
+            state["headers"] = [
+                (b.height, b.previous_hash, b.merkle_root, b.event_count, b.sealed_at, b.block_hash)
+                for b in self.blocks
+            ]
+            state["leaves"] = [b.leaf_bytes() for b in self.blocks]
+        return state
+
+    @classmethod
+    def from_state(cls, state: Dict, path: Optional[str] = None, read_only: bool = False) -> "BlockBuilder":
+        """Restore snapshot state, ready to replay events written after it (see ``begin_replay``)"""
+        builder = cls(state["block_size"], path, read_only)
+        if not builder.blocks:
+            for header, leaves in zip(state.get("headers", []), state.get("leaves", [])):
+                block = LedgerBlock(*header, packed_leaves=leaves)
+                builder._persist(block)
+                builder.blocks.append(block)
+        block_count = state.get("block_count", len(builder.blocks))
+        if len(builder.blocks) < block_count or builder.block_size != state["block_size"]:
+            builder.close()
+            raise ValueError(f"Block log {path} does not match the snapshot")
+        for component_id, packed in state["locations"].items():
+            locations = builder._locations[component_id] = array("q")
+            locations.frombytes(packed)
+        builder.begin_replay(block_count)
+        return builder
+
+    def export(self, path: str):
+        """Write every sealed block to a fresh block log at ``path`` (e.g. beside a mapped ledger export)"""
+        temp_path = path + ".tmp"
+        with open(temp_path, "wb") as f:
+            for block in self.blocks:
+                f.write(self._encode(block))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+
+    def close(self):
+        if self._log is not None and not self._log.closed:
+            self._log.close()
+
+    def get_inclusion_proof(self, component_id: str, event_index: int, event_digest: str) -> Optional[Dict]:
+        """Sibling path proving a component's event is in its block (None if unknown)"""
+        locations = self._locations.get(component_id)
+        if locations is None or not 0 <= event_index < len(locations):
+            return None
+
+        height, leaf_index = divmod(locations[event_index], self.block_size)
+        if height == len(self.blocks):
+            self.seal()
+        block = self.blocks[height]
+
+        path = []
+        index = leaf_index
+        for level in block.tree()[:-1]:
+            sibling = index ^ 1
+            if sibling < len(level):
+                path.append((level[sibling].hex(), "L" if sibling < index else "R"))
+            index //= 2
+
+        return {
+            "component_id": component_id,
+            "event_index": event_index,
+            "event_digest": event_digest,
+            "block_height": height,
+            "leaf_index": leaf_index,
+            "path": path,
+            "merkle_root": block.merkle_root,
+            "block_hash": block.block_hash
+        }
@@ -0,0 +1,77 @@
+"""
+Component ID Bloom Filter
+Indigenous Hardware Verification System
+
+In-memory Bloom filter over registered component ids, so scans of
+counterfeit or unregistered ids are rejected without probing the ledger
+storage. A miss is definite; a hit may be a false positive at roughly the
+configured rate and falls through to the real lookup.
+"""
+
+import hashlib
+import math
+from typing import Dict, Iterable
+
+class BloomFilter:
+    """Fixed-size Bloom filter sized for ``capacity`` ids at ``false_positive_rate``
+
+    Bit positions come from double hashing one BLAKE2b digest, so a filter
+    built in one process matches one built from the same ids in another.
+    Past ``capacity`` the false-positive rate climbs; ``saturated`` tells
+    the owner to rebuild a larger filter.
+    """
+
+    def __init__(self, capacity: int = 1024, false_positive_rate: float = 0.01):
+        if not 0 < false_positive_rate < 1:
+            raise ValueError(f"false_positive_rate must be between 0 and 1, got {false_positive_rate}")
+        self.capacity = max(1, capacity)
+        self.false_positive_rate = false_positive_rate
+        self.bit_count = max(64, math.ceil(-self.capacity * math.log(false_positive_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.bit_count / self.capacity * math.log(2)))
+        self._bits = bytearray((self.bit_count + 7) // 8)
+        self.count = 0
+
+    @classmethod
+    def from_keys(cls, keys: Iterable[str], capacity: int, false_positive_rate: float = 0.01) -> "BloomFilter":
+        bloom = cls(capacity, false_positive_rate)
+        for key in keys:
+            bloom.add(key)
+        return bloom
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        step = int.from_bytes(digest[8:], "little") | 1
+        bit_count = self.bit_count
+        return [(first + i * step) % bit_count for i in range(self.hash_count)]
+
+    def add(self, key: str):
+        bits = self._bits
+        for position in self._positions(key):
+            bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        bits = self._bits
+        for position in self._positions(key):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    @property
+    def saturated(self) -> bool:
+        return self.count > self.capacity
+
+    def estimated_false_positive_rate(self) -> float:
+        """Expected false-positive rate at the current fill"""
+        return (1 - math.exp(-self.hash_count * self.count / self.bit_count)) ** self.hash_count
+
+    def stats(self) -> Dict:
+        return {
+            "capacity": self.capacity,
+            "count": self.count,
+            "bits": self.bit_count,
+            "hashes": self.hash_count,
+            "target_false_positive_rate": self.false_positive_rate,
+            "estimated_false_positive_rate": round(self.estimated_false_positive_rate(), 6)
+        }
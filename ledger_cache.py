@@ -0,0 +1,75 @@
+"""
+Verification Result Cache
+Indigenous Hardware Verification System
+
+Bounded LRU (optionally TTL-limited) cache of verify_component_authenticity
+results, keyed by component id and custody chain length so a result can
+never outlive the chain it was computed for.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+class VerificationCache:
+    """LRU cache of verification result dicts with hit/miss metrics
+
+    ``max_entries=0`` disables caching; ``ttl_seconds=None`` keeps entries
+    until they are evicted or invalidated.
+    """
+
+    def __init__(self, max_entries: int = 4096, ttl_seconds: Optional[float] = None):
+        self.max_entries = max(0, max_entries)
+        self.ttl_seconds = ttl_seconds
+        # component_id -> (chain length, expiry deadline or None, result)
+        self._entries: "OrderedDict[str, Tuple[int, Optional[float], Dict]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, component_id: str, chain_length: int) -> Optional[Dict]:
+        cached = self._entries.get(component_id)
+        if cached is not None:
+            length, expires_at, result = cached
+            if length == chain_length and (expires_at is None or time.monotonic() < expires_at):
+                self._entries.move_to_end(component_id)
+                self.hits += 1
+                return result
+            del self._entries[component_id]
+        self.misses += 1
+        return None
+
+    def put(self, component_id: str, chain_length: int, result: Dict):
+        if not self.max_entries:
+            return
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds is not None else None
+        self._entries[component_id] = (chain_length, expires_at, result)
+        self._entries.move_to_end(component_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, component_id: str):
+        if self._entries.pop(component_id, None) is not None:
+            self.invalidations += 1
+
+    def clear(self):
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations
+        }
@@ -0,0 +1,370 @@
+"""
+Columnar Ledger Export
+Indigenous Hardware Verification System
+
+Streams components and custody events into column-oriented tables for
+analytics, ``chunk_rows`` rows at a time, so memory stays flat however long
+the history is. Two tables are written to the export directory:
+
+    components   one row per component (record fields, event count and the
+                 row of its first event in the events table)
+    events       one row per custody event, each chain contiguous
+
+With pyarrow installed the tables are Parquet files (one row group per
+chunk, dictionary-encoded strings). Otherwise they use the built-in
+``.lcol`` layout below, read back with ``read_columnar``.
+
+Layout (little-endian)::
+
+    header      magic, schema length, schema JSON ([name, type] pairs)
+    chunks      "CHNK", row count, then per column: encoding, validity flag,
+                payload length, a byte per row if the column has nulls, then
+                the payload holding the column's non-null values
+    footer      "FOOT", footer JSON (chunk offsets, row count), its length, magic
+
+Each chunk is self-contained: dictionary columns carry their own
+dictionary (low-cardinality text: stage, handler, location, ...), hex
+digests are stored as fixed-width raw bytes and epoch timestamps as int64.
+"""
+
+import json
+import os
+import struct
+import sys
+import time
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ledger_models import SupplyChainEntry
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # built-in .lcol tables only
+    pa = pq = None
+
+FORMATS = ("lcol", "parquet")
+DEFAULT_FORMAT = "parquet" if pq is not None else "lcol"
+
+COLUMNAR_MAGIC = b"LCOL0001"
+SCHEMA_HEADER = struct.Struct("<8sI")
+CHUNK_HEADER = struct.Struct("<4sI")
+COLUMN_HEADER = struct.Struct("<BBQ")
+FOOTER_TRAILER = struct.Struct("<Q8s")
+CHUNK_MARK = b"CHNK"
+FOOTER_MARK = b"FOOT"
+
+# Column chunk encodings
+ENC_STRING = 0   # int64 offsets (rows + 1) then UTF-8 bytes
+ENC_DICT = 1     # dictionary size, dictionary as ENC_STRING, then uint32 codes
+ENC_INT64 = 2
+ENC_BOOL = 3
+ENC_HEX = 4      # uint16 width then rows x width raw bytes (width 0: int64 offsets then bytes)
+
+# Logical column types: "string", "dict" (dictionary-encoded string), "int64", "bool",
+# "hex" (hex text stored as raw bytes when every value in the chunk is lowercase hex)
+COMPONENT_COLUMNS = (
+    ("component_id", "string"),
+    ("component_name", "dict"),
+    ("manufacturer", "dict"),
+    ("manufacturing_date", "dict"),
+    ("batch_id", "dict"),
+    ("verification_hash", "hex"),
+    ("digital_signature", "hex"),
+    ("indigenous_certification", "bool"),
+    ("security_clearance", "dict"),
+    ("custody_events", "int64"),
+    ("first_event_row", "int64")
+)
+EVENT_COLUMNS = (
+    ("component_id", "dict"),
+    ("event_index", "int64"),
+    ("stage", "dict"),
+    ("handler", "dict"),
+    ("timestamp_us", "int64"),
+    ("timestamp_text", "string"),
+    ("location", "dict"),
+    ("action", "dict"),
+    ("verified_by", "dict"),
+    ("signature", "hex"),
+    ("attestation", "hex"),
+    ("pq_signature", "hex")
+)
+
+_BIG_ENDIAN = sys.byteorder == "big"
+
+def _array_bytes(values: array) -> bytes:
+    if _BIG_ENDIAN:
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+def _array_from(typecode: str, data) -> array:
+    values = array(typecode)
+    values.frombytes(data)
+    if _BIG_ENDIAN:
+        values.byteswap()
+    return values
+
+def _encode_strings(values: List[str]) -> bytes:
+    encoded = [value.encode() for value in values]
+    offsets = array("q", [0])
+    position = 0
+    for item in encoded:
+        position += len(item)
+        offsets.append(position)
+    return _array_bytes(offsets) + b"".join(encoded)
+
+def _decode_strings(payload: memoryview, count: int) -> Tuple[List[str], int]:
+    """Decode ``count`` strings; returns them and the payload bytes consumed"""
+    offsets = _array_from("q", payload[:(count + 1) * 8])
+    start = (count + 1) * 8
+    data = bytes(payload[start:start + offsets[-1]])
+    return [data[offsets[i]:offsets[i + 1]].decode() for i in range(count)], start + offsets[-1]
+
+def _pack_hex(values: List[str]) -> Optional[Tuple[int, List[bytes]]]:
+    """(common width or 0, raw values) if every value is lowercase hex, else None"""
+    packed = []
+    for value in values:
+        try:
+            raw = bytes.fromhex(value)
+        except ValueError:
+            return None
+        if raw.hex() != value:
+            return None
+        packed.append(raw)
+    widths = {len(raw) for raw in packed}
+    return (widths.pop() if len(widths) == 1 else 0), packed
+
+def encode_column(kind: str, values: List) -> Tuple[int, Optional[bytes], bytes]:
+    """(encoding, validity bytes or None, payload of the non-null values) for one column chunk"""
+    validity = None
+    if None in values:
+        validity = bytes(value is not None for value in values)
+        values = [value for value in values if value is not None]
+
+    if kind == "int64":
+        return ENC_INT64, validity, _array_bytes(array("q", values))
+    if kind == "bool":
+        return ENC_BOOL, validity, bytes(bool(value) for value in values)
+    if kind == "dict":
+        codes_by_value: Dict[str, int] = {}
+        codes = array("I", [codes_by_value.setdefault(value, len(codes_by_value)) for value in values])
+        dictionary = list(codes_by_value)
+        return ENC_DICT, validity, (
+            struct.pack("<I", len(dictionary)) + _encode_strings(dictionary) + _array_bytes(codes)
+        )
+    if kind == "hex":
+        packed = _pack_hex(values)
+        if packed is not None:
+            width, raws = packed
+            if width:
+                return ENC_HEX, validity, struct.pack("<H", width) + b"".join(raws)
+            offsets = array("q", [0])
+            for raw in raws:
+                offsets.append(offsets[-1] + len(raw))
+            return ENC_HEX, validity, struct.pack("<H", 0) + _array_bytes(offsets) + b"".join(raws)
+    return ENC_STRING, validity, _encode_strings(values)
+
+def decode_column(encoding: int, payload: memoryview, rows: int, validity: Optional[bytes]) -> List:
+    if validity is not None:
+        present = iter(decode_column(encoding, payload, sum(validity), None))
+        return [next(present) if valid else None for valid in validity]
+    if encoding == ENC_INT64:
+        values = _array_from("q", payload).tolist()
+    elif encoding == ENC_BOOL:
+        values = [bool(value) for value in payload]
+    elif encoding == ENC_DICT:
+        size = struct.unpack_from("<I", payload)[0]
+        dictionary, used = _decode_strings(payload[4:], size)
+        codes = _array_from("I", payload[4 + used:])
+        values = [dictionary[code] for code in codes]
+    elif encoding == ENC_HEX:
+        width = struct.unpack_from("<H", payload)[0]
+        data = payload[2:]
+        if width:
+            values = [bytes(data[i * width:(i + 1) * width]).hex() for i in range(rows)]
+        else:
+            offsets = _array_from("q", data[:(rows + 1) * 8])
+            raw = data[(rows + 1) * 8:]
+            values = [bytes(raw[offsets[i]:offsets[i + 1]]).hex() for i in range(rows)]
+    elif encoding == ENC_STRING:
+        values, _ = _decode_strings(payload, rows)
+    else:
+        raise ValueError(f"Unknown column encoding {encoding}")
+    return values
+
+class ColumnarWriter:
+    """Append chunks of rows to one ``.lcol`` table"""
+
+    def __init__(self, path: str, columns: Tuple[Tuple[str, str], ...]):
+        self.path = path
+        self.columns = columns
+        self.rows = 0
+        self._chunks: List[Tuple[int, int]] = []
+        self._file = open(path, "wb")
+        schema = json.dumps([list(column) for column in columns]).encode()
+        self._file.write(SCHEMA_HEADER.pack(COLUMNAR_MAGIC, len(schema)) + schema)
+
+    def write_chunk(self, data: Dict[str, List]):
+        rows = len(data[self.columns[0][0]])
+        if not rows:
+            return
+        parts = [CHUNK_HEADER.pack(CHUNK_MARK, rows)]
+        for name, kind in self.columns:
+            encoding, validity, payload = encode_column(kind, data[name])
+            parts.append(COLUMN_HEADER.pack(encoding, validity is not None, len(payload)))
+            if validity is not None:
+                parts.append(validity)
+            parts.append(payload)
+        self._chunks.append((self._file.tell(), rows))
+        self._file.write(b"".join(parts))
+        self.rows += rows
+
+    def close(self):
+        footer = json.dumps({"rows": self.rows, "chunks": self._chunks}).encode()
+        self._file.write(FOOTER_MARK + footer + FOOTER_TRAILER.pack(len(footer), COLUMNAR_MAGIC))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+
+class _ParquetWriter:
+    """Same interface as ColumnarWriter, one Parquet row group per chunk"""
+
+    def __init__(self, path: str, columns: Tuple[Tuple[str, str], ...]):
+        types = {
+            "string": pa.string(), "dict": pa.dictionary(pa.int32(), pa.string()),
+            "int64": pa.int64(), "bool": pa.bool_(), "hex": pa.string()
+        }
+        self.path = path
+        self.columns = columns
+        self.rows = 0
+        self._schema = pa.schema([(name, types[kind]) for name, kind in columns])
+        self._writer = pq.ParquetWriter(path, self._schema, use_dictionary=True)
+
+    def write_chunk(self, data: Dict[str, List]):
+        rows = len(data[self.columns[0][0]])
+        if not rows:
+            return
+        self._writer.write_table(pa.Table.from_pydict(data, schema=self._schema))
+        self.rows += rows
+
+    def close(self):
+        self._writer.close()
+
+def read_columnar_schema(path: str) -> List[Tuple[str, str]]:
+    with open(path, "rb") as f:
+        magic, length = SCHEMA_HEADER.unpack(f.read(SCHEMA_HEADER.size))
+        if magic != COLUMNAR_MAGIC:
+            raise ValueError(f"{path} is not a columnar ledger table")
+        return [tuple(column) for column in json.loads(f.read(length))]
+
+def read_columnar(path: str, columns: Optional[Iterable[str]] = None) -> Iterator[Dict[str, List]]:
+    """Yield an ``.lcol`` table chunk by chunk as {column: values}, optionally only some columns"""
+    with open(path, "rb") as f:
+        magic, length = SCHEMA_HEADER.unpack(f.read(SCHEMA_HEADER.size))
+        if magic != COLUMNAR_MAGIC:
+            raise ValueError(f"{path} is not a columnar ledger table")
+        schema = json.loads(f.read(length))
+        wanted = set(columns) if columns is not None else {name for name, _ in schema}
+        unknown = wanted - {name for name, _ in schema}
+        if unknown:
+            raise ValueError(f"Unknown column(s): {', '.join(sorted(unknown))}")
+
+        while True:
+            header = f.read(CHUNK_HEADER.size)
+            if header[:4] != CHUNK_MARK:
+                return  # footer (or a truncated export)
+            _, rows = CHUNK_HEADER.unpack(header)
+            chunk = {}
+            for name, _ in schema:
+                encoding, has_validity, length = COLUMN_HEADER.unpack(f.read(COLUMN_HEADER.size))
+                if name not in wanted:
+                    f.seek(length + (rows if has_validity else 0), os.SEEK_CUR)
+                    continue
+                validity = f.read(rows) if has_validity else None
+                chunk[name] = decode_column(encoding, memoryview(f.read(length)), rows, validity)
+            yield chunk
+
+def _empty(columns) -> Dict[str, List]:
+    return {name: [] for name, _ in columns}
+
+def write_columnar_export(entries: Iterable[SupplyChainEntry], directory: str, chunk_rows: int = 65536,
+                          format: Optional[str] = None) -> Dict:
+    """Stream entries into ``components`` and ``events`` tables under ``directory``
+
+    Rows are buffered ``chunk_rows`` at a time per table, so memory is
+    bounded by one chunk whatever the ledger size. ``format`` is "lcol" or
+    "parquet" (needs pyarrow); the default is Parquet when available.
+    """
+    format = format or DEFAULT_FORMAT
+    if format not in FORMATS:
+        raise ValueError(f"Unknown export format: {format}")
+    if format == "parquet" and pq is None:
+        raise ValueError("Parquet export needs pyarrow; use format='lcol'")
+    chunk_rows = max(1, chunk_rows)
+    os.makedirs(directory, exist_ok=True)
+
+    writer_class = _ParquetWriter if format == "parquet" else ColumnarWriter
+    suffix = ".parquet" if format == "parquet" else ".lcol"
+    component_writer = writer_class(os.path.join(directory, "components" + suffix), COMPONENT_COLUMNS)
+    event_writer = writer_class(os.path.join(directory, "events" + suffix), EVENT_COLUMNS)
+    started = time.perf_counter()
+
+    components = _empty(COMPONENT_COLUMNS)
+    events = _empty(EVENT_COLUMNS)
+    # Bound methods, looked up once: the per-event loop is the hot path
+    (e_component, e_index, e_stage, e_handler, e_epoch, e_text, e_location, e_action,
+     e_verified_by, e_signature, e_attestation, e_pq) = (events[name].append for name, _ in EVENT_COLUMNS)
+    event_rows = 0
+    try:
+        for entry in entries:
+            chain = entry.custody_chain
+            for name in ("component_id", "component_name", "manufacturer", "manufacturing_date", "batch_id",
+                         "verification_hash", "digital_signature", "indigenous_certification",
+                         "security_clearance"):
+                components[name].append(getattr(entry, name))
+            components["custody_events"].append(len(chain))
+            components["first_event_row"].append(event_rows)
+            if len(components["component_id"]) >= chunk_rows:
+                component_writer.write_chunk(components)
+                components = _empty(COMPONENT_COLUMNS)
+
+            component_id = entry.component_id
+            for event_index, event in enumerate(chain):
+                e_component(component_id)
+                e_index(event_index)
+                e_stage(event['stage'])
+                e_handler(event['handler'])
+                e_epoch(event.epoch)
+                e_text(event.timestamp_text)
+                e_location(event['location'])
+                e_action(event['action'])
+                e_verified_by(event['verified_by'])
+                e_signature(event.get('signature'))
+                e_attestation(event.get('attestation'))
+                e_pq(event.get('pq_signature'))
+            event_rows += len(chain)
+            if len(events["component_id"]) >= chunk_rows:
+                event_writer.write_chunk(events)
+                events = _empty(EVENT_COLUMNS)
+                (e_component, e_index, e_stage, e_handler, e_epoch, e_text, e_location, e_action,
+                 e_verified_by, e_signature, e_attestation, e_pq) = (events[name].append for name, _ in EVENT_COLUMNS)
+
+        component_writer.write_chunk(components)
+        event_writer.write_chunk(events)
+    finally:
+        component_writer.close()
+        event_writer.close()
+
+    elapsed = time.perf_counter() - started
+    return {
+        "format": format,
+        "directory": directory,
+        "components": component_writer.rows,
+        "events": event_writer.rows,
+        "files": [component_writer.path, event_writer.path],
+        "bytes": sum(os.path.getsize(path) for path in (component_writer.path, event_writer.path)),
+        "elapsed_seconds": round(elapsed, 3),
+        "events_per_second": round(event_writer.rows / elapsed, 1) if elapsed > 0 else 0.0
+    }
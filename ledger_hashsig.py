@@ -0,0 +1,323 @@
+"""
+Hash-Based Signatures
+Indigenous Hardware Verification System
+
+Stateful, quantum-resistant signatures for custody events built only on
+SHA-256, following the LMS/HSS construction (RFC 8554): Winternitz one-time
+signatures (w = 4 bits, 67 chains) under Merkle trees, two levels deep.
+The top tree's one-time keys sign the roots of bottom subtrees, and the
+bottom subtrees' one-time keys sign messages, so a key of heights
+(top, subtree) signs 2 ** (top + subtree) messages.
+
+Generating a subtree costs about 1,000 hashes per leaf. HashSigner builds
+the top tree and each next subtree in a background process and caches
+them. A signature then needs only one Winternitz signing (about 500 hashes)
+plus cached authentication paths, so it costs about a millisecond.
+
+The scheme is stateful: a leaf must never sign twice. The next index is
+persisted ``RESERVE`` signatures ahead, so after a crash a few leaves may be
+skipped but none are reused.
+"""
+
+import hashlib
+import json
+import os
+import struct
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+N = 32            # SHA-256 output size
+W = 4             # Winternitz parameter in bits
+CHAIN_MAX = 2 ** W - 1
+DIGITS = 64       # 4-bit digits of a 32-byte digest
+CHECKSUM_DIGITS = 3
+CHAINS = DIGITS + CHECKSUM_DIGITS
+IDENTIFIER_SIZE = 16
+
+D_PBLC = b"\x80\x80"
+D_MESG = b"\x81\x81"
+D_LEAF = b"\x82\x82"
+D_INTR = b"\x83\x83"
+
+# Public key: top height, subtree height, top identifier, top root
+PUBLIC_KEY = struct.Struct(f"<BB{IDENTIFIER_SIZE}s{N}s")
+OTS_SIGNATURE_SIZE = N + CHAINS * N  # randomizer + chain values
+
+class KeyExhaustedError(RuntimeError):
+    """Every one-time leaf of a hash-based signing key has been used"""
+
+def _u32(value: int) -> bytes:
+    return value.to_bytes(4, "big")
+
+def _message_digits(identifier: bytes, leaf: int, randomizer: bytes, message: bytes) -> List[int]:
+    """Base-16 digits of the randomized message hash followed by its checksum"""
+    digest = hashlib.sha256(identifier + _u32(leaf) + D_MESG + randomizer + message).digest()
+    digits = []
+    for byte in digest:
+        digits.append(byte >> 4)
+        digits.append(byte & 15)
+    checksum = sum(CHAIN_MAX - digit for digit in digits) << 4
+    digits.extend(((checksum >> 12) & 15, (checksum >> 8) & 15, (checksum >> 4) & 15))
+    return digits
+
+def _chain(prefix: bytes, value: bytes, start: int, stop: int) -> bytes:
+    sha256 = hashlib.sha256
+    for step in range(start, stop):
+        value = sha256(prefix + bytes((step,)) + value).digest()
+    return value
+
+def _ots_secret(seed: bytes, identifier: bytes, leaf: int, chain: int) -> bytes:
+    return hashlib.sha256(identifier + _u32(leaf) + chain.to_bytes(2, "big") + b"\xff" + seed).digest()
+
+def _ots_public_key(seed: bytes, identifier: bytes, leaf: int) -> bytes:
+    head = identifier + _u32(leaf)
+    ends = [
+        _chain(head + chain.to_bytes(2, "big"), _ots_secret(seed, identifier, leaf, chain), 0, CHAIN_MAX)
+        for chain in range(CHAINS)
+    ]
+    return hashlib.sha256(head + D_PBLC + b"".join(ends)).digest()
+
+def _ots_sign(seed: bytes, identifier: bytes, leaf: int, message: bytes) -> bytes:
+    randomizer = hashlib.sha256(b"randomizer" + seed + _u32(leaf) + message).digest()
+    head = identifier + _u32(leaf)
+    values = [
+        _chain(head + chain.to_bytes(2, "big"), _ots_secret(seed, identifier, leaf, chain), 0, digit)
+        for chain, digit in enumerate(_message_digits(identifier, leaf, randomizer, message))
+    ]
+    return randomizer + b"".join(values)
+
+def _ots_recover_public_key(identifier: bytes, leaf: int, message: bytes, signature: bytes) -> bytes:
+    """Public key a one-time signature verifies under (compared against the tree by the caller)"""
+    randomizer = signature[:N]
+    head = identifier + _u32(leaf)
+    ends = []
+    for chain, digit in enumerate(_message_digits(identifier, leaf, randomizer, message)):
+        value = signature[N + chain * N:N + (chain + 1) * N]
+        ends.append(_chain(head + chain.to_bytes(2, "big"), value, digit, CHAIN_MAX))
+    return hashlib.sha256(head + D_PBLC + b"".join(ends)).digest()
+
+def _leaf_node(identifier: bytes, height: int, leaf: int, ots_public_key: bytes) -> bytes:
+    return hashlib.sha256(identifier + _u32(2 ** height + leaf) + D_LEAF + ots_public_key).digest()
+
+def _root_from_path(identifier: bytes, height: int, leaf: int, node: bytes, path: bytes) -> bytes:
+    number = 2 ** height + leaf
+    for level in range(height):
+        sibling = path[level * N:(level + 1) * N]
+        if number & 1:
+            node = hashlib.sha256(identifier + _u32(number // 2) + D_INTR + sibling + node).digest()
+        else:
+            node = hashlib.sha256(identifier + _u32(number // 2) + D_INTR + node + sibling).digest()
+        number //= 2
+    return node
+
+def build_tree(seed: bytes, identifier: bytes, height: int) -> List[List[bytes]]:
+    """Every level of a one-time-key Merkle tree, leaves first (runs in the background worker)"""
+    level = [
+        _leaf_node(identifier, height, leaf, _ots_public_key(seed, identifier, leaf))
+        for leaf in range(2 ** height)
+    ]
+    levels = [level]
+    number_base = 2 ** height
+    while len(level) > 1:
+        number_base //= 2
+        level = [
+            hashlib.sha256(identifier + _u32(number_base + i) + D_INTR + level[2 * i] + level[2 * i + 1]).digest()
+            for i in range(len(level) // 2)
+        ]
+        levels.append(level)
+    return levels
+
+def _auth_path(levels: List[List[bytes]], leaf: int) -> bytes:
+    path = []
+    for level in levels[:-1]:
+        path.append(level[leaf ^ 1])
+        leaf //= 2
+    return b"".join(path)
+
+def _subtree_identifier(top_identifier: bytes, subtree: int) -> bytes:
+    """Public identifier of a bottom subtree (the verifier derives it too)"""
+    return hashlib.sha256(b"identifier" + top_identifier + _u32(subtree)).digest()[:IDENTIFIER_SIZE]
+
+def _subtree_seed(seed: bytes, top_identifier: bytes, subtree: int) -> bytes:
+    return hashlib.sha256(b"subtree" + seed + top_identifier + _u32(subtree)).digest()
+
+def signature_size(top_height: int, subtree_height: int) -> int:
+    return 4 + 2 * OTS_SIGNATURE_SIZE + (top_height + subtree_height) * N
+
+def verify_hash_signature(public_key: bytes, message: bytes, signature: Optional[bytes]) -> bool:
+    """Check a HashSigner signature against its public key"""
+    if signature is None or len(public_key) != PUBLIC_KEY.size:
+        return False
+    top_height, subtree_height, top_identifier, top_root = PUBLIC_KEY.unpack(public_key)
+    if len(signature) != signature_size(top_height, subtree_height):
+        return False
+
+    index = int.from_bytes(signature[:4], "big")
+    subtree, leaf = divmod(index, 2 ** subtree_height)
+    if subtree >= 2 ** top_height:
+        return False
+
+    position = 4
+    bottom_ots = signature[position:position + OTS_SIGNATURE_SIZE]
+    position += OTS_SIGNATURE_SIZE
+    bottom_path = signature[position:position + subtree_height * N]
+    position += subtree_height * N
+    top_ots = signature[position:position + OTS_SIGNATURE_SIZE]
+    top_path = signature[position + OTS_SIGNATURE_SIZE:]
+
+    # Message -> bottom one-time key -> subtree root
+    identifier = _subtree_identifier(top_identifier, subtree)
+    ots_key = _ots_recover_public_key(identifier, leaf, message, bottom_ots)
+    subtree_root = _root_from_path(
+        identifier, subtree_height, leaf, _leaf_node(identifier, subtree_height, leaf, ots_key), bottom_path
+    )
+
+    # Subtree root (signed by the top tree) -> top one-time key -> top root
+    top_key = _ots_recover_public_key(top_identifier, subtree, identifier + subtree_root, top_ots)
+    root = _root_from_path(
+        top_identifier, top_height, subtree, _leaf_node(top_identifier, top_height, subtree, top_key), top_path
+    )
+    return root == top_root
+
+class HashSigner:
+    """Two-level LMS-style signer with background subtree generation
+
+    ``HashSigner.generate(path=...)`` creates a key (persisting its state
+    when a path is given); ``HashSigner.load(path)`` resumes one. The top
+    tree and upcoming subtrees are built in a worker process, so signing
+    only waits when it outruns the generator.
+    """
+
+    RESERVE = 64
+
+    def __init__(self, seed: bytes, top_identifier: bytes, top_height: int = 8, subtree_height: int = 8,
+                 next_index: int = 0, path: Optional[str] = None):
+        if not 1 <= top_height <= 20 or not 1 <= subtree_height <= 20:
+            raise ValueError("Tree heights must be between 1 and 20")
+        self.top_height = top_height
+        self.subtree_height = subtree_height
+        self.path = path
+        self._seed = seed
+        self._top_identifier = top_identifier
+        self._next_index = next_index
+        self._reserved_index = next_index
+
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._top: Optional[Future] = None
+        # subtree number -> future of (levels, top tree signature of its root)
+        self._subtrees: Dict[int, Future] = {}
+        self._start()
+
+    @classmethod
+    def generate(cls, top_height: int = 8, subtree_height: int = 8, path: Optional[str] = None) -> "HashSigner":
+        return cls(os.urandom(N), os.urandom(IDENTIFIER_SIZE), top_height, subtree_height, path=path)
+
+    @classmethod
+    def load(cls, path: str) -> "HashSigner":
+        with open(path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        return cls(
+            bytes.fromhex(state["seed"]), bytes.fromhex(state["top_identifier"]),
+            state["top_height"], state["subtree_height"], state["next_index"], path
+        )
+
+    @property
+    def capacity(self) -> int:
+        return 2 ** (self.top_height + self.subtree_height)
+
+    @property
+    def remaining(self) -> int:
+        return self.capacity - self._next_index
+
+    @property
+    def public_key(self) -> bytes:
+        """Top height, subtree height, identifier and top root (waits for the top tree)"""
+        top_root = self._top.result()[-1][0]
+        return PUBLIC_KEY.pack(self.top_height, self.subtree_height, self._top_identifier, top_root)
+
+    def _start(self):
+        self._executor = ProcessPoolExecutor(max_workers=1)
+        self._top = self._executor.submit(build_tree, self._seed, self._top_identifier, self.top_height)
+        self._prefetch(self._next_index >> self.subtree_height)
+        self._save()
+
+    def _prefetch(self, subtree: int):
+        if subtree < 2 ** self.top_height and subtree not in self._subtrees:
+            self._subtrees[subtree] = self._executor.submit(
+                build_tree, _subtree_seed(self._seed, self._top_identifier, subtree),
+                _subtree_identifier(self._top_identifier, subtree), self.subtree_height
+            )
+
+    def _subtree(self, subtree: int) -> Tuple[List[List[bytes]], bytes]:
+        """Cached subtree levels plus the top tree's signature over its root"""
+        with self._lock:
+            self._prefetch(subtree)
+            future = self._subtrees[subtree]
+            # Start on the next subtree while this one is in use; drop finished ones
+            self._prefetch(subtree + 1)
+            for old in [number for number in self._subtrees if number < subtree]:
+                del self._subtrees[old]
+        cached = future.result()
+        if isinstance(cached, tuple):
+            return cached
+
+        levels = cached
+        identifier = _subtree_identifier(self._top_identifier, subtree)
+        top_signature = (
+            _ots_sign(self._seed, self._top_identifier, subtree, identifier + levels[-1][0])
+            + _auth_path(self._top.result(), subtree)
+        )
+        result = (levels, top_signature)
+        with self._lock:
+            if subtree in self._subtrees:
+                done = Future()
+                done.set_result(result)
+                self._subtrees[subtree] = done
+        return result
+
+    def sign(self, message: bytes) -> bytes:
+        with self._lock:
+            index = self._next_index
+            if index >= self.capacity:
+                raise KeyExhaustedError("Hash-based signing key is exhausted")
+            self._next_index += 1
+            if self._next_index > self._reserved_index:
+                self._reserved_index = min(self.capacity, index + self.RESERVE)
+                self._save()
+
+        subtree, leaf = divmod(index, 2 ** self.subtree_height)
+        levels, top_signature = self._subtree(subtree)
+        identifier = _subtree_identifier(self._top_identifier, subtree)
+        return (
+            index.to_bytes(4, "big")
+            + _ots_sign(_subtree_seed(self._seed, self._top_identifier, subtree), identifier, leaf, message)
+            + _auth_path(levels, leaf)
+            + top_signature
+        )
+
+    def _save(self):
+        """Persist the reserved index before any leaf below it is handed out"""
+        if self.path is None:
+            return
+        state = {
+            "seed": self._seed.hex(),
+            "top_identifier": self._top_identifier.hex(),
+            "top_height": self.top_height,
+            "subtree_height": self.subtree_height,
+            "next_index": self._reserved_index
+        }
+        temp_path = self.path + ".tmp"
+        fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+
+    def close(self):
+        """Stop the background generator (pending subtrees are discarded)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
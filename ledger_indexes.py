@@ -0,0 +1,397 @@
+"""
+Ledger Secondary Indexes
+Indigenous Hardware Verification System
+
+In-memory indexes kept current by SupplyChainTracker so queries other than
+a component_id lookup never scan components_db.
+"""
+
+import datetime
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from heapq import merge
+from operator import itemgetter
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+from ledger_models import parse_timestamp
+
+class SecondaryIndex:
+    """Posting sets (field -> value -> component ids) over component attributes
+
+    The tracker indexes ``batch_id``, ``manufacturer``, ``security_clearance``
+    and the current custody ``stage`` (stage of the latest event, own or
+    inherited from a shipment). A query intersects the matching sets,
+    smallest first.
+    """
+
+    FIELDS = ("batch_id", "manufacturer", "security_clearance", "stage")
+
+    def __init__(self, fields: Iterable[str] = FIELDS):
+        self._postings: Dict[str, Dict[str, Set[str]]] = {name: {} for name in fields}
+
+    @property
+    def fields(self):
+        return tuple(self._postings)
+
+    def add(self, component_id: str, values: Dict[str, str]):
+        for name, value in values.items():
+            self._postings[name].setdefault(value, set()).add(component_id)
+
+    def remove(self, component_id: str, values: Dict[str, str]):
+        for name, value in values.items():
+            self._discard(name, value, component_id)
+
+    def assign(self, component_id: str, name: str, value: Optional[str]):
+        """Move a component to ``value`` of one field wherever it was before (None drops it)"""
+        for other in [other for other, posting in self._postings[name].items() if component_id in posting]:
+            if other != value:
+                self._discard(name, other, component_id)
+        if value is not None:
+            self._postings[name].setdefault(value, set()).add(component_id)
+
+    def find(self, **criteria) -> Set[str]:
+        """Component ids matching every ``field=value`` criterion (at least one required)"""
+        unknown = set(criteria) - set(self._postings)
+        if unknown:
+            raise ValueError(f"Unindexed field(s): {', '.join(sorted(unknown))}")
+        if not criteria:
+            raise ValueError("find() needs at least one criterion")
+
+        postings = sorted(
+            (self._postings[name].get(value, set()) for name, value in criteria.items()),
+            key=len
+        )
+        result = set(postings[0])
+        for posting in postings[1:]:
+            if not result:
+                break
+            result &= posting
+        return result
+
+    def to_state(self) -> Dict:
+        return self._postings
+
+    @classmethod
+    def from_state(cls, state: Dict) -> "SecondaryIndex":
+        index = cls(state)
+        index._postings = state
+        return index
+
+    def _discard(self, name: str, value: str, component_id: str):
+        posting = self._postings[name].get(value)
+        if posting is None:
+            return
+        posting.discard(component_id)
+        if not posting:
+            del self._postings[name][value]
+
+class _TimeSeries:
+    """Parallel int arrays of (epoch, component ordinal, event index) sorted by epoch
+
+    Rows arriving in time order are appended to the arrays. A row older than
+    the newest one (a genesis event carries the backdated manufacturing date)
+    is insorted into a small side buffer instead; queries merge the two, and
+    the buffer is folded into the arrays in one linear pass once it outgrows
+    a fraction of the series.
+    """
+
+    MIN_BUFFER = 256
+
+    def __init__(self):
+        self.times = array("q")
+        self.components = array("q")
+        self.events = array("q")
+        # (epoch, arrival sequence, ordinal, event index), kept sorted
+        self._late: List[Tuple[int, int, int, int]] = []
+        self._arrivals = 0
+
+    def __len__(self) -> int:
+        return len(self.times) + len(self._late)
+
+    def append(self, epoch: int, ordinal: int, event_index: int):
+        if not self.times or epoch >= self.times[-1]:
+            self.times.append(epoch)
+            self.components.append(ordinal)
+            self.events.append(event_index)
+            return
+        self._arrivals += 1
+        insort(self._late, (epoch, self._arrivals, ordinal, event_index))
+        if len(self._late) > max(self.MIN_BUFFER, len(self.times) >> 4):
+            self._fold()
+
+    def range(self, start: int, end: int) -> Iterator[Tuple[int, int, int]]:
+        """(epoch, ordinal, event index) rows with start <= epoch <= end, oldest first"""
+        lo = bisect_left(self.times, start)
+        hi = bisect_right(self.times, end)
+        rows = ((self.times[i], self.components[i], self.events[i]) for i in range(lo, hi))
+        if not self._late:
+            yield from rows
+            return
+        late = self._late
+        lo, hi = bisect_left(late, (start,)), bisect_left(late, (end + 1,))
+        # A late row arrived after every array row with the same epoch, so ties go to the arrays
+        yield from merge(rows, ((row[0], row[2], row[3]) for row in late[lo:hi]), key=itemgetter(0))
+
+    def to_state(self) -> Tuple[bytes, bytes, bytes]:
+        self._fold()
+        return self.times.tobytes(), self.components.tobytes(), self.events.tobytes()
+
+    @classmethod
+    def from_state(cls, state) -> "_TimeSeries":
+        series = cls()
+        times, components, events = state
+        series.times.frombytes(times)
+        series.components.frombytes(components)
+        series.events.frombytes(events)
+        return series
+
+    def _fold(self):
+        """Merge the side buffer into the arrays"""
+        if not self._late:
+            return
+        rows = merge(zip(self.times, self.components, self.events),
+                     ((row[0], row[2], row[3]) for row in self._late), key=itemgetter(0))
+        times, components, events = array("q"), array("q"), array("q")
+        for epoch, ordinal, event_index in rows:
+            times.append(epoch)
+            components.append(ordinal)
+            events.append(event_index)
+        self.times, self.components, self.events = times, components, events
+        self._late = []
+
+class EventTimeIndex:
+    """Global time-ordered index of custody events, with one sub-series per location
+
+    Keys are epoch microseconds held in int arrays, so a range query is two
+    binary searches plus a slice walk. Events normally arrive in time order;
+    an out-of-order one (such as a backdated genesis) goes to a small sorted
+    side buffer that queries merge in, so no query pays for a full re-sort.
+    Components are stored as ordinals; re-registering an id retires its old
+    ordinal so stale events drop out of results.
+    """
+
+    def __init__(self):
+        self._all = _TimeSeries()
+        self._by_location: Dict[str, _TimeSeries] = {}
+        self._ordinals: Dict[str, int] = {}
+        self._component_ids: List[Optional[str]] = []
+
+    def __len__(self) -> int:
+        return len(self._all)
+
+    def reset_component(self, component_id: str):
+        """Retire a re-registered component's earlier events"""
+        ordinal = self._ordinals.pop(component_id, None)
+        if ordinal is not None:
+            self._component_ids[ordinal] = None
+
+    def add(self, component_id: str, event_index: int, timestamp: Union[str, int], location: str) -> bool:
+        """Index one event (ISO string or epoch microseconds); False if the timestamp is unparseable"""
+        epoch = parse_timestamp(timestamp)
+        if epoch is None:
+            return False
+
+        ordinal = self._ordinals.get(component_id)
+        if ordinal is None:
+            ordinal = self._ordinals[component_id] = len(self._component_ids)
+            self._component_ids.append(component_id)
+
+        self._all.append(epoch, ordinal, event_index)
+        series = self._by_location.get(location)
+        if series is None:
+            series = self._by_location[location] = _TimeSeries()
+        series.append(epoch, ordinal, event_index)
+        return True
+
+    def range(self, start: Union[str, datetime.datetime], end: Union[str, datetime.datetime],
+              location: Optional[str] = None) -> Iterator[Tuple[str, int]]:
+        """(component_id, event_index) of events between start and end inclusive, oldest first"""
+        start_epoch, end_epoch = parse_timestamp(start), parse_timestamp(end)
+        if start_epoch is None or end_epoch is None:
+            raise ValueError(f"Invalid time range: {start!r} .. {end!r}")
+
+        series = self._all if location is None else self._by_location.get(location)
+        if series is None:
+            return
+        for _, ordinal, event_index in series.range(start_epoch, end_epoch):
+            component_id = self._component_ids[ordinal]
+            if component_id is not None:
+                yield component_id, event_index
+
+    def locations(self):
+        return self._by_location.keys()
+
+    def to_state(self) -> Dict:
+        return {
+            "all": self._all.to_state(),
+            "by_location": {location: series.to_state() for location, series in self._by_location.items()},
+            "component_ids": self._component_ids
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict) -> "EventTimeIndex":
+        index = cls()
+        index._all = _TimeSeries.from_state(state["all"])
+        index._by_location = {
+            location: _TimeSeries.from_state(series) for location, series in state["by_location"].items()
+        }
+        index._component_ids = list(state["component_ids"])
+        index._ordinals = {
+            component_id: ordinal for ordinal, component_id in enumerate(index._component_ids)
+            if component_id is not None
+        }
+        return index
+
+# Custody actions that attach a component to / detach it from a parent assembly
+INSTALLED_INTO = "INSTALLED_INTO:"
+REMOVED_FROM = "REMOVED_FROM:"
+
+class AssemblyGraph:
+    """Bill-of-materials graph: which assembly each component is installed in
+
+    Built from the INSTALLED_INTO/REMOVED_FROM custody events on each child,
+    so the signed chains stay the only record. A component sits in at most
+    one parent at a time; parent and children adjacency are both kept, so
+    walking up to the top-level unit or down an assembly touches only the
+    edges on that path.
+    """
+
+    def __init__(self):
+        self._parent: Dict[str, str] = {}
+        self._children: Dict[str, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._parent)
+
+    def apply(self, component_id: str, action: str) -> bool:
+        """Update the graph from one custody action; False if it is not an assembly action"""
+        if action.startswith(INSTALLED_INTO):
+            self.attach(component_id, action[len(INSTALLED_INTO):])
+        elif action.startswith(REMOVED_FROM):
+            self.detach(component_id)
+        else:
+            return False
+        return True
+
+    def attach(self, component_id: str, parent_id: str):
+        self.detach(component_id)
+        self._parent[component_id] = parent_id
+        self._children.setdefault(parent_id, set()).add(component_id)
+
+    def detach(self, component_id: str):
+        parent_id = self._parent.pop(component_id, None)
+        if parent_id is None:
+            return
+        siblings = self._children[parent_id]
+        siblings.discard(component_id)
+        if not siblings:
+            del self._children[parent_id]
+
+    def parent(self, component_id: str) -> Optional[str]:
+        return self._parent.get(component_id)
+
+    def children(self, component_id: str) -> Set[str]:
+        return self._children.get(component_id, set())
+
+    def ancestors(self, component_id: str) -> List[str]:
+        """Enclosing assemblies, innermost first"""
+        result = []
+        parent_id = self._parent.get(component_id)
+        while parent_id is not None and parent_id != component_id and parent_id not in result:
+            result.append(parent_id)
+            parent_id = self._parent.get(parent_id)
+        return result
+
+    def root(self, component_id: str) -> str:
+        """Top-level unit a component is (transitively) installed in, or itself"""
+        ancestors = self.ancestors(component_id)
+        return ancestors[-1] if ancestors else component_id
+
+    def descendants(self, component_id: str) -> Iterator[str]:
+        """Every part installed (transitively) in a component, breadth first"""
+        seen = {component_id}
+        frontier = [component_id]
+        while frontier:
+            next_frontier = []
+            for node in frontier:
+                for child in self._children.get(node, ()):
+                    if child not in seen:
+                        seen.add(child)
+                        next_frontier.append(child)
+                        yield child
+            frontier = next_frontier
+
+    def roots_containing(self, component_ids: Iterable[str]) -> Set[str]:
+        """Top-level units containing any of the components (a loose component is its own unit)
+
+        Each walk stops at the first node an earlier walk already passed, so
+        a whole batch costs at most one visit per distinct assembly node.
+        """
+        parents = self._parent
+        root_of: Dict[str, str] = {}
+        roots = set()
+        for component_id in component_ids:
+            path = []
+            node = component_id
+            while node not in root_of:
+                path.append(node)
+                parent_id = parents.get(node)
+                if parent_id is None or parent_id in path:
+                    root = node
+                    break
+                node = parent_id
+            else:
+                root = root_of[node]
+            for visited in path:
+                root_of[visited] = root
+            roots.add(root)
+        return roots
+
+    def staged(self) -> "StagedAssembly":
+        """An overlay for checking a run of actions before any of them is applied here"""
+        return StagedAssembly(self)
+
+    def to_state(self) -> Dict:
+        return self._parent
+
+    @classmethod
+    def from_state(cls, state: Dict) -> "AssemblyGraph":
+        graph = cls()
+        for component_id, parent_id in state.items():
+            graph.attach(component_id, parent_id)
+        return graph
+
+class StagedAssembly:
+    """Pending install/removal actions layered over an AssemblyGraph without changing it
+
+    Lets a batch check each action against the graph as the earlier actions
+    of the batch would leave it; the graph itself is only updated once the
+    events are stored.
+    """
+
+    def __init__(self, graph: AssemblyGraph):
+        self.graph = graph
+        # component_id -> parent after the staged actions (None once removed)
+        self._parent: Dict[str, Optional[str]] = {}
+
+    def apply(self, component_id: str, action: str) -> bool:
+        if action.startswith(INSTALLED_INTO):
+            self._parent[component_id] = action[len(INSTALLED_INTO):]
+        elif action.startswith(REMOVED_FROM):
+            self._parent[component_id] = None
+        else:
+            return False
+        return True
+
+    def parent(self, component_id: str) -> Optional[str]:
+        if component_id in self._parent:
+            return self._parent[component_id]
+        return self.graph.parent(component_id)
+
+    def ancestors(self, component_id: str) -> List[str]:
+        result = []
+        parent_id = self.parent(component_id)
+        while parent_id is not None and parent_id != component_id and parent_id not in result:
+            result.append(parent_id)
+            parent_id = self.parent(parent_id)
+        return result
@@ -0,0 +1,434 @@
+"""
+Memory-Mapped Ledger Files
+Indigenous Hardware Verification System
+
+Fixed-layout, read-only export of the component ledger for audit nodes.
+The file is opened with mmap and fields are read in place with
+struct.unpack_from, so nothing is parsed up front and every audit process
+on one machine shares the same page-cache copy of the ledger.
+
+Layout (little-endian)::
+
+    header      magic, counts and section offsets
+    components  one COMPONENT_RECORD per component, in export order
+    slots       open-addressed hash table of component numbers (CRC32 of the id)
+    events      one EVENT_RECORD per custody event, each chain contiguous
+    strings     offset table (string count + 1 entries) then UTF-8 bytes
+
+Every text field is a number into the deduplicated string table. As in
+CustodyEvent, a timestamp that round-trips through isoformat() is stored
+as epoch microseconds, a 64-digit hex signature as 32 raw bytes and an
+Ed25519 attestation as 64 raw bytes. Hash-based (pq_signature) event
+signatures are not exported; audit nodes check those against the primary
+ledger.
+"""
+
+import mmap
+import os
+import struct
+import zlib
+from collections.abc import Mapping, Sequence
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ledger_models import SupplyChainEntry, CustodyEvent, parse_timestamp
+
+MAPPED_MAGIC = b"LMAP0002"
+# magic, component count, event count, string count, hash slot count,
+# then the offsets of the slots, events and strings sections
+MAPPED_HEADER = struct.Struct("<8sQQQQQQQ")
+# id, name, manufacturer, manufacturing date, batch, verification hash,
+# digital signature, clearance (string numbers), indigenous flag, first event, event count
+COMPONENT_RECORD = struct.Struct("<8I?3xQI")
+# stage, handler, location, action, verified_by (string numbers), flags,
+# timestamp (epoch or string number), signature (raw digest or string number),
+# attestation (raw Ed25519 signature or string number)
+EVENT_RECORD = struct.Struct("<5IB3xq32s64s")
+STRING_OFFSET = struct.Struct("<Q")
+SLOT = struct.Struct("<I")
+
+EMPTY_SLOT = 0xFFFFFFFF
+EVENT_EPOCH = 1
+EVENT_SIGNED = 2
+EVENT_RAW_SIGNATURE = 4
+EVENT_ATTESTED = 8
+EVENT_RAW_ATTESTATION = 16
+
+_COMPONENT_FIELDS = (
+    "component_id", "component_name", "manufacturer", "manufacturing_date", "batch_id",
+    "verification_hash", "digital_signature", "security_clearance"
+)
+
+def _slot_count(components: int) -> int:
+    """Power of two at least twice the component count (keeps probe runs short)"""
+    slots = 8
+    while slots < components * 2:
+        slots *= 2
+    return slots
+
+def write_mapped_ledger(entries: Iterable[SupplyChainEntry], path: str) -> Dict:
+    """Export components and their custody chains to a fixed-layout ledger file
+
+    The file is written next to ``path`` and renamed into place, so readers
+    never see a partial export. Returns component/event/string counts.
+    """
+    strings: Dict[str, int] = {}
+
+    def intern(text: str) -> int:
+        number = strings.get(text)
+        if number is None:
+            number = strings[text] = len(strings)
+        return number
+
+    component_records = bytearray()
+    event_records = bytearray()
+    component_ids: List[bytes] = []
+    event_count = 0
+
+    for entry in entries:
+        chain = entry.custody_chain
+        component_records += COMPONENT_RECORD.pack(
+            *(intern(getattr(entry, name)) for name in _COMPONENT_FIELDS),
+            bool(entry.indigenous_certification), event_count, len(chain)
+        )
+        component_ids.append(entry.component_id.encode("utf-8"))
+        for event in chain:
+            event_records += _pack_event(event, intern)
+        event_count += len(chain)
+
+    # Open addressing with linear probing; CRC32 keeps the slots stable across processes
+    slot_count = _slot_count(len(component_ids))
+    slots = [EMPTY_SLOT] * slot_count
+    for number, encoded in enumerate(component_ids):
+        slot = zlib.crc32(encoded) & (slot_count - 1)
+        while slots[slot] != EMPTY_SLOT:
+            slot = (slot + 1) & (slot_count - 1)
+        slots[slot] = number
+
+    encoded_strings = [text.encode("utf-8") for text in strings]
+    slots_offset = MAPPED_HEADER.size + len(component_records)
+    events_offset = slots_offset + slot_count * SLOT.size
+    strings_offset = events_offset + len(event_records)
+
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(MAPPED_HEADER.pack(
+            MAPPED_MAGIC, len(component_ids), event_count, len(encoded_strings), slot_count,
+            slots_offset, events_offset, strings_offset
+        ))
+        f.write(component_records)
+        f.write(struct.pack(f"<{slot_count}I", *slots))
+        f.write(event_records)
+        position = 0
+        for encoded in encoded_strings:
+            f.write(STRING_OFFSET.pack(position))
+            position += len(encoded)
+        f.write(STRING_OFFSET.pack(position))
+        for encoded in encoded_strings:
+            f.write(encoded)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+    return {"components": len(component_ids), "events": event_count, "strings": len(encoded_strings)}
+
+def _pack_event(event: Dict, intern) -> bytes:
+    flags = 0
+    timestamp = event['timestamp']
+    epoch = parse_timestamp(timestamp)
+    if epoch is not None and CustodyEvent._render_timestamp(epoch) == timestamp:
+        flags |= EVENT_EPOCH
+        timestamp = epoch
+    else:
+        timestamp = intern(timestamp)
+
+    packed_signature = packed_attestation = b""
+    signature = event.get('signature')
+    if signature is not None:
+        flags |= EVENT_SIGNED
+        packed = CustodyEvent._pack_hex(signature, 32)
+        if isinstance(packed, bytes):
+            flags |= EVENT_RAW_SIGNATURE
+            packed_signature = packed
+        else:
+            packed_signature = SLOT.pack(intern(signature))
+    attestation = event.get('attestation')
+    if attestation is not None:
+        flags |= EVENT_ATTESTED
+        packed = CustodyEvent._pack_hex(attestation, 64)
+        if isinstance(packed, bytes):
+            flags |= EVENT_RAW_ATTESTATION
+            packed_attestation = packed
+        else:
+            packed_attestation = SLOT.pack(intern(attestation))
+
+    return EVENT_RECORD.pack(
+        intern(event['stage']), intern(event['handler']), intern(event['location']),
+        intern(event['action']), intern(event['verified_by']), flags, timestamp,
+        packed_signature, packed_attestation
+    )
+
+class MappedCustodyEvent(Mapping):
+    """Read-only custody event view over one EVENT_RECORD of a mapped ledger
+
+    Reads like CustodyEvent (``event['stage']``, ``event.epoch``); strings
+    are decoded from the mapping on access. Pickles as a CustodyEvent, so
+    views can be handed to process pools.
+    """
+
+    __slots__ = ("_ledger", "_fields")
+
+    KEYS = CustodyEvent.KEYS
+    _FIELD_NUMBERS = {"stage": 0, "handler": 1, "location": 2, "action": 3, "verified_by": 4}
+
+    def __init__(self, ledger: "MappedLedgerStorage", offset: int):
+        self._ledger = ledger
+        self._fields = EVENT_RECORD.unpack_from(ledger._view, offset)
+
+    @property
+    def timestamp(self) -> str:
+        fields = self._fields
+        if fields[5] & EVENT_EPOCH:
+            return CustodyEvent._render_timestamp(fields[6])
+        return self._ledger._string(fields[6])
+
+    @property
+    def epoch(self) -> Optional[int]:
+        fields = self._fields
+        return fields[6] if fields[5] & EVENT_EPOCH else parse_timestamp(self.timestamp)
+
+    @property
+    def timestamp_text(self) -> Optional[str]:
+        fields = self._fields
+        return None if fields[5] & EVENT_EPOCH else self._ledger._string(fields[6])
+
+    @property
+    def signature(self) -> Optional[str]:
+        flags, packed = self._fields[5], self._fields[7]
+        if not flags & EVENT_SIGNED:
+            return None
+        if flags & EVENT_RAW_SIGNATURE:
+            return packed.hex()
+        return self._ledger._string(SLOT.unpack_from(packed)[0])
+
+    @property
+    def attestation(self) -> Optional[str]:
+        flags, packed = self._fields[5], self._fields[8]
+        if not flags & EVENT_ATTESTED:
+            return None
+        if flags & EVENT_RAW_ATTESTATION:
+            return packed.hex()
+        return self._ledger._string(SLOT.unpack_from(packed)[0])
+
+    def __getitem__(self, key: str):
+        number = self._FIELD_NUMBERS.get(key)
+        if number is not None:
+            return self._ledger._string(self._fields[number])
+        if key == "timestamp":
+            return self.timestamp
+        if key == "signature" and self._fields[5] & EVENT_SIGNED:
+            return self.signature
+        if key == "attestation" and self._fields[5] & EVENT_ATTESTED:
+            return self.attestation
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        flags = self._fields[5]
+        keys = CustodyEvent.BASE_KEYS
+        if flags & EVENT_SIGNED:
+            keys += ("signature",)
+        if flags & EVENT_ATTESTED:
+            keys += ("attestation",)
+        return iter(keys)
+
+    def __len__(self) -> int:
+        flags = self._fields[5]
+        return len(CustodyEvent.BASE_KEYS) + bool(flags & EVENT_SIGNED) + bool(flags & EVENT_ATTESTED)
+
+    def __repr__(self) -> str:
+        return f"MappedCustodyEvent({dict(self)!r})"
+
+    def __reduce__(self):
+        return CustodyEvent.from_dict, (dict(self),)
+
+    def to_dict(self) -> Dict:
+        return dict(self)
+
+class MappedCustodyChain(Sequence):
+    """Lazy sequence of a component's custody events (contiguous EVENT_RECORDs)"""
+
+    __slots__ = ("_ledger", "_first", "_count")
+
+    def __init__(self, ledger: "MappedLedgerStorage", first: int, count: int):
+        self._ledger = ledger
+        self._first = first
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("custody chain index out of range")
+        return MappedCustodyEvent(
+            self._ledger, self._ledger._events_offset + (self._first + index) * EVENT_RECORD.size
+        )
+
+class MappedComponent:
+    """Read-only SupplyChainEntry view over one COMPONENT_RECORD of a mapped ledger"""
+
+    __slots__ = ("_ledger", "_fields")
+
+    def __init__(self, ledger: "MappedLedgerStorage", number: int):
+        self._ledger = ledger
+        self._fields = COMPONENT_RECORD.unpack_from(ledger._view, MAPPED_HEADER.size + number * COMPONENT_RECORD.size)
+
+    def _text(self, number: int) -> str:
+        return self._ledger._string(self._fields[number])
+
+    component_id = property(lambda self: self._text(0))
+    component_name = property(lambda self: self._text(1))
+    manufacturer = property(lambda self: self._text(2))
+    manufacturing_date = property(lambda self: self._text(3))
+    batch_id = property(lambda self: self._text(4))
+    verification_hash = property(lambda self: self._text(5))
+    digital_signature = property(lambda self: self._text(6))
+    security_clearance = property(lambda self: self._text(7))
+    indigenous_certification = property(lambda self: self._fields[8])
+
+    @property
+    def custody_chain(self) -> MappedCustodyChain:
+        return MappedCustodyChain(self._ledger, self._fields[9], self._fields[10])
+
+    def to_entry(self) -> SupplyChainEntry:
+        """Copy the view out into a regular SupplyChainEntry"""
+        return SupplyChainEntry(
+            custody_chain=[CustodyEvent.from_dict(event) for event in self.custody_chain],
+            indigenous_certification=self.indigenous_certification,
+            **{name: getattr(self, name) for name in _COMPONENT_FIELDS}
+        )
+
+    def __repr__(self) -> str:
+        return f"MappedComponent({self.component_id!r})"
+
+class MappedLedgerStorage:
+    """Read-only components_db backend over a file from ``write_mapped_ledger``
+
+    Opening only maps the file and checks its header and size; lookups hash
+    the id into the slot table and every field is read from the mapping on
+    access. Writes raise ValueError, as does opening a truncated file.
+    """
+
+    read_only = True
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"Empty mapped ledger file: {path}")
+        self._view = memoryview(self._map)
+        if len(self._view) < MAPPED_HEADER.size:
+            self.close()
+            raise ValueError(f"Truncated mapped ledger file: {path}")
+
+        (magic, self._component_count, self._event_count, self._string_count, self._slot_count,
+         self._slots_offset, self._events_offset, self._strings_offset) = MAPPED_HEADER.unpack_from(self._view, 0)
+        if magic != MAPPED_MAGIC:
+            self.close()
+            raise ValueError(f"Not a mapped ledger file: {path}")
+        self._string_data = self._strings_offset + (self._string_count + 1) * STRING_OFFSET.size
+        # The string bytes end the file, so a short (or overlong) file fails here rather than mid-read
+        if (self._string_data > len(self._view) or self._string_data + STRING_OFFSET.unpack_from(
+                self._view, self._string_data - STRING_OFFSET.size)[0] != len(self._view)):
+            self.close()
+            raise ValueError(f"Truncated mapped ledger file: {path}")
+
+    # ------------------------------------------------------------------
+    # Field access
+    # ------------------------------------------------------------------
+
+    def _string(self, number: int) -> str:
+        start, end = struct.unpack_from("<QQ", self._view, self._strings_offset + number * STRING_OFFSET.size)
+        return str(self._view[self._string_data + start:self._string_data + end], "utf-8")
+
+    def _component_number(self, component_id: str) -> Optional[int]:
+        encoded = component_id.encode("utf-8")
+        mask = self._slot_count - 1
+        slot = zlib.crc32(encoded) & mask
+        while True:
+            number = SLOT.unpack_from(self._view, self._slots_offset + slot * SLOT.size)[0]
+            if number == EMPTY_SLOT:
+                return None
+            id_number = COMPONENT_RECORD.unpack_from(
+                self._view, MAPPED_HEADER.size + number * COMPONENT_RECORD.size
+            )[0]
+            start, end = struct.unpack_from("<QQ", self._view, self._strings_offset + id_number * STRING_OFFSET.size)
+            if self._view[self._string_data + start:self._string_data + end] == encoded:
+                return number
+            slot = (slot + 1) & mask
+
+    # ------------------------------------------------------------------
+    # Mapping interface
+    # ------------------------------------------------------------------
+
+    def __contains__(self, component_id) -> bool:
+        return self._component_number(component_id) is not None
+
+    def __getitem__(self, component_id: str) -> MappedComponent:
+        number = self._component_number(component_id)
+        if number is None:
+            raise KeyError(component_id)
+        return MappedComponent(self, number)
+
+    def __len__(self) -> int:
+        return self._component_count
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def get(self, component_id: str, default=None) -> Optional[MappedComponent]:
+        number = self._component_number(component_id)
+        return default if number is None else MappedComponent(self, number)
+
+    def keys(self) -> List[str]:
+        return [component.component_id for component in self.values()]
+
+    def values(self) -> Iterator[MappedComponent]:
+        for number in range(self._component_count):
+            yield MappedComponent(self, number)
+
+    def items(self) -> Iterator[Tuple[str, MappedComponent]]:
+        for component in self.values():
+            yield component.component_id, component
+
+    def event_count(self) -> int:
+        return self._event_count
+
+    # ------------------------------------------------------------------
+    # Writes (rejected) and lifecycle
+    # ------------------------------------------------------------------
+
+    def _reject_write(self, *args):
+        raise ValueError(f"Mapped ledger {self.path} is read-only")
+
+    __setitem__ = put_component = put_components = append_event = append_events = _reject_write
+
+    def wait_durable(self, token: Optional[int]):
+        """Nothing is ever written; returns immediately"""
+
+    def flush(self):
+        """Nothing to flush for a read-only ledger"""
+
+    def close(self):
+        """Unmap the ledger file (component and event views must no longer be used)"""
+        if self._file.closed:
+            return
+        self._view.release()
+        self._map.close()
+        self._file.close()
@@ -0,0 +1,209 @@
+"""
+Supply Chain Ledger Models
+Indigenous Hardware Verification System
+"""
+
+import datetime
+import hashlib
+import sys
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import List, Dict, Iterator, Optional, Union
+
+@dataclass
+class SupplyChainEntry:
+    component_id: str
+    component_name: str
+    manufacturer: str
+    manufacturing_date: str
+    batch_id: str
+    verification_hash: str
+    digital_signature: str
+    custody_chain: List[Dict]
+    indigenous_certification: bool
+    security_clearance: str
+
+_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+_NAIVE_EPOCH = datetime.datetime(1970, 1, 1)
+
+def parse_timestamp(value: Union[str, int, datetime.datetime, None]) -> Optional[int]:
+    """ISO-8601 timestamp -> epoch microseconds (naive times are taken as UTC), None if unparseable"""
+    if value is None or isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        try:
+            value = datetime.datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=datetime.timezone.utc)
+    delta = value - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+class CustodyEvent(Mapping):
+    """Compact, read-only custody event
+
+    Behaves like the event dicts it replaces (``event['stage']``,
+    ``event.get('signature')``, ``dict(event)``) but is slotted: the
+    repetitive text fields are interned and shared between events, a
+    timestamp that round-trips through ``datetime.isoformat()`` is held as
+    epoch microseconds, a SHA-256 signature as 32 raw bytes, an Ed25519
+    attestation as 64 raw bytes and a hash-based signature as raw bytes.
+    Anything else is kept verbatim, so rendering an event always gives back
+    exactly what was signed.
+    """
+
+    __slots__ = ("stage", "handler", "location", "action", "verified_by", "_timestamp", "_signature",
+                 "_attestation", "_pq_signature")
+
+    BASE_KEYS = ("stage", "handler", "timestamp", "location", "action", "verified_by")
+    # Optional keys, present only when set
+    SIGNATURE_KEYS = ("signature", "attestation", "pq_signature")
+    KEYS = BASE_KEYS + SIGNATURE_KEYS
+    _TEXT_FIELDS = frozenset(("stage", "handler", "location", "action", "verified_by"))
+
+    def __init__(self, stage: str, handler: str, timestamp: str, location: str, action: str,
+                 verified_by: str, signature: Optional[str] = None, attestation: Optional[str] = None,
+                 pq_signature: Optional[str] = None):
+        self.stage = sys.intern(stage)
+        self.handler = sys.intern(handler)
+        self.location = sys.intern(location)
+        self.action = sys.intern(action)
+        self.verified_by = sys.intern(verified_by)
+        self._timestamp = self._pack_timestamp(timestamp)
+        self._signature = self._pack_hex(signature, 32)
+        self._attestation = self._pack_hex(attestation, 64)
+        self._pq_signature = self._pack_hex(pq_signature)
+
+    @classmethod
+    def from_dict(cls, event: Dict) -> "CustodyEvent":
+        return cls(
+            event['stage'], event['handler'], event['timestamp'], event['location'],
+            event['action'], event['verified_by'], event.get('signature'), event.get('attestation'),
+            event.get('pq_signature')
+        )
+
+    @staticmethod
+    def _pack_timestamp(timestamp: str) -> Union[int, str]:
+        epoch = parse_timestamp(timestamp)
+        if epoch is not None and CustodyEvent._render_timestamp(epoch) == timestamp:
+            return epoch
+        return timestamp
+
+    @staticmethod
+    def _render_timestamp(epoch: int) -> str:
+        return (_NAIVE_EPOCH + datetime.timedelta(microseconds=epoch)).isoformat()
+
+    @staticmethod
+    def _pack_hex(value: Optional[str], size: Optional[int] = None) -> Union[bytes, str, None]:
+        """Raw bytes for a lowercase hex string (of ``size`` bytes if given), anything else verbatim"""
+        if value is not None and len(value) == 2 * (size or len(value) // 2):
+            try:
+                packed = bytes.fromhex(value)
+            except ValueError:
+                return value
+            if packed.hex() == value:
+                return packed
+        return value
+
+    @property
+    def timestamp(self) -> str:
+        value = self._timestamp
+        return self._render_timestamp(value) if isinstance(value, int) else value
+
+    @property
+    def epoch(self) -> Optional[int]:
+        """Event time in epoch microseconds (None if the timestamp is not ISO-8601)"""
+        value = self._timestamp
+        return value if isinstance(value, int) else parse_timestamp(value)
+
+    @property
+    def timestamp_text(self) -> Optional[str]:
+        """The timestamp string when it is kept verbatim, None when it renders from ``epoch``"""
+        value = self._timestamp
+        return None if isinstance(value, int) else value
+
+    @property
+    def signature(self) -> Optional[str]:
+        value = self._signature
+        return value.hex() if isinstance(value, bytes) else value
+
+    @property
+    def attestation(self) -> Optional[str]:
+        """Ed25519 signature over the event digest (None for unattested events)"""
+        value = self._attestation
+        return value.hex() if isinstance(value, bytes) else value
+
+    @property
+    def pq_signature(self) -> Optional[str]:
+        """Hash-based (post-quantum) signature over the event digest, if any"""
+        value = self._pq_signature
+        return value.hex() if isinstance(value, bytes) else value
+
+    def _present_signatures(self):
+        return tuple(key for key in self.SIGNATURE_KEYS if getattr(self, "_" + key) is not None)
+
+    def __getitem__(self, key: str):
+        if key in self._TEXT_FIELDS:
+            return getattr(self, key)
+        if key == "timestamp":
+            return self.timestamp
+        if key in self.SIGNATURE_KEYS and getattr(self, "_" + key) is not None:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.BASE_KEYS + self._present_signatures())
+
+    def __len__(self) -> int:
+        return len(self.BASE_KEYS) + len(self._present_signatures())
+
+    def __repr__(self) -> str:
+        return f"CustodyEvent({dict(self)!r})"
+
+    def to_dict(self) -> Dict:
+        return dict(self)
+
+def length_prefixed(*fields: str) -> bytes:
+    """Unambiguous preimage: each field as a 4-byte big-endian byte length then its UTF-8 bytes
+
+    Fields are free text, so joining them with a separator would let text
+    move across a field boundary without changing the hashed or signed bytes.
+    """
+    parts = []
+    for field in fields:
+        data = field.encode("utf-8")
+        parts.append(len(data).to_bytes(4, "big"))
+        parts.append(data)
+    return b"".join(parts)
+
+def compute_event_digest(previous_digest: str, component_id: str, event: Dict) -> str:
+    """SHA-256 digest of a custody event, chained to the previous event's digest
+
+    The first event of a chain links to the component's verification_hash.
+    """
+    return hashlib.sha256(length_prefixed(
+        "custody-event", previous_digest, component_id, event['stage'], event['handler'], event['timestamp'],
+        event['location'], event['action'], event['verified_by']
+    )).hexdigest()
+
+def component_signing_message(component) -> bytes:
+    """Bytes a manufacturer signs for a component record (every field but the chain and signature)"""
+    return length_prefixed(
+        "component", component.component_id, component.component_name, component.manufacturer,
+        component.manufacturing_date, component.batch_id, component.verification_hash,
+        "1" if component.indigenous_certification else "0", component.security_clearance
+    )
+
+def event_signing_message(event_digest: str) -> bytes:
+    """Bytes signed to attest a custody event (its chained digest)"""
+    return length_prefixed("custody", event_digest)
+
+def verify_chain_segment(previous_digest: str, component_id: str, events: List[Dict]) -> bool:
+    """Check that each event's signature is the digest chained from its predecessor"""
+    for event in events:
+        signature = event.get('signature')
+        if signature is None or compute_event_digest(previous_digest, component_id, event) != signature:
+            return False
+        previous_digest = signature
+    return True
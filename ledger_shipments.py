@@ -0,0 +1,179 @@
+"""
+Shipment Custody Records
+Indigenous Hardware Verification System
+
+A shipment (pallet, container) is a fixed manifest of component ids with its
+own hash-chained, attested custody chain. A bulk move is appended once to
+the shipment instead of once per member; SupplyChainTracker resolves the
+shipment's events into each member's history when it is tracked or
+verified. The manifest is signed with the shipment record, so membership
+cannot be edited after the fact.
+"""
+
+import hashlib
+import os
+import threading
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional
+
+from ledger_models import CustodyEvent, length_prefixed
+from ledger_storage import RECORD_EVENT, encode_record, read_record
+
+RECORD_SHIPMENT = 3
+# A re-registered component leaves the shipments its earlier record was packed into
+RECORD_RELEASE = 4
+
+# Custody actions that open and close a shipment; members inherit every event in between
+SHIPMENT_PACKED = "SHIPMENT_PACKED"
+SHIPMENT_UNPACKED = "SHIPMENT_UNPACKED"
+
+@dataclass
+class Shipment:
+    shipment_id: str
+    handler: str
+    created_at: str
+    members: List[str]
+    manifest_hash: str
+    digital_signature: str
+    custody_chain: List[Dict]
+
+    @property
+    def closed(self) -> bool:
+        return bool(self.custody_chain) and self.custody_chain[-1]['action'] == SHIPMENT_UNPACKED
+
+def compute_manifest_hash(shipment_id: str, handler: str, created_at: str, members: List[str]) -> str:
+    """SHA-256 over the shipment header and its member ids in manifest order"""
+    return hashlib.sha256(length_prefixed("shipment-manifest", shipment_id, handler, created_at, *members)).hexdigest()
+
+def shipment_signing_message(shipment: Shipment) -> bytes:
+    """Bytes signed for the shipment record (the manifest hash covers the handler and members)"""
+    return length_prefixed("shipment", shipment.shipment_id, shipment.manifest_hash)
+
+class ShipmentStore:
+    """Shipments by id plus a component -> shipment ids membership index
+
+    A component re-registered under the same id is released from the
+    shipments its old record was packed into, so the new record inherits
+    none of their events; the release is logged like any other write.
+
+    With a ``path`` every write is appended to a CRC-framed record log (the
+    ledger log's framing) and fsynced; shipment writes are one per pallet
+    move, so the whole log is replayed on open. ``read_only`` stores (for
+    mapped audit ledgers) reject writes and leave a torn tail alone.
+    """
+
+    def __init__(self, path: Optional[str] = None, read_only: bool = False):
+        self.path = path
+        self.read_only = read_only
+        self._shipments: Dict[str, Shipment] = {}
+        self._memberships: Dict[str, List[str]] = {}
+        # component_id -> shipment ids it was released from, kept for export
+        self._released: Dict[str, List[str]] = {}
+        self._lock = threading.Lock()
+        self._log = None
+        if path is not None:
+            self._replay()
+            if not read_only:
+                self._log = open(path, "ab")
+
+    def _replay(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            offset = 0
+            while True:
+                record = read_record(f)
+                if record is None:
+                    break
+                kind, payload, size = record
+                if kind == RECORD_SHIPMENT:
+                    self._index(Shipment(custody_chain=[], **payload))
+                elif kind == RECORD_EVENT:
+                    self._shipments[payload["s"]].custody_chain.append(CustodyEvent.from_dict(payload["e"]))
+                elif kind == RECORD_RELEASE:
+                    self._drop(payload["c"], payload["s"])
+                offset += size
+        if not self.read_only and offset != os.path.getsize(self.path):
+            with open(self.path, "r+b") as f:
+                f.truncate(offset)
+
+    def _index(self, shipment: Shipment):
+        self._shipments[shipment.shipment_id] = shipment
+        for component_id in shipment.members:
+            self._memberships.setdefault(component_id, []).append(shipment.shipment_id)
+
+    def _drop(self, component_id: str, shipment_ids: List[str]):
+        remaining = [sid for sid in self._memberships.get(component_id, []) if sid not in shipment_ids]
+        if remaining:
+            self._memberships[component_id] = remaining
+        else:
+            self._memberships.pop(component_id, None)
+        self._released.setdefault(component_id, []).extend(shipment_ids)
+
+    def __contains__(self, shipment_id) -> bool:
+        return shipment_id in self._shipments
+
+    def __len__(self) -> int:
+        return len(self._shipments)
+
+    def get(self, shipment_id: str, default=None) -> Optional[Shipment]:
+        return self._shipments.get(shipment_id, default)
+
+    def values(self) -> Iterator[Shipment]:
+        return iter(self._shipments.values())
+
+    def shipments_of(self, component_id: str) -> List[str]:
+        """Ids of the shipments a component was packed into, oldest first"""
+        return self._memberships.get(component_id, [])
+
+    def put_shipment(self, shipment: Shipment):
+        """Store a new shipment (with its opening custody events)"""
+        fields = {name: value for name, value in vars(shipment).items() if name != "custody_chain"}
+        records = [encode_record(RECORD_SHIPMENT, fields)]
+        records.extend(
+            encode_record(RECORD_EVENT, {"s": shipment.shipment_id, "e": dict(event)})
+            for event in shipment.custody_chain
+        )
+        self._write(records)
+        self._index(shipment)
+
+    def release_component(self, component_id: str) -> List[str]:
+        """Stop a re-registered component inheriting its old record's shipments; returns their ids"""
+        shipment_ids = list(self._memberships.get(component_id, []))
+        if shipment_ids:
+            self._write([encode_record(RECORD_RELEASE, {"c": component_id, "s": shipment_ids})])
+            self._drop(component_id, shipment_ids)
+        return shipment_ids
+
+    def append_event(self, shipment_id: str, event: Dict):
+        self._write([encode_record(RECORD_EVENT, {"s": shipment_id, "e": dict(event)})])
+        self._shipments[shipment_id].custody_chain.append(event)
+
+    def _write(self, records: List[bytes]):
+        if self.read_only:
+            raise ValueError(f"Shipment log {self.path} is read-only")
+        if self._log is None:
+            return
+        with self._lock:
+            self._log.write(b"".join(records))
+            self._log.flush()
+            os.fsync(self._log.fileno())
+
+    def export(self, path: str):
+        """Write every shipment to a fresh log at ``path`` (e.g. beside a mapped ledger export)"""
+        temp_path = path + ".tmp"
+        with open(temp_path, "wb") as f:
+            for shipment in self._shipments.values():
+                fields = {name: value for name, value in vars(shipment).items() if name != "custody_chain"}
+                f.write(encode_record(RECORD_SHIPMENT, fields))
+                for event in shipment.custody_chain:
+                    f.write(encode_record(RECORD_EVENT, {"s": shipment.shipment_id, "e": dict(event)}))
+            for component_id, shipment_ids in self._released.items():
+                f.write(encode_record(RECORD_RELEASE, {"c": component_id, "s": shipment_ids}))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+
+    def close(self):
+        if self._log is not None and not self._log.closed:
+            self._log.close()
@@ -0,0 +1,349 @@
+"""
+Ed25519 Signing
+Indigenous Hardware Verification System
+
+Per-manufacturer Ed25519 keys for signing component records and custody
+events. The ``cryptography`` package is used when it is installed;
+otherwise a pure-Python RFC 8032 implementation signs and verifies.
+
+``ed25519_verify_batch`` checks many signatures at once. In pure Python it
+uses the random-linear-combination batch equation: one multi-scalar
+multiplication for the whole batch, with the terms of signatures under the
+same public key (one manufacturer) folded together. That is several times
+faster than verifying one by one. A failing batch is bisected to find the
+bad signatures.
+"""
+
+import hashlib
+import json
+import os
+import secrets
+import threading
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    from cryptography.exceptions import InvalidSignature
+    from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey, Ed25519PublicKey
+    from cryptography.hazmat.primitives.serialization import Encoding, PublicFormat
+except ImportError:  # optional dependency: fall back to pure Python
+    Ed25519PrivateKey = None
+
+BACKEND = "cryptography" if Ed25519PrivateKey is not None else "python"
+
+SIGNATURE_SIZE = 64
+KEY_SIZE = 32
+
+# ----------------------------------------------------------------------
+# Pure-Python Ed25519 (RFC 8032), extended twisted Edwards coordinates
+# ----------------------------------------------------------------------
+
+_P = 2 ** 255 - 19
+_L = 2 ** 252 + 27742317777372353535851937790883648493
+_D = -121665 * pow(121666, _P - 2, _P) % _P
+_D2 = 2 * _D % _P
+_SQRT_M1 = pow(2, (_P - 1) // 4, _P)
+_IDENTITY = (0, 1, 1, 0)
+
+def _point_add(p, q):
+    x1, y1, z1, t1 = p
+    x2, y2, z2, t2 = q
+    a = (y1 - x1) * (y2 - x2) % _P
+    b = (y1 + x1) * (y2 + x2) % _P
+    c = t1 * _D2 * t2 % _P
+    d = 2 * z1 * z2 % _P
+    e, f, g, h = b - a, d - c, d + c, b + a
+    return (e * f % _P, g * h % _P, f * g % _P, e * h % _P)
+
+def _point_double(p):
+    x1, y1, z1, _ = p
+    a = x1 * x1 % _P
+    b = y1 * y1 % _P
+    c = 2 * z1 * z1 % _P
+    h = a + b
+    e = h - (x1 + y1) * (x1 + y1)
+    g = a - b
+    f = c + g
+    return (e * f % _P, g * h % _P, f * g % _P, e * h % _P)
+
+def _point_negate(p):
+    x, y, z, t = p
+    return (-x % _P, y, z, -t % _P)
+
+def _is_identity(p) -> bool:
+    x, y, z, _ = p
+    return x % _P == 0 and (y - z) % _P == 0
+
+def _point_compress(p) -> bytes:
+    x, y, z, _ = p
+    z_inv = pow(z, _P - 2, _P)
+    x, y = x * z_inv % _P, y * z_inv % _P
+    return (y | ((x & 1) << 255)).to_bytes(32, "little")
+
+def _point_decompress(data: bytes):
+    if len(data) != 32:
+        return None
+    y = int.from_bytes(data, "little")
+    sign = y >> 255
+    y &= (1 << 255) - 1
+    if y >= _P:
+        return None
+    x2 = (y * y - 1) * pow(_D * y * y + 1, _P - 2, _P) % _P
+    if x2 == 0:
+        if sign:
+            return None
+        return (0, y, 1, 0)
+    x = pow(x2, (_P + 3) // 8, _P)
+    if (x * x - x2) % _P:
+        x = x * _SQRT_M1 % _P
+        if (x * x - x2) % _P:
+            return None
+    if (x & 1) != sign:
+        x = _P - x
+    return (x, y, 1, x * y % _P)
+
+_BASE_Y = 4 * pow(5, _P - 2, _P) % _P
+_BASE = _point_decompress(_BASE_Y.to_bytes(32, "little"))
+
+# Fixed-base table: _BASE_TABLE[i][j] = (j + 1) * 16**i * B, built on first use
+_BASE_TABLE: List[List[Tuple[int, int, int, int]]] = []
+
+def _base_table():
+    if not _BASE_TABLE:
+        table = []
+        point = _BASE
+        for _ in range(64):
+            row = [point]
+            for _ in range(14):
+                row.append(_point_add(row[-1], point))
+            table.append(row)
+            point = _point_double(_point_double(_point_double(_point_double(point))))
+        _BASE_TABLE.extend(table)
+    return _BASE_TABLE
+
+def _base_multiply(scalar: int):
+    """scalar * B with 4-bit windows over the fixed-base table (additions only)"""
+    table = _base_table()
+    result = _IDENTITY
+    for i in range(64):
+        digit = (scalar >> (4 * i)) & 15
+        if digit:
+            result = _point_add(result, table[i][digit - 1])
+    return result
+
+def _multi_scalar_multiply(terms) -> Tuple[int, int, int, int]:
+    """Sum of scalar * point over (scalar, point) terms (Straus, shared doublings, 4-bit windows)"""
+    tables = []
+    top = 0
+    for scalar, point in terms:
+        if not scalar:
+            continue
+        row = [point]
+        for _ in range(14):
+            row.append(_point_add(row[-1], point))
+        tables.append((scalar, row))
+        top = max(top, (scalar.bit_length() + 3) // 4)
+
+    result = _IDENTITY
+    for window in range(top - 1, -1, -1):
+        if window != top - 1:
+            result = _point_double(_point_double(_point_double(_point_double(result))))
+        shift = 4 * window
+        for scalar, row in tables:
+            digit = (scalar >> shift) & 15
+            if digit:
+                result = _point_add(result, row[digit - 1])
+    return result
+
+@lru_cache(maxsize=256)
+def _expand_seed(seed: bytes) -> Tuple[int, bytes, bytes]:
+    """(secret scalar, nonce prefix, public key) for a seed, cached per signer"""
+    digest = hashlib.sha512(seed).digest()
+    scalar = int.from_bytes(digest[:32], "little")
+    scalar &= (1 << 254) - 8
+    scalar |= 1 << 254
+    return scalar, digest[32:], _point_compress(_base_multiply(scalar))
+
+def _challenge(encoded_r: bytes, public_key: bytes, message: bytes) -> int:
+    return int.from_bytes(hashlib.sha512(encoded_r + public_key + message).digest(), "little") % _L
+
+def _python_public_key(seed: bytes) -> bytes:
+    return _expand_seed(seed)[2]
+
+def _python_sign(seed: bytes, message: bytes) -> bytes:
+    scalar, prefix, public_key = _expand_seed(seed)
+    nonce = int.from_bytes(hashlib.sha512(prefix + message).digest(), "little") % _L
+    encoded_r = _point_compress(_base_multiply(nonce))
+    s = (nonce + _challenge(encoded_r, public_key, message) * scalar) % _L
+    return encoded_r + s.to_bytes(32, "little")
+
+def _python_verify_batch(items: Sequence[Tuple[bytes, bytes, bytes]]) -> bool:
+    """Cofactored batch equation: [8]([sum z*s]B - sum [z]R - sum [z*k]A) == identity"""
+    base_scalar = 0
+    key_scalars: Dict[bytes, int] = {}
+    terms = []
+    for public_key, message, signature in items:
+        if len(signature) != SIGNATURE_SIZE:
+            return False
+        encoded_r, s = signature[:32], int.from_bytes(signature[32:], "little")
+        if s >= _L:
+            return False
+        r = _point_decompress(encoded_r)
+        if r is None:
+            return False
+        # A single signature needs no randomizer
+        z = secrets.randbits(128) | 1 if len(items) > 1 else 1
+        base_scalar += z * s
+        key_scalars[public_key] = key_scalars.get(public_key, 0) + z * _challenge(encoded_r, public_key, message)
+        terms.append((z, _point_negate(r)))
+
+    for public_key, scalar in key_scalars.items():
+        a = _point_decompress(public_key)
+        if a is None:
+            return False
+        terms.append((scalar % _L, _point_negate(a)))
+
+    total = _point_add(_base_multiply(base_scalar % _L), _multi_scalar_multiply(terms))
+    return _is_identity(_point_double(_point_double(_point_double(total))))
+
+# ----------------------------------------------------------------------
+# Backend-independent API
+# ----------------------------------------------------------------------
+
+def ed25519_public_key(seed: bytes) -> bytes:
+    """32-byte public key for a 32-byte private seed"""
+    if Ed25519PrivateKey is not None:
+        return Ed25519PrivateKey.from_private_bytes(seed).public_key().public_bytes(Encoding.Raw, PublicFormat.Raw)
+    return _python_public_key(seed)
+
+def ed25519_sign(seed: bytes, message: bytes) -> bytes:
+    if Ed25519PrivateKey is not None:
+        return Ed25519PrivateKey.from_private_bytes(seed).sign(message)
+    return _python_sign(seed, message)
+
+def ed25519_verify(public_key: bytes, message: bytes, signature: bytes) -> bool:
+    return ed25519_verify_batch([(public_key, message, signature)])[0]
+
+def ed25519_verify_batch(items: Sequence[Tuple[bytes, bytes, bytes]]) -> List[bool]:
+    """Verify (public_key, message, signature) triples, returning one flag per item"""
+    if Ed25519PrivateKey is not None:
+        results = []
+        for public_key, message, signature in items:
+            try:
+                Ed25519PublicKey.from_public_bytes(public_key).verify(signature, message)
+            except (InvalidSignature, ValueError):
+                results.append(False)
+            else:
+                results.append(True)
+        return results
+
+    results = [False] * len(items)
+    pending = [(0, len(items))]
+    while pending:
+        start, end = pending.pop()
+        if start == end:
+            continue
+        if _python_verify_batch(items[start:end]):
+            results[start:end] = [True] * (end - start)
+        elif end - start > 1:
+            middle = (start + end) // 2
+            pending.append((start, middle))
+            pending.append((middle, end))
+    return results
+
+class ManufacturerKeyring:
+    """Ed25519 keys per signer (manufacturer), optionally persisted as JSON
+
+    A keyring holding only public keys verifies but cannot sign; audit
+    nodes load the public half written by ``save(path, public_only=True)``.
+    Only signers given a key with ``generate`` or ``provision`` can sign;
+    with a ``path``, new keys (private seeds included) are saved immediately.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._seeds: Dict[str, bytes] = {}
+        self._public_keys: Dict[str, bytes] = {}
+        # Concurrent first registrations must not each generate a key for the same signer
+        self._generate_lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str) -> "ManufacturerKeyring":
+        """Load a keyring file, or start an empty one that will be saved there"""
+        keyring = cls(path)
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            for signer, keys in data.items():
+                keyring._public_keys[signer] = bytes.fromhex(keys["public_key"])
+                if "seed" in keys:
+                    keyring._seeds[signer] = bytes.fromhex(keys["seed"])
+        return keyring
+
+    def save(self, path: Optional[str] = None, public_only: bool = False):
+        path = path or self.path
+        if path is None:
+            raise ValueError("No path to save the keyring to")
+        data = {}
+        for signer, public_key in self._public_keys.items():
+            keys = {"public_key": public_key.hex()}
+            if not public_only and signer in self._seeds:
+                keys["seed"] = self._seeds[signer].hex()
+            data[signer] = keys
+        temp_path = path + ".tmp"
+        # Private seeds are readable by the owner only
+        fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        os.replace(temp_path, path)
+
+    def generate(self, signer: str) -> bytes:
+        """Create (and persist, with a path) a new key for ``signer``; returns its public key"""
+        seed = os.urandom(KEY_SIZE)
+        self._seeds[signer] = seed
+        self._public_keys[signer] = ed25519_public_key(seed)
+        if self.path is not None:
+            self.save()
+        return self._public_keys[signer]
+
+    def public_key(self, signer: str) -> Optional[bytes]:
+        return self._public_keys.get(signer)
+
+    def public_keys(self) -> Dict[str, bytes]:
+        return dict(self._public_keys)
+
+    def can_sign(self, signer: str) -> bool:
+        return signer in self._seeds
+
+    def provision(self, signer: str) -> bytes:
+        """Public key of a trusted ``signer``, generating its key if it has none yet"""
+        with self._generate_lock:
+            public_key = self._public_keys.get(signer)
+            return public_key if public_key is not None else self.generate(signer)
+
+    def sign(self, signer: str, message: bytes) -> bytes:
+        """Sign with ``signer``'s key; raises ValueError if this keyring holds no private key for it"""
+        seed = self._seeds.get(signer)
+        if seed is None:
+            if signer in self._public_keys:
+                raise ValueError(f"Keyring holds only the public key of {signer}")
+            raise ValueError(f"No signing key for {signer}")
+        return ed25519_sign(seed, message)
+
+    def verify_batch(self, items: Sequence[Tuple[str, bytes, bytes]]) -> List[bool]:
+        """Verify (signer, message, signature) triples; unknown signers fail"""
+        return verify_signed_items(self._public_keys, items)
+
+def verify_signed_items(public_keys: Dict[str, bytes], items: Sequence[Tuple[str, bytes, bytes]]) -> List[bool]:
+    """Batch-verify (signer, message, signature) triples against a signer -> public key map"""
+    results = [False] * len(items)
+    known = []
+    positions = []
+    for position, (signer, message, signature) in enumerate(items):
+        public_key = public_keys.get(signer)
+        if public_key is not None and signature is not None and len(signature) == SIGNATURE_SIZE:
+            known.append((public_key, message, signature))
+            positions.append(position)
+    for position, valid in zip(positions, ed25519_verify_batch(known)):
+        results[position] = valid
+    return results
@@ -0,0 +1,576 @@
+"""
+Ledger Storage Backends
+Indigenous Hardware Verification System
+
+Pluggable backends behind SupplyChainTracker.components_db. Both backends
+expose the same mapping-style interface (component_id -> SupplyChainEntry)
+plus put_component/append_event for writes, so the tracker never mutates
+entries directly.
+"""
+
+import os
+import json
+import mmap
+import struct
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from ledger_models import SupplyChainEntry, CustodyEvent
+
+# Record header: payload length, CRC32 of (kind + payload), record kind
+RECORD_HEADER = struct.Struct("<IIB")
+RECORD_COMPONENT = 1
+RECORD_EVENT = 2
+
+def encode_record(kind: int, payload: Dict) -> bytes:
+    """Frame a JSON payload as one CRC-checked log record"""
+    data = json.dumps(payload, separators=(",", ":")).encode()
+    return RECORD_HEADER.pack(len(data), zlib.crc32(bytes([kind]) + data), kind) + data
+
+def read_record(f) -> Optional[Tuple[int, Dict, int]]:
+    """Read one (kind, payload, size) record from a file positioned at a record boundary (None at a torn tail)"""
+    header = f.read(RECORD_HEADER.size)
+    if len(header) < RECORD_HEADER.size:
+        return None
+    length, crc, kind = RECORD_HEADER.unpack(header)
+    payload = f.read(length)
+    if len(payload) < length or zlib.crc32(bytes([kind]) + payload) != crc:
+        return None
+    return kind, json.loads(payload), RECORD_HEADER.size + length
+
+# Index snapshot: header (magic, log position covered, entry count, CRC-32 of the
+# entries), then per component its offsets, event count and UTF-8 id length, followed by the id
+SNAPSHOT_MAGIC = b"LSNAP002"
+SNAPSHOT_HEADER = struct.Struct("<8sQQI")
+SNAPSHOT_ENTRY = struct.Struct("<qqqH")
+
+class InMemoryStorage:
+    """Volatile dict-backed component store (default backend)"""
+
+    def __init__(self):
+        self._entries: Dict[str, SupplyChainEntry] = {}
+
+    def __contains__(self, component_id) -> bool:
+        return component_id in self._entries
+
+    def __getitem__(self, component_id: str) -> SupplyChainEntry:
+        return self._entries[component_id]
+
+    def __setitem__(self, component_id: str, entry: SupplyChainEntry):
+        self.put_component(entry)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._entries)
+
+    def get(self, component_id: str, default=None) -> Optional[SupplyChainEntry]:
+        return self._entries.get(component_id, default)
+
+    def keys(self):
+        return self._entries.keys()
+
+    def values(self):
+        return self._entries.values()
+
+    def items(self):
+        return self._entries.items()
+
+    def put_component(self, entry: SupplyChainEntry):
+        """Store a newly registered component (including its initial custody chain)"""
+        self._entries[entry.component_id] = entry
+
+    def put_components(self, entries: List[SupplyChainEntry]):
+        """Store a batch of newly registered components"""
+        for entry in entries:
+            self._entries[entry.component_id] = entry
+
+    def append_event(self, component_id: str, event: Dict) -> Optional[int]:
+        """Append a custody event to an existing component"""
+        self._entries[component_id].custody_chain.append(event)
+        return None
+
+    def append_events(self, events: List[Tuple[str, Dict]]) -> Optional[int]:
+        """Append a batch of (component_id, event) pairs in order"""
+        entries = self._entries
+        for component_id, event in events:
+            entries[component_id].custody_chain.append(event)
+        return None
+
+    def wait_durable(self, token: Optional[int]):
+        """Nothing is ever durable in memory; returns immediately"""
+
+    def flush(self):
+        """Nothing to flush for the in-memory backend"""
+
+    def close(self):
+        """Nothing to release for the in-memory backend"""
+
+class AppendOnlyLogStorage:
+    """Durable backend: append-only record log plus an append-only offset index
+
+    Every write appends one record to ``ledger.log``; nothing is ever rewritten.
+    Component records hold the entry fields, event records hold one custody
+    event and a back-pointer to the previous event of the same component, so
+    a chain is read by following offsets. ``ledger.idx`` maps each component
+    to its component record, latest event record and event count, and is
+    loaded on start instead of scanning the log. Records after the last
+    indexed one (e.g. after a crash) are re-indexed on open.
+
+    ``snapshot()`` writes the whole index to a compact binary
+    ``ledger.snap`` (loaded through mmap on open) and compacts ``ledger.idx``
+    down to the lines written after it, so startup cost tracks the writes
+    since the last snapshot rather than the ledger's whole history.
+    ``close()`` takes one whenever anything was written since the last, so
+    after a clean shutdown only a crash tail is ever replayed. A snapshot that
+    is truncated, corrupt or from an older format is ignored: the log is
+    re-indexed from the start and a fresh snapshot written.
+
+    Durability uses group commit: the log is fsynced once every
+    ``fsync_every`` writes and, with ``fsync_interval_ms``, by a background
+    flusher at least that often. A caller that needs one write on disk
+    passes the token returned by ``append_event`` to ``wait_durable``;
+    concurrent waiters share a single fsync instead of queueing one each.
+    """
+
+    LOG_FILE = "ledger.log"
+    INDEX_FILE = "ledger.idx"
+    SNAPSHOT_FILE = "ledger.snap"
+
+    def __init__(self, directory: str, fsync_every: int = 256, cache_size: int = 4096,
+                 fsync_interval_ms: Optional[float] = None, snapshot_on_close: bool = True):
+        self.directory = directory
+        self.snapshot_on_close = snapshot_on_close
+        self.fsync_every = max(1, fsync_every)
+        self.fsync_interval_ms = fsync_interval_ms
+        self.cache_size = cache_size
+        os.makedirs(directory, exist_ok=True)
+
+        self._log_path = os.path.join(directory, self.LOG_FILE)
+        self._index_path = os.path.join(directory, self.INDEX_FILE)
+        self._snapshot_path = os.path.join(directory, self.SNAPSHOT_FILE)
+
+        # component_id -> (component offset, last event offset, event count)
+        self._index: Dict[str, Tuple[int, int, int]] = {}
+        self._cache: "OrderedDict[str, SupplyChainEntry]" = OrderedDict()
+        self._pending_writes = 0
+        self._dirty = False
+
+        # Log position covered by ledger.snap, and the snapshot-time offsets of
+        # components changed after it (None for components new since then)
+        snapshot_end = self._load_snapshot()
+        reindex = snapshot_end is None
+        if reindex:
+            # ledger.idx only holds the writes after the unreadable snapshot
+            self._index = {}
+            snapshot_end = 0
+            open(self._index_path, "w").close()
+        self.snapshot_end = snapshot_end
+        self._changed_since_snapshot: Dict[str, Optional[Tuple[int, int, int]]] = {}
+
+        indexed_end = self._load_index(self.snapshot_end)
+        self._recover_log(indexed_end)
+
+        self._log = open(self._log_path, "ab")
+        self._index_file = open(self._index_path, "a", encoding="utf-8")
+        self._read_fd = os.open(self._log_path, os.O_RDONLY)
+        self._log_end = os.path.getsize(self._log_path)
+
+        # Group commit state: _io_lock guards the buffered files, _sync_cond
+        # the log position known to be on disk and the in-progress fsync
+        self._io_lock = threading.Lock()
+        self._sync_cond = threading.Condition()
+        self._durable_end = self._log_end
+        self._syncing = False
+
+        self._flusher = None
+        self._flusher_wake = threading.Event()
+        self._closing = False
+        if fsync_interval_ms is not None:
+            self._flusher = threading.Thread(target=self._flush_periodically, name="ledger-flusher", daemon=True)
+            self._flusher.start()
+        if reindex:
+            self.snapshot()
+
+    # ------------------------------------------------------------------
+    # Startup
+    # ------------------------------------------------------------------
+
+    def _load_snapshot(self) -> Optional[int]:
+        """Load ledger.snap into the index through mmap, returning the log position it covers
+
+        Returns None when the snapshot cannot be used (truncated, failing its
+        checksum, an older format or ahead of the log).
+        """
+        if not os.path.exists(self._snapshot_path):
+            return 0
+
+        log_size = os.path.getsize(self._log_path) if os.path.exists(self._log_path) else 0
+        try:
+            with open(self._snapshot_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                magic, snapshot_end, count, crc = SNAPSHOT_HEADER.unpack_from(view, 0)
+                with memoryview(view) as data:
+                    intact = zlib.crc32(data[SNAPSHOT_HEADER.size:]) == crc
+                if magic != SNAPSHOT_MAGIC or not intact or snapshot_end > log_size:
+                    return None
+                position = SNAPSHOT_HEADER.size
+                for _ in range(count):
+                    comp_off, last_off, events, id_length = SNAPSHOT_ENTRY.unpack_from(view, position)
+                    position += SNAPSHOT_ENTRY.size
+                    component_id = view[position:position + id_length].decode("utf-8")
+                    position += id_length
+                    self._index[component_id] = (comp_off, last_off, events)
+        except (ValueError, struct.error):  # empty or truncated file, undecodable id
+            return None
+        return snapshot_end
+
+    def _set_index(self, component_id: str, offsets: Tuple[int, int, int]):
+        """Update the index while opening, remembering what the snapshot had for the id"""
+        if self.snapshot_end and component_id not in self._changed_since_snapshot:
+            self._changed_since_snapshot[component_id] = self._index.get(component_id)
+        self._index[component_id] = offsets
+
+    def _load_index(self, indexed_end: int) -> int:
+        """Replay ledger.idx lines past ``indexed_end``, returning the log position now covered"""
+        if not os.path.exists(self._index_path):
+            return indexed_end
+
+        log_size = os.path.getsize(self._log_path) if os.path.exists(self._log_path) else 0
+        covered_end = indexed_end
+        valid_bytes = 0
+        with open(self._index_path, "rb") as f:
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break  # torn final line
+                component_id, comp_off, last_off, count, log_end = raw.decode("utf-8").rstrip("\n").split("\t")
+                log_end = int(log_end)
+                if log_end > log_size:
+                    break  # index got ahead of a log that was not synced
+                valid_bytes += len(raw)
+                if log_end <= covered_end:
+                    continue  # already covered by the snapshot (compaction was interrupted)
+                self._set_index(component_id, (int(comp_off), int(last_off), int(count)))
+                covered_end = log_end
+
+        if valid_bytes != os.path.getsize(self._index_path):
+            with open(self._index_path, "r+b") as f:
+                f.truncate(valid_bytes)
+        return covered_end
+
+    def _recover_log(self, indexed_end: int):
+        """Re-index records written after the index tail and drop a torn last record"""
+        if not os.path.exists(self._log_path):
+            return
+
+        recovered = []
+        with open(self._log_path, "rb") as f:
+            f.seek(indexed_end)
+            offset = indexed_end
+            while True:
+                record = read_record(f)
+                if record is None:
+                    break
+                kind, payload, size = record
+                if kind == RECORD_COMPONENT:
+                    component_id = payload["component_id"]
+                    self._set_index(component_id, (offset, -1, 0))
+                else:
+                    component_id = payload["c"]
+                    comp_off, _, count = self._index[component_id]
+                    self._set_index(component_id, (comp_off, offset, count + 1))
+                offset += size
+                recovered.append((component_id, offset))
+
+        if offset != os.path.getsize(self._log_path):
+            with open(self._log_path, "r+b") as f:
+                f.truncate(offset)
+
+        if recovered:
+            with open(self._index_path, "a", encoding="utf-8") as idx:
+                for component_id, log_end in recovered:
+                    idx.write(self._index_line(component_id, log_end))
+
+    # ------------------------------------------------------------------
+    # Mapping interface
+    # ------------------------------------------------------------------
+
+    def __contains__(self, component_id) -> bool:
+        return component_id in self._index
+
+    def __getitem__(self, component_id: str) -> SupplyChainEntry:
+        entry = self._cache.get(component_id)
+        if entry is not None:
+            self._cache.move_to_end(component_id)
+            return entry
+
+        comp_off, last_off, _ = self._index[component_id]
+        fields = self._read_at(comp_off)
+        entry = SupplyChainEntry(custody_chain=self._read_chain(last_off), **fields)
+        self._remember(entry)
+        return entry
+
+    def __setitem__(self, component_id: str, entry: SupplyChainEntry):
+        self.put_component(entry)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._index))
+
+    def get(self, component_id: str, default=None) -> Optional[SupplyChainEntry]:
+        if component_id not in self._index:
+            return default
+        return self[component_id]
+
+    def keys(self):
+        return list(self._index)
+
+    def values(self) -> Iterator[SupplyChainEntry]:
+        for component_id in self.keys():
+            yield self[component_id]
+
+    def items(self) -> Iterator[Tuple[str, SupplyChainEntry]]:
+        for component_id in self.keys():
+            yield component_id, self[component_id]
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def put_component(self, entry: SupplyChainEntry):
+        """Append a component record followed by its initial custody events"""
+        self._write_component(entry)
+        self._commit()
+
+    def put_components(self, entries: List[SupplyChainEntry]):
+        """Append a batch of components, counted as one write per entry for fsync batching"""
+        for entry in entries:
+            self._write_component(entry)
+        if entries:
+            self._commit(len(entries))
+
+    def _write_component(self, entry: SupplyChainEntry):
+        component_id = entry.component_id
+        if "\t" in component_id or "\n" in component_id:
+            raise ValueError(f"Invalid component id: {component_id!r}")
+
+        fields = {name: value for name, value in vars(entry).items() if name != "custody_chain"}
+        chain = entry.custody_chain
+        with self._io_lock:
+            comp_off = self._append(RECORD_COMPONENT, fields)
+            self._index[component_id] = (comp_off, -1, 0)
+            self._index_file.write(self._index_line(component_id, self._log_end))
+
+            for event in chain:
+                self._append_event_record(component_id, event)
+
+        self._remember(SupplyChainEntry(custody_chain=list(chain), **fields))
+
+    def append_event(self, component_id: str, event: Dict) -> int:
+        """Append a custody event record, returning its durability token for ``wait_durable``"""
+        with self._io_lock:
+            self._append_event_record(component_id, event)
+            token = self._log_end
+        cached = self._cache.get(component_id)
+        if cached is not None:
+            cached.custody_chain.append(event)
+        self._commit()
+        return token
+
+    def append_events(self, events: List[Tuple[str, Dict]]) -> Optional[int]:
+        """Append a batch of (component_id, event) pairs under one lock, counted as one write per event"""
+        if not events:
+            return None
+        with self._io_lock:
+            for component_id, event in events:
+                self._append_event_record(component_id, event)
+            token = self._log_end
+        cache = self._cache
+        for component_id, event in events:
+            cached = cache.get(component_id)
+            if cached is not None:
+                cached.custody_chain.append(event)
+        self._commit(len(events))
+        return token
+
+    def _append_event_record(self, component_id: str, event: Dict):
+        comp_off, last_off, count = self._index[component_id]
+        event_off = self._append(RECORD_EVENT, {"c": component_id, "p": last_off, "e": dict(event)})
+        self._index[component_id] = (comp_off, event_off, count + 1)
+        self._index_file.write(self._index_line(component_id, self._log_end))
+
+    def _append(self, kind: int, payload: Dict) -> int:
+        record = encode_record(kind, payload)
+        offset = self._log_end
+        self._log.write(record)
+        self._log_end += len(record)
+        self._dirty = True
+        return offset
+
+    def _index_line(self, component_id: str, log_end: int) -> str:
+        comp_off, last_off, count = self._index[component_id]
+        return f"{component_id}\t{comp_off}\t{last_off}\t{count}\t{log_end}\n"
+
+    def _commit(self, writes: int = 1):
+        """Count logical writes and fsync once every ``fsync_every`` writes"""
+        self._pending_writes += writes
+        if self._pending_writes >= self.fsync_every:
+            if self._flusher is not None:
+                # Leave the fsync to the flusher thread so the writer is not held up
+                self._flusher_wake.set()
+            else:
+                self.flush()
+
+    def wait_durable(self, token: Optional[int]):
+        """Block until the log is fsynced at least up to ``token`` (group commit)
+
+        The first waiter becomes the leader and fsyncs everything written so
+        far; waiters arriving meanwhile are covered by that fsync or by the
+        next one, so N concurrent callers cost far fewer than N fsyncs.
+        """
+        if token is None:
+            return
+        with self._sync_cond:
+            while self._durable_end < token:
+                if not self._syncing:
+                    self._syncing = True
+                    break
+                self._sync_cond.wait()
+            else:
+                return
+
+        synced_end = None
+        try:
+            with self._io_lock:
+                synced_end = self._log_end
+                self._log.flush()
+                self._index_file.flush()
+                self._pending_writes = 0
+                self._dirty = False
+            os.fsync(self._log.fileno())
+            os.fsync(self._index_file.fileno())
+        finally:
+            with self._sync_cond:
+                self._syncing = False
+                if synced_end is not None:
+                    self._durable_end = max(self._durable_end, synced_end)
+                self._sync_cond.notify_all()
+
+    def flush(self):
+        """Write buffered records and fsync the log (then the index)"""
+        self.wait_durable(self._log_end)
+
+    def _flush_periodically(self):
+        interval = self.fsync_interval_ms / 1000
+        while not self._closing:
+            self._flusher_wake.wait(interval)
+            self._flusher_wake.clear()
+            if self._durable_end < self._log_end:
+                self.flush()
+
+    def snapshot(self) -> int:
+        """Write the index to ledger.snap and compact ledger.idx, returning the log position covered
+
+        The caller must keep writers out for the duration (the tracker holds
+        its shared lock). The snapshot is written to a temporary file and
+        renamed into place, so a crash leaves either the old or the new one.
+        """
+        self.flush()
+        snapshot_end = self._log_end
+        temp_path = self._snapshot_path + ".tmp"
+        with open(temp_path, "wb") as f:
+            f.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, snapshot_end, len(self._index), 0))
+            crc = 0
+            for component_id, (comp_off, last_off, events) in self._index.items():
+                encoded = component_id.encode("utf-8")
+                entry = SNAPSHOT_ENTRY.pack(comp_off, last_off, events, len(encoded)) + encoded
+                crc = zlib.crc32(entry, crc)
+                f.write(entry)
+            # The checksum is only known once every entry is written
+            f.seek(0)
+            f.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, snapshot_end, len(self._index), crc))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self._snapshot_path)
+        self._fsync_directory()
+
+        # Every index line is now covered by the snapshot
+        with self._io_lock:
+            self._index_file.close()
+            self._index_file = open(self._index_path, "w", encoding="utf-8")
+            os.fsync(self._index_file.fileno())
+        self.snapshot_end = snapshot_end
+        self._changed_since_snapshot = {}
+        return snapshot_end
+
+    def changes_since_snapshot(self) -> Iterator[Tuple[str, Optional[Tuple[int, int, int]], bool]]:
+        """(component_id, snapshot-time offsets or None, appended_only) for components written since the snapshot
+
+        ``appended_only`` means the component kept its snapshot-time
+        registration and only gained custody events.
+        """
+        for component_id, previous in self._changed_since_snapshot.items():
+            appended_only = previous is not None and previous[0] == self._index[component_id][0]
+            yield component_id, previous, appended_only
+
+    def entry_at(self, offsets: Tuple[int, int, int]) -> SupplyChainEntry:
+        """Read an entry as it stood at the given (component, last event, count) offsets"""
+        comp_off, last_off, _ = offsets
+        return SupplyChainEntry(custody_chain=self._read_chain(last_off), **self._read_at(comp_off))
+
+    def _fsync_directory(self):
+        if not hasattr(os, "O_DIRECTORY"):
+            return
+        fd = os.open(self.directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def close(self):
+        """Flush pending writes, checkpoint the index if it changed, and release file handles"""
+        if self._log.closed:
+            return
+        if self._flusher is not None:
+            self._closing = True
+            self._flusher_wake.set()
+            self._flusher.join()
+        self.flush()
+        if self.snapshot_on_close and self._log_end != self.snapshot_end:
+            self.snapshot()
+        self._log.close()
+        self._index_file.close()
+        os.close(self._read_fd)
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def _read_at(self, offset: int) -> Dict:
+        if self._dirty:
+            with self._io_lock:
+                self._log.flush()
+                self._dirty = False
+        header = os.pread(self._read_fd, RECORD_HEADER.size, offset)
+        length, _, _ = RECORD_HEADER.unpack(header)
+        return json.loads(os.pread(self._read_fd, length, offset + RECORD_HEADER.size))
+
+    def _read_chain(self, last_off: int) -> List[Dict]:
+        chain = []
+        offset = last_off
+        while offset >= 0:
+            record = self._read_at(offset)
+            chain.append(CustodyEvent.from_dict(record["e"]))
+            offset = record["p"]
+        chain.reverse()
+        return chain
+
+    def _remember(self, entry: SupplyChainEntry):
+        self._cache[entry.component_id] = entry
+        self._cache.move_to_end(entry.component_id)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
@@ -0,0 +1,445 @@
+"""
+Ledger Wire Format
+Indigenous Hardware Verification System
+
+Compact, versioned binary encoding of a component record with its custody
+chain (or of a bare list of custody events) for APIs and replication. It is
+the on-the-wire sibling of the mapped ledger: decoding only checks the
+header and returns views that read each field from the buffer on access,
+so a client that needs one event's signature never parses the rest.
+
+Layout (little-endian)::
+
+    header      magic, version, kind, event count, offset of the event table
+    component   COMPONENT_HEAD, raw verification hash (32 bytes) and digital
+                signature (64 bytes) when they are lowercase hex, the six text
+                fields, then any fallback texts (KIND_COMPONENT only)
+    table       event count + 1 uint32 offsets (the last marks the end)
+    events      EVENT_HEAD, raw signature (32) and attestation (64) when
+                present, the four text fields, then the optional extras
+
+Text fields are UTF-8 behind the uint16 lengths in the head; extras (a
+stage outside STAGES, a timestamp that is not ISO-8601, non-hex
+signatures, the hash-based pq_signature) carry a uint32 length prefix and
+appear in that order only when their flag is set. As in CustodyEvent, a
+timestamp that round-trips through isoformat() travels as epoch
+microseconds. STAGES is fixed per version: a new stage is sent as text
+until the table is extended under a new version number.
+"""
+
+import struct
+import sys
+from collections.abc import Mapping, Sequence
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ledger_models import SupplyChainEntry, CustodyEvent, parse_timestamp
+
+WIRE_MAGIC = b"LWIR"
+WIRE_VERSION = 1
+WIRE_CONTENT_TYPE = "application/x-ledger-wire"
+
+KIND_COMPONENT = 1
+KIND_EVENTS = 2
+
+# magic, version, kind, event count, event table offset
+WIRE_HEADER = struct.Struct("<4sBBII")
+# flags, then the lengths of id, name, manufacturer, manufacturing date, batch, clearance
+COMPONENT_HEAD = struct.Struct("<B6H")
+# flags, stage code, timestamp (epoch microseconds or 0), then the lengths of
+# handler, location, action, verified_by
+EVENT_HEAD = struct.Struct("<BBq4H")
+EXTRA_LENGTH = struct.Struct("<I")
+TABLE_ENTRY = struct.Struct("<I")
+
+# Stage codes of version 1 (0 means the stage is sent as text)
+STAGES = (
+    "MANUFACTURING", "QUALITY_CONTROL", "DISTRIBUTION", "INSTALLATION", "OPERATIONAL", "MAINTENANCE"
+)
+_STAGE_CODES = {stage: code for code, stage in enumerate(STAGES, 1)}
+
+COMPONENT_INDIGENOUS = 1
+COMPONENT_RAW_HASH = 2
+COMPONENT_RAW_SIGNATURE = 4
+
+EVENT_EPOCH = 1
+EVENT_RAW_SIGNATURE = 2
+EVENT_TEXT_SIGNATURE = 4
+EVENT_RAW_ATTESTATION = 8
+EVENT_TEXT_ATTESTATION = 16
+EVENT_RAW_PQ_SIGNATURE = 32
+EVENT_TEXT_PQ_SIGNATURE = 64
+
+_COMPONENT_TEXT_FIELDS = (
+    "component_id", "component_name", "manufacturer", "manufacturing_date", "batch_id", "security_clearance"
+)
+_EVENT_TEXT_FIELDS = ("handler", "location", "action", "verified_by")
+
+# ----------------------------------------------------------------------
+# Encoding
+# ----------------------------------------------------------------------
+
+def encode_component(entry: SupplyChainEntry) -> bytes:
+    """Encode a component record and its custody chain (any SupplyChainEntry-like object)"""
+    flags = COMPONENT_INDIGENOUS if entry.indigenous_certification else 0
+    raw = []
+    extras = []
+    for value, size, flag in ((entry.verification_hash, 32, COMPONENT_RAW_HASH),
+                              (entry.digital_signature, 64, COMPONENT_RAW_SIGNATURE)):
+        packed = CustodyEvent._pack_hex(value, size)
+        if isinstance(packed, bytes):
+            flags |= flag
+            raw.append(packed)
+        else:
+            extras.append(_extra(value.encode("utf-8")))
+    texts = [getattr(entry, name).encode("utf-8") for name in _COMPONENT_TEXT_FIELDS]
+    try:
+        head = COMPONENT_HEAD.pack(flags, *map(len, texts))
+    except struct.error:
+        raise ValueError(f"Component {entry.component_id} has a text field over 65535 bytes")
+    return _encode_message(KIND_COMPONENT, b"".join((head, *raw, *texts, *extras)), entry.custody_chain)
+
+def encode_events(events: Iterable[Dict]) -> bytes:
+    """Encode custody events (CustodyEvents, mapped/wire views or plain dicts) without a component"""
+    return _encode_message(KIND_EVENTS, b"", events)
+
+def _encode_message(kind: int, body: bytes, events: Iterable[Dict]) -> bytes:
+    records = [_pack_event(event) for event in events]
+    table_offset = WIRE_HEADER.size + len(body)
+    position = table_offset + (len(records) + 1) * TABLE_ENTRY.size
+    table = bytearray()
+    for record in records:
+        table += TABLE_ENTRY.pack(position)
+        position += len(record)
+    table += TABLE_ENTRY.pack(position)
+    header = WIRE_HEADER.pack(WIRE_MAGIC, WIRE_VERSION, kind, len(records), table_offset)
+    return b"".join((header, body, table, *records))
+
+def _extra(encoded: bytes) -> bytes:
+    return EXTRA_LENGTH.pack(len(encoded)) + encoded
+
+def _pack_event(event: Dict) -> bytes:
+    if isinstance(event, CustodyEvent):
+        # Already packed in memory: reuse the raw digests and epoch as they are
+        timestamp = event._timestamp
+        signature, attestation, pq_signature = event._signature, event._attestation, event._pq_signature
+    else:
+        timestamp = CustodyEvent._pack_timestamp(event['timestamp'])
+        signature = CustodyEvent._pack_hex(event.get('signature'), 32)
+        attestation = CustodyEvent._pack_hex(event.get('attestation'), 64)
+        pq_signature = CustodyEvent._pack_hex(event.get('pq_signature'))
+
+    flags = 0
+    raw = []
+    extras = []
+    stage = event['stage']
+    stage_code = _STAGE_CODES.get(stage, 0)
+    if not stage_code:
+        extras.append(_extra(stage.encode("utf-8")))
+    if isinstance(timestamp, int):
+        flags |= EVENT_EPOCH
+    else:
+        extras.append(_extra(timestamp.encode("utf-8")))
+        timestamp = 0
+    for value, raw_flag, text_flag in ((signature, EVENT_RAW_SIGNATURE, EVENT_TEXT_SIGNATURE),
+                                       (attestation, EVENT_RAW_ATTESTATION, EVENT_TEXT_ATTESTATION)):
+        if isinstance(value, bytes):
+            flags |= raw_flag
+            raw.append(value)
+        elif value is not None:
+            flags |= text_flag
+            extras.append(_extra(value.encode("utf-8")))
+    if isinstance(pq_signature, bytes):
+        flags |= EVENT_RAW_PQ_SIGNATURE
+        extras.append(_extra(pq_signature))
+    elif pq_signature is not None:
+        flags |= EVENT_TEXT_PQ_SIGNATURE
+        extras.append(_extra(pq_signature.encode("utf-8")))
+
+    texts = [event[name].encode("utf-8") for name in _EVENT_TEXT_FIELDS]
+    try:
+        head = EVENT_HEAD.pack(flags, stage_code, timestamp, *map(len, texts))
+    except struct.error:
+        raise ValueError("Custody event has a text field over 65535 bytes")
+    return b"".join((head, *raw, *texts, *extras))
+
+# ----------------------------------------------------------------------
+# Decoding (views)
+# ----------------------------------------------------------------------
+
+def decode_component(buffer) -> "WireComponent":
+    """View over an ``encode_component`` message (bytes, bytearray or memoryview; not copied)"""
+    view, count, table_offset = _open_message(buffer, KIND_COMPONENT)
+    return WireComponent(view, WireCustodyChain(view, table_offset, count))
+
+def decode_events(buffer) -> "WireCustodyChain":
+    """Lazy sequence of the events in an ``encode_events`` message"""
+    view, count, table_offset = _open_message(buffer, KIND_EVENTS)
+    return WireCustodyChain(view, table_offset, count)
+
+def _open_message(buffer, kind: int) -> Tuple[memoryview, int, int]:
+    view = memoryview(buffer).cast("B")
+    if len(view) < WIRE_HEADER.size:
+        raise ValueError("Truncated wire message")
+    magic, version, message_kind, count, table_offset = WIRE_HEADER.unpack_from(view, 0)
+    if magic != WIRE_MAGIC:
+        raise ValueError("Not a ledger wire message")
+    if version > WIRE_VERSION:
+        raise ValueError(f"Unsupported wire format version {version} (this build reads up to {WIRE_VERSION})")
+    if message_kind != kind:
+        raise ValueError(f"Expected a wire message of kind {kind}, got {message_kind}")
+    end = table_offset + (count + 1) * TABLE_ENTRY.size
+    if end > len(view) or TABLE_ENTRY.unpack_from(view, end - TABLE_ENTRY.size)[0] != len(view):
+        raise ValueError("Truncated wire message")
+    return view, count, table_offset
+
+def _read_extras(view: memoryview, position: int, count: int) -> List[memoryview]:
+    extras = []
+    for _ in range(count):
+        length = EXTRA_LENGTH.unpack_from(view, position)[0]
+        position += EXTRA_LENGTH.size
+        extras.append(view[position:position + length])
+        position += length
+    return extras
+
+class WireCustodyEvent(Mapping):
+    """Read-only custody event view over one encoded event
+
+    Reads like CustodyEvent (``event['stage']``, ``event.epoch``); text is
+    decoded from the buffer on access. Pickles as a CustodyEvent.
+    """
+
+    __slots__ = ("_view", "_offset", "_fields")
+
+    KEYS = CustodyEvent.KEYS
+
+    def __init__(self, view: memoryview, offset: int):
+        self._view = view
+        self._offset = offset
+        self._fields = EVENT_HEAD.unpack_from(view, offset)
+
+    def _raw_start(self) -> int:
+        return self._offset + EVENT_HEAD.size
+
+    def _text_start(self) -> int:
+        flags = self._fields[0]
+        return (self._raw_start() + (32 if flags & EVENT_RAW_SIGNATURE else 0)
+                + (64 if flags & EVENT_RAW_ATTESTATION else 0))
+
+    def _text(self, number: int) -> str:
+        lengths = self._fields[3:7]
+        start = self._text_start() + sum(lengths[:number])
+        return str(self._view[start:start + lengths[number]], "utf-8")
+
+    def _extra(self, flag: int) -> Optional[memoryview]:
+        """The extra stored under ``flag`` (0 for the stage text), None if absent"""
+        flags, stage_code = self._fields[0], self._fields[1]
+        present = [
+            not stage_code, not flags & EVENT_EPOCH, flags & EVENT_TEXT_SIGNATURE,
+            flags & EVENT_TEXT_ATTESTATION, flags & (EVENT_RAW_PQ_SIGNATURE | EVENT_TEXT_PQ_SIGNATURE)
+        ]
+        slot = {0: 0, EVENT_EPOCH: 1, EVENT_TEXT_SIGNATURE: 2, EVENT_TEXT_ATTESTATION: 3,
+                EVENT_RAW_PQ_SIGNATURE: 4, EVENT_TEXT_PQ_SIGNATURE: 4}[flag]
+        if not present[slot]:
+            return None
+        position = self._text_start() + sum(self._fields[3:7])
+        return _read_extras(self._view, position, sum(1 for bit in present[:slot + 1] if bit))[-1]
+
+    stage = property(lambda self: STAGES[self._fields[1] - 1] if self._fields[1] else str(self._extra(0), "utf-8"))
+    handler = property(lambda self: self._text(0))
+    location = property(lambda self: self._text(1))
+    action = property(lambda self: self._text(2))
+    verified_by = property(lambda self: self._text(3))
+
+    @property
+    def timestamp(self) -> str:
+        fields = self._fields
+        if fields[0] & EVENT_EPOCH:
+            return CustodyEvent._render_timestamp(fields[2])
+        return str(self._extra(EVENT_EPOCH), "utf-8")
+
+    @property
+    def epoch(self) -> Optional[int]:
+        fields = self._fields
+        return fields[2] if fields[0] & EVENT_EPOCH else parse_timestamp(self.timestamp)
+
+    @property
+    def timestamp_text(self) -> Optional[str]:
+        return None if self._fields[0] & EVENT_EPOCH else self.timestamp
+
+    @property
+    def signature(self) -> Optional[str]:
+        flags = self._fields[0]
+        if flags & EVENT_RAW_SIGNATURE:
+            start = self._raw_start()
+            return self._view[start:start + 32].hex()
+        if flags & EVENT_TEXT_SIGNATURE:
+            return str(self._extra(EVENT_TEXT_SIGNATURE), "utf-8")
+        return None
+
+    @property
+    def attestation(self) -> Optional[str]:
+        flags = self._fields[0]
+        if flags & EVENT_RAW_ATTESTATION:
+            start = self._raw_start() + (32 if flags & EVENT_RAW_SIGNATURE else 0)
+            return self._view[start:start + 64].hex()
+        if flags & EVENT_TEXT_ATTESTATION:
+            return str(self._extra(EVENT_TEXT_ATTESTATION), "utf-8")
+        return None
+
+    @property
+    def pq_signature(self) -> Optional[str]:
+        flags = self._fields[0]
+        if flags & EVENT_RAW_PQ_SIGNATURE:
+            return self._extra(EVENT_RAW_PQ_SIGNATURE).hex()
+        if flags & EVENT_TEXT_PQ_SIGNATURE:
+            return str(self._extra(EVENT_TEXT_PQ_SIGNATURE), "utf-8")
+        return None
+
+    def _present_signatures(self) -> Tuple[str, ...]:
+        flags = self._fields[0]
+        return tuple(key for key, mask in (
+            ("signature", EVENT_RAW_SIGNATURE | EVENT_TEXT_SIGNATURE),
+            ("attestation", EVENT_RAW_ATTESTATION | EVENT_TEXT_ATTESTATION),
+            ("pq_signature", EVENT_RAW_PQ_SIGNATURE | EVENT_TEXT_PQ_SIGNATURE)
+        ) if flags & mask)
+
+    def __getitem__(self, key: str):
+        if key in CustodyEvent.BASE_KEYS or key in self._present_signatures():
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(CustodyEvent.BASE_KEYS + self._present_signatures())
+
+    def __len__(self) -> int:
+        return len(CustodyEvent.BASE_KEYS) + len(self._present_signatures())
+
+    def __repr__(self) -> str:
+        return f"WireCustodyEvent({dict(self)!r})"
+
+    def __reduce__(self):
+        return CustodyEvent.from_dict, (dict(self),)
+
+    def to_dict(self) -> Dict:
+        return dict(self)
+
+    def to_custody_event(self) -> CustodyEvent:
+        """Copy out into a CustodyEvent in one pass, keeping the epoch and raw digests packed"""
+        view = self._view
+        flags, stage_code, timestamp = self._fields[:3]
+        position = self._raw_start()
+        signature = attestation = pq_signature = None
+        if flags & EVENT_RAW_SIGNATURE:
+            signature = bytes(view[position:position + 32])
+            position += 32
+        if flags & EVENT_RAW_ATTESTATION:
+            attestation = bytes(view[position:position + 64])
+            position += 64
+        texts = []
+        for length in self._fields[3:7]:
+            texts.append(sys.intern(str(view[position:position + length], "utf-8")))
+            position += length
+        present = (not stage_code, not flags & EVENT_EPOCH, flags & EVENT_TEXT_SIGNATURE,
+                   flags & EVENT_TEXT_ATTESTATION, flags & (EVENT_RAW_PQ_SIGNATURE | EVENT_TEXT_PQ_SIGNATURE))
+        extras = iter(_read_extras(view, position, sum(1 for bit in present if bit)))
+        stage = sys.intern(str(next(extras), "utf-8")) if present[0] else STAGES[stage_code - 1]
+        if present[1]:
+            timestamp = str(next(extras), "utf-8")
+        if present[2]:
+            signature = str(next(extras), "utf-8")
+        if present[3]:
+            attestation = str(next(extras), "utf-8")
+        if present[4]:
+            pq_signature = bytes(next(extras)) if flags & EVENT_RAW_PQ_SIGNATURE else str(next(extras), "utf-8")
+
+        event = CustodyEvent.__new__(CustodyEvent)
+        event.stage = stage
+        event.handler, event.location, event.action, event.verified_by = texts
+        event._timestamp = timestamp
+        event._signature = signature
+        event._attestation = attestation
+        event._pq_signature = pq_signature
+        return event
+
+class WireCustodyChain(Sequence):
+    """Lazy sequence of the events in a wire message (O(1) indexing through the event table)"""
+
+    __slots__ = ("_view", "_table_offset", "_count")
+
+    def __init__(self, view: memoryview, table_offset: int, count: int):
+        self._view = view
+        self._table_offset = table_offset
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("custody chain index out of range")
+        offset = TABLE_ENTRY.unpack_from(self._view, self._table_offset + index * TABLE_ENTRY.size)[0]
+        return WireCustodyEvent(self._view, offset)
+
+class WireComponent:
+    """Read-only SupplyChainEntry view over an encoded component"""
+
+    __slots__ = ("_view", "_fields", "custody_chain")
+
+    def __init__(self, view: memoryview, custody_chain: WireCustodyChain):
+        self._view = view
+        self._fields = COMPONENT_HEAD.unpack_from(view, WIRE_HEADER.size)
+        self.custody_chain = custody_chain
+
+    def _raw_size(self) -> int:
+        flags = self._fields[0]
+        return (32 if flags & COMPONENT_RAW_HASH else 0) + (64 if flags & COMPONENT_RAW_SIGNATURE else 0)
+
+    def _text(self, number: int) -> str:
+        lengths = self._fields[1:7]
+        start = WIRE_HEADER.size + COMPONENT_HEAD.size + self._raw_size() + sum(lengths[:number])
+        return str(self._view[start:start + lengths[number]], "utf-8")
+
+    def _digest(self, flag: int) -> str:
+        flags = self._fields[0]
+        start = WIRE_HEADER.size + COMPONENT_HEAD.size
+        if flag == COMPONENT_RAW_SIGNATURE and flags & COMPONENT_RAW_HASH:
+            start += 32
+        if flags & flag:
+            return self._view[start:start + (32 if flag == COMPONENT_RAW_HASH else 64)].hex()
+        # Fallback texts follow the text fields, hash first
+        position = WIRE_HEADER.size + COMPONENT_HEAD.size + self._raw_size() + sum(self._fields[1:7])
+        texts = 2 - bool(flags & COMPONENT_RAW_HASH) - bool(flags & COMPONENT_RAW_SIGNATURE)
+        extras = _read_extras(self._view, position, texts)
+        return str(extras[-1] if flag == COMPONENT_RAW_SIGNATURE else extras[0], "utf-8")
+
+    component_id = property(lambda self: self._text(0))
+    component_name = property(lambda self: self._text(1))
+    manufacturer = property(lambda self: self._text(2))
+    manufacturing_date = property(lambda self: self._text(3))
+    batch_id = property(lambda self: self._text(4))
+    security_clearance = property(lambda self: self._text(5))
+    verification_hash = property(lambda self: self._digest(COMPONENT_RAW_HASH))
+    digital_signature = property(lambda self: self._digest(COMPONENT_RAW_SIGNATURE))
+    indigenous_certification = property(lambda self: bool(self._fields[0] & COMPONENT_INDIGENOUS))
+
+    def to_entry(self) -> SupplyChainEntry:
+        """Copy the view out into a regular SupplyChainEntry"""
+        return SupplyChainEntry(
+            component_id=self.component_id,
+            component_name=self.component_name,
+            manufacturer=self.manufacturer,
+            manufacturing_date=self.manufacturing_date,
+            batch_id=self.batch_id,
+            verification_hash=self.verification_hash,
+            digital_signature=self.digital_signature,
+            custody_chain=[event.to_custody_event() for event in self.custody_chain],
+            indigenous_certification=self.indigenous_certification,
+            security_clearance=self.security_clearance
+        )
+
+    def __repr__(self) -> str:
+        return f"WireComponent({self.component_id!r})"
@@ -5,30 +5,217 @@ Indigenous Hardware Verification System
 For BPRD/MHA Hackathon Demo
 """
 
+import bisect
+import csv
 import json
 import hashlib
+import heapq
+import itertools
 import datetime
+import io
+import os
+import pickle
 import random
+import struct
+import threading
 import time
-from dataclasses import dataclass, asdict
-from typing import List, Dict, Optional
+import zlib
+from collections import deque
+from contextlib import ExitStack, nullcontext
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, asdict, replace
+from typing import Iterable, Iterator, List, Dict, NamedTuple, Optional, Tuple, Union
 
-@dataclass
-class SupplyChainEntry:
+from ledger_models import (
+    SupplyChainEntry, CustodyEvent, compute_event_digest, verify_chain_segment,
+    component_signing_message, event_signing_message
+)
+from ledger_storage import InMemoryStorage, AppendOnlyLogStorage
+from ledger_blocks import BlockBuilder
+from ledger_indexes import (
+    SecondaryIndex, EventTimeIndex, AssemblyGraph, StagedAssembly, INSTALLED_INTO, REMOVED_FROM
+)
+from ledger_cache import VerificationCache
+from ledger_bloom import BloomFilter
+from ledger_signing import ManufacturerKeyring, verify_signed_items
+from ledger_hashsig import HashSigner, KeyExhaustedError, verify_hash_signature
+from ledger_mapped import write_mapped_ledger
+from ledger_columnar import write_columnar_export
+from ledger_wire import encode_component
+from ledger_shipments import (
+    Shipment, ShipmentStore, SHIPMENT_PACKED, SHIPMENT_UNPACKED, compute_manifest_hash, shipment_signing_message
+)
+
+class VerificationResult(NamedTuple):
+    """Compact per-component outcome returned by verify_many"""
     component_id: str
-    component_name: str
-    manufacturer: str
-    manufacturing_date: str
-    batch_id: str
-    verification_hash: str
-    digital_signature: str
-    custody_chain: List[Dict]
-    indigenous_certification: bool
-    security_clearance: str
+    found: bool
+    authentic: bool
+    hash_valid: bool
+    chain_valid: bool
+    indigenous: bool
+    signature_valid: bool
+    shipments_valid: bool = True
+
+def _check_identity(component_id: str, manufacturer: str, batch_id: str, verification_hash: str,
+                    manufacturers) -> Tuple[bool, bool]:
+    """Return (hash_valid, manufacturer_valid) for raw component fields"""
+    # Verify hash integrity
+    hash_input = f"{component_id}_{manufacturer}_{batch_id}"
+    hash_valid = hashlib.sha256(hash_input.encode()).hexdigest() == verification_hash
+    
+    # Verify manufacturer authenticity
+    return hash_valid, manufacturer in manufacturers
+
+def _check_record(component_id: str, manufacturer: str, batch_id: str, verification_hash: str,
+                  custody_chain: List[Dict], manufacturers) -> Tuple[bool, bool, bool]:
+    """Return (hash_valid, manufacturer_valid, chain_valid) for raw component fields"""
+    hash_valid, manufacturer_valid = _check_identity(
+        component_id, manufacturer, batch_id, verification_hash, manufacturers
+    )
+    
+    # Verify custody chain integrity (full hash-chain walk from the genesis event)
+    chain_valid = len(custody_chain) > 0 and verify_chain_segment(
+        verification_hash, component_id, custody_chain
+    )
+    return hash_valid, manufacturer_valid, chain_valid
+
+def _hex_bytes(value: Optional[str]) -> Optional[bytes]:
+    try:
+        return bytes.fromhex(value) if value is not None else None
+    except ValueError:
+        return None
+
+def _signed_items(manufacturer: str, component_message: Optional[bytes], digital_signature: Optional[str],
+                  events) -> List[Tuple[str, bytes, Optional[bytes]]]:
+    """(signer, message, signature) triples for a component record (if given) and custody event attestations"""
+    items = []
+    if component_message is not None:
+        items.append((manufacturer, component_message, _hex_bytes(digital_signature)))
+    for event in _attested_events(events, 'attestation'):
+        items.append((
+            manufacturer, event_signing_message(event.get('signature') or ""), _hex_bytes(event.get('attestation'))
+        ))
+    return items
+
+def _attested_events(events, key: str) -> Iterator:
+    """Events whose ``key`` signature must be checked: every signed one, and always the chain tail
+    
+    An unsigned event is covered by the next signed one, whose digest chains
+    through it (bulk appends sign only the last event of each segment), so
+    only an unsigned tail is an error.
+    """
+    last = len(events) - 1
+    for i, event in enumerate(events):
+        if i == last or event.get(key) is not None:
+            yield event
+
+def _pq_signatures_valid(pq_public_key: Optional[bytes], events) -> bool:
+    """Check the events' hash-based signatures (trivially true when none is configured)"""
+    if pq_public_key is None:
+        return True
+    for event in _attested_events(events, 'pq_signature'):
+        message = event_signing_message(event.get('signature') or "")
+        if not verify_hash_signature(pq_public_key, message, _hex_bytes(event.get('pq_signature'))):
+            return False
+    return True
+
+def _timeline_key(item) -> int:
+    epoch = item[0].epoch
+    return epoch if epoch is not None else 0
+
+# Result flag bits packed by _verify_chunk (one byte per component)
+_FLAG_AUTHENTIC, _FLAG_HASH, _FLAG_CHAIN, _FLAG_INDIGENOUS, _FLAG_SIGNATURE = 1, 2, 4, 8, 16
+
+def _verify_chunk(manufacturers: frozenset, public_keys: Dict[str, bytes], pq_public_key: Optional[bytes],
+                  rows: List[Tuple]) -> bytes:
+    """Process-pool worker: verify (id, manufacturer, batch, hash, chain, indigenous, record message,
+    digital signature) rows into flag bytes, batch-verifying every Ed25519 signature in the chunk at once"""
+    signed, owners = [], []
+    for i, row in enumerate(rows):
+        items = _signed_items(row[1], row[6], row[7], row[4])
+        signed.extend(items)
+        owners.extend([i] * len(items))
+    signature_valid = [_pq_signatures_valid(pq_public_key, row[4]) for row in rows]
+    for owner, valid in zip(owners, verify_signed_items(public_keys, signed)):
+        if not valid:
+            signature_valid[owner] = False
+    
+    flags = bytearray(len(rows))
+    for i, (component_id, manufacturer, batch_id, verification_hash, custody_chain, indigenous, _, _) in enumerate(rows):
+        hash_valid, manufacturer_valid, chain_valid = _check_record(
+            component_id, manufacturer, batch_id, verification_hash, custody_chain, manufacturers
+        )
+        flags[i] = (
+            (_FLAG_AUTHENTIC if hash_valid and manufacturer_valid and chain_valid and signature_valid[i] else 0)
+            | (_FLAG_HASH if hash_valid else 0)
+            | (_FLAG_CHAIN if chain_valid else 0)
+            | (_FLAG_INDIGENOUS if indigenous else 0)
+            | (_FLAG_SIGNATURE if signature_valid[i] else 0)
+        )
+    return bytes(flags)
+
+class DuplicateIdError(ValueError):
+    """A component or shipment id that must be new is already registered"""
+
+# Tracker state snapshot: magic (format version), CRC-32 and length of the payload, then
+# the state dict pickled with a fixed protocol; only plain containers and scalars are allowed
+TRACKER_SNAPSHOT_FILE = "tracker.snap"
+TRACKER_SNAPSHOT_MAGIC = b"TSNAP002"
+TRACKER_SNAPSHOT_HEADER = struct.Struct("<8sIQ")
+TRACKER_SNAPSHOT_PROTOCOL = 4
+
+class _StateUnpickler(pickle.Unpickler):
+    """Unpickler that refuses every global, so a snapshot can only rebuild plain data"""
+    
+    def find_class(self, module, name):
+        raise pickle.UnpicklingError(f"Tracker snapshot references {module}.{name}")
+
+# Manufacturer keyring kept next to a durable ledger; public half exported with mapped ledgers
+KEYRING_FILE = "keyring.json"
+PUBLIC_KEYS_SUFFIX = ".keys"
+SHIPMENTS_FILE = "shipments.log"
+# Shipment records and events are signed by the tracker, not by the (free-text) handler
+SHIPMENT_SIGNER = "TRACKER_SHIPMENTS"
+SHIPMENTS_SUFFIX = ".shipments"
+BLOCKS_FILE = "blocks.log"
+BLOCKS_SUFFIX = ".blocks"
+
+# Columns a component manifest row must provide (register_component's input)
+_MANIFEST_FIELDS = (
+    "component_id", "component_name", "manufacturer", "manufacturing_date",
+    "batch_id", "indigenous_certification", "security_clearance"
+)
+
+# Components whose signatures are batch-verified together when aggregates are rebuilt
+_SIGNATURE_BATCH = 256
+
+# Fields a custody event must supply (timestamp and verified_by have defaults)
+_EVENT_FIELDS = ("stage", "handler", "location", "action")
+_OPTIONAL_EVENT_FIELDS = ("timestamp", "verified_by")
 
 class SupplyChainTracker:
-    def __init__(self):
-        self.components_db = {}
+    def __init__(self, storage=None, load_samples: bool = True, block_size: int = 1024,
+                 concurrent: bool = False, lock_shards: int = 64,
+                 verification_cache_size: int = 4096, verification_cache_ttl: Optional[float] = None,
+                 snapshot_every: Optional[int] = 100000, id_filter_fp_rate: Optional[float] = 0.01,
+                 keyring: Optional[ManufacturerKeyring] = None, pq_signer: Optional[HashSigner] = None,
+                 pq_public_key: Optional[bytes] = None, shipments: Optional[ShipmentStore] = None,
+                 snapshot_on_close: bool = True):
+        # Pluggable backend: in-memory by default, AppendOnlyLogStorage for durability,
+        # MappedLedgerStorage for read-only audit nodes
+        self.components_db = storage if storage is not None else InMemoryStorage()
+        self.read_only = getattr(self.components_db, "read_only", False)
+        
+        # Concurrency mode: per-shard component locks (hashed component_id) plus
+        # one short-held lock for the storage backend, aggregates and indexes
+        self.concurrent = concurrent
+        if concurrent:
+            self._shard_locks = [threading.RLock() for _ in range(max(1, lock_shards))]
+            self._shared_lock = threading.RLock()
+        else:
+            self._shard_locks = [nullcontext()]
+            self._shared_lock = nullcontext()
         self.manufacturers_db = {
             "IIT_MADRAS": {
                 "name": "IIT Madras",
@@ -73,16 +260,151 @@ class SupplyChainTracker:
                 "location": "Bangalore, Karnataka"
             }
         }
-        self.initialize_sample_components()
+        # Ed25519 keys per manufacturer, signing component records and custody events
+        self.keyring = keyring if keyring is not None else self._default_keyring()
+        
+        # Optional stateful hash-based (post-quantum) signatures on custody events; with a
+        # public key configured every attested event must carry a valid one
+        self.pq_signer = pq_signer
+        self.pq_public_key = pq_public_key or (pq_signer.public_key if pq_signer is not None else None)
+        
+        # Shipments whose custody events their member components inherit, and the
+        # number of each shipment's events verified so far
+        self.shipments = shipments if shipments is not None else self._default_shipments()
+        self._shipment_watermarks: Dict[str, int] = {}
+        
+        # Per-component (events verified, last verified digest) chain watermarks, and
+        # the number of event attestations verified after the record signature
+        self._chain_watermarks = {}
+        self._signature_watermarks = {}
+        
+        # verify_component_authenticity results, invalidated by custody writes
+        self.verification_cache = VerificationCache(verification_cache_size, verification_cache_ttl)
+        
+        # Bloom filter over registered ids, rebuilt from the ledger on load:
+        # unregistered ids are rejected without a storage probe (None disables it).
+        # A read-only mapped ledger already answers a miss with one slot probe,
+        # so it gets no filter rather than a decode of every id at startup
+        self.id_filter_fp_rate = id_filter_fp_rate
+        self.id_filter: Optional[BloomFilter] = None
+        self.id_filter_rejections = 0
+        self._rebuild_id_filter()
+        
+        # Running report aggregates, kept current by register/add_custody_event
+        self._verified_state = {}
+        self._aggregates = {}
+        self.indexes = SecondaryIndex()
+        
+        # Merkle block layer, time index and assembly graph over custody events
+        self.blocks = self._default_blocks(block_size)
+        self.event_times = EventTimeIndex()
+        self.assembly = AssemblyGraph()
+        
+        # Point-in-time snapshots every ``snapshot_every`` writes and on close (durable
+        # storage only); writes replayed at startup count towards the next one
+        self.snapshot_every = snapshot_every
+        self.snapshot_on_close = snapshot_on_close
+        self._writes_since_snapshot = 0
+        
+        # Start from the latest snapshot plus the writes after it, else rebuild from the ledger.
+        # A read-only ledger defers this to the first report/index query, so an audit
+        # node that only verifies and tracks components never scans the whole file.
+        self._derived_ready = False
+        if not self.read_only:
+            self._ensure_derived_state()
+        
+        # Only seed the demo components into an empty ledger
+        if load_samples and not self.read_only and len(self.components_db) == 0:
+            self.initialize_sample_components()
+    
+    def _ensure_derived_state(self):
+        """Build aggregates, indexes, blocks, the time index and the assembly graph once"""
+        if self._derived_ready:
+            return
+        with self._shared_lock:
+            if self._derived_ready:
+                return
+            if not self._restore_snapshot():
+                self._rebuild_aggregates()
+                self.blocks.begin_replay()
+                for component in self.components_db.values():
+                    self._start_event_log(component.component_id)
+                    for event_index, event in enumerate(component.custody_chain):
+                        self._log_event(component.component_id, event_index, event)
+                self._writes_since_snapshot = len(self.components_db)
+            self.blocks.end_replay()
+            self._derived_ready = True
+    
+    def _default_keyring(self) -> ManufacturerKeyring:
+        """Keyring persisted beside a durable ledger, the exported public keys of a mapped one, else in memory"""
+        directory = getattr(self.components_db, "directory", None)
+        if directory:
+            return ManufacturerKeyring.load(os.path.join(directory, KEYRING_FILE))
+        path = getattr(self.components_db, "path", None)
+        if path and os.path.exists(path + PUBLIC_KEYS_SUFFIX):
+            return ManufacturerKeyring.load(path + PUBLIC_KEYS_SUFFIX)
+        return ManufacturerKeyring()
+    
+    def _default_shipments(self) -> ShipmentStore:
+        """Shipment log beside a durable ledger, the exported shipments of a mapped one, else in memory"""
+        directory = getattr(self.components_db, "directory", None)
+        if directory:
+            return ShipmentStore(os.path.join(directory, SHIPMENTS_FILE))
+        path = getattr(self.components_db, "path", None)
+        if path and os.path.exists(path + SHIPMENTS_SUFFIX):
+            return ShipmentStore(path + SHIPMENTS_SUFFIX, read_only=True)
+        return ShipmentStore()
+    
+    def _default_blocks(self, block_size: int) -> BlockBuilder:
+        """Block log beside a durable ledger, the exported blocks of a mapped one, else in memory"""
+        directory = getattr(self.components_db, "directory", None)
+        if directory:
+            return BlockBuilder(block_size, os.path.join(directory, BLOCKS_FILE))
+        path = getattr(self.components_db, "path", None)
+        if path and os.path.exists(path + BLOCKS_SUFFIX):
+            return BlockBuilder(block_size, path + BLOCKS_SUFFIX, read_only=True)
+        return BlockBuilder(block_size)
+    
+    def _rebuild_id_filter(self):
+        """Size a fresh filter for twice the registered ids and swap it in"""
+        if self.id_filter_fp_rate is None or self.read_only:
+            return
+        component_ids = list(self.components_db.keys())
+        self.id_filter = BloomFilter.from_keys(
+            component_ids, max(1024, 2 * len(component_ids)), self.id_filter_fp_rate
+        )
+    
+    def _known_unregistered(self, component_id: str) -> bool:
+        """True only when the id filter proves the component was never registered"""
+        if self.id_filter is None or component_id in self.id_filter:
+            return False
+        self.id_filter_rejections += 1
+        return True
+    
+    def id_filter_stats(self) -> Dict:
+        """Size, fill and rejection count of the registered-id Bloom filter"""
+        if self.id_filter is None:
+            return {"enabled": False}
+        return {"enabled": True, "rejections": self.id_filter_rejections, **self.id_filter.stats()}
+    
+    def _check_writable(self):
+        if self.read_only:
+            raise ValueError("Tracker is read-only (mapped ledger); writes go to the primary ledger")
     
     def generate_component_hash(self, component_data: str) -> str:
         """Generate SHA-256 hash for component verification"""
         return hashlib.sha256(component_data.encode()).hexdigest()
     
-    def generate_digital_signature(self, component_id: str, manufacturer: str) -> str:
-        """Generate digital signature for component authenticity"""
-        signature_data = f"{component_id}_{manufacturer}_{datetime.datetime.now().isoformat()}"
-        return hashlib.sha256(signature_data.encode()).hexdigest()[:32]
+    def generate_digital_signature(self, component: SupplyChainEntry) -> str:
+        """Ed25519 signature of the component record under its manufacturer's key"""
+        return self.keyring.sign(component.manufacturer, component_signing_message(component)).hex()
+    
+    def _attest_event(self, event: Dict, manufacturer: str):
+        """Add the Ed25519 attestation (and hash-based signature, if enabled) to a digested event"""
+        message = event_signing_message(event["signature"])
+        event["attestation"] = self.keyring.sign(manufacturer, message).hex()
+        if self.pq_signer is not None:
+            event["pq_signature"] = self.pq_signer.sign(message).hex()
     
     def initialize_sample_components(self):
         """Initialize sample components for demo"""
@@ -146,28 +468,47 @@ class SupplyChainTracker:
         for comp_data in sample_components:
             self.register_component(comp_data)
     
-    def register_component(self, component_data: Dict) -> SupplyChainEntry:
-        """Register a new component in the supply chain"""
+    def register_component(self, component_data: Dict, replace: bool = True) -> SupplyChainEntry:
+        """Register a new component in the supply chain
+        
+        An already registered id is re-registered with a fresh custody chain,
+        or rejected with DuplicateIdError when ``replace`` is False. Fields
+        are checked as for ingest_components; a bad one raises ValueError.
+        """
+        self._check_writable()
+        entry = self._build_entry(self._validate_manifest_row(component_data))
+        with self._component_lock(entry.component_id), self._shared_lock:
+            if not replace and entry.component_id in self.components_db:
+                raise DuplicateIdError(f"Component {entry.component_id} already exists")
+            self._store_components([entry])
+        return entry
+    
+    def _build_entry(self, component_data: Dict) -> SupplyChainEntry:
+        """Hash and sign a component record and create its genesis custody event"""
+        if component_data['manufacturer'] not in self.manufacturers_db:
+            raise ValueError(f"Unknown manufacturer: {component_data['manufacturer']}")
+        # Only a manufacturer listed in manufacturers_db gets a signing key
+        self.keyring.provision(component_data['manufacturer'])
+        
         # Generate verification hash
         hash_input = f"{component_data['component_id']}_{component_data['manufacturer']}_{component_data['batch_id']}"
         verification_hash = self.generate_component_hash(hash_input)
         
-        # Generate digital signature
-        digital_signature = self.generate_digital_signature(
-            component_data['component_id'], 
-            component_data['manufacturer']
-        )
-        
-        # Initialize custody chain
-        custody_chain = [{
+        # Initialize custody chain (genesis event links to the verification hash)
+        genesis_event = {
             "stage": "MANUFACTURING",
             "handler": component_data['manufacturer'],
             "timestamp": component_data['manufacturing_date'],
             "location": self.manufacturers_db[component_data['manufacturer']]['location'],
             "action": "COMPONENT_CREATED",
-            "verified_by": "QA_SYSTEM_AUTOMATED",
-            "signature": hashlib.sha256(f"MFG_{component_data['component_id']}".encode()).hexdigest()[:16]
-        }]
+            "verified_by": "QA_SYSTEM_AUTOMATED"
+        }
+        genesis_event["signature"] = compute_event_digest(
+            verification_hash, component_data['component_id'], genesis_event
+        )
+        self._attest_event(genesis_event, component_data['manufacturer'])
+        genesis_event = CustodyEvent.from_dict(genesis_event)
+        custody_chain = [genesis_event]
         
         # Create supply chain entry
         entry = SupplyChainEntry(
@@ -177,75 +518,862 @@ class SupplyChainTracker:
             manufacturing_date=component_data['manufacturing_date'],
             batch_id=component_data['batch_id'],
             verification_hash=verification_hash,
-            digital_signature=digital_signature,
+            digital_signature="",
             custody_chain=custody_chain,
             indigenous_certification=component_data['indigenous_certification'],
             security_clearance=component_data['security_clearance']
         )
         
-        self.components_db[component_data['component_id']] = entry
+        # Generate digital signature over the finished record
+        entry.digital_signature = self.generate_digital_signature(entry)
         return entry
     
-    def add_custody_event(self, component_id: str, event_data: Dict) -> bool:
-        """Add custody chain event for component tracking"""
-        if component_id not in self.components_db:
+    def _store_components(self, entries: List[SupplyChainEntry]):
+        """Write built entries in one storage batch and bring aggregates and indexes up to date"""
+        for entry in entries:
+            if entry.component_id in self.components_db:
+                self._untrack_component(self.components_db[entry.component_id])
+                self.verification_cache.invalidate(entry.component_id)
+                # The fresh chain starts outside every shipment the old record was in
+                self.shipments.release_component(entry.component_id)
+            elif self.id_filter is not None:
+                # Set before the write so a stored id is never rejected by the filter;
+                # a re-registered id is already in it and must not count twice
+                self.id_filter.add(entry.component_id)
+            self._chain_watermarks.pop(entry.component_id, None)
+        
+        self.components_db.put_components(entries)
+        if self.id_filter is not None and self.id_filter.saturated:
+            self._rebuild_id_filter()
+        
+        for entry in entries:
+            # We signed these records ourselves
+            self._signature_watermarks[entry.component_id] = len(entry.custody_chain)
+            self._track_component(entry)
+            self._start_event_log(entry.component_id)
+            self._log_event(entry.component_id, 0, entry.custody_chain[0])
+        self._count_writes(len(entries))
+    
+    def ingest_components(self, source: Union[str, os.PathLike, Iterable[Dict]], batch_size: int = 1000,
+                          max_errors: int = 1000) -> Dict:
+        """Stream components from a CSV/JSONL manifest (or an iterable of dicts) into the ledger
+        
+        Rows are parsed lazily, validated against manufacturers_db and
+        committed ``batch_size`` at a time, so memory stays flat however
+        large the manifest is. Invalid rows are skipped and reported with
+        their 1-based row number (only the first ``max_errors`` are kept).
+        Once the hash-based signing key runs out, every remaining row is
+        reported as failed.
+        """
+        self._check_writable()
+        started = time.perf_counter()
+        ingested = failed = rows = 0
+        errors = []
+        batch = {}
+        exhausted = None
+        
+        for row_number, row in enumerate(self._iter_manifest(source), 1):
+            rows += 1
+            try:
+                if exhausted is not None:
+                    raise exhausted
+                entry = self._build_entry(self._validate_manifest_row(row))
+            except (ValueError, KeyError, TypeError, KeyExhaustedError) as exc:
+                if isinstance(exc, KeyExhaustedError):
+                    # Rows already batched were signed; the rest are reported, not dropped
+                    exhausted = exc
+                failed += 1
+                if len(errors) < max_errors:
+                    errors.append({
+                        "row": row_number,
+                        "component_id": row.get('component_id') if isinstance(row, dict) else None,
+                        "error": str(exc)
+                    })
+                continue
+            
+            # A repeated id within one batch keeps its last row, as register_component would
+            batch.pop(entry.component_id, None)
+            batch[entry.component_id] = entry
+            ingested += 1
+            if len(batch) >= batch_size:
+                self._store_batch(batch)
+                batch = {}
+        
+        if batch:
+            self._store_batch(batch)
+        with self._shared_lock:
+            self.components_db.flush()
+        
+        elapsed = time.perf_counter() - started
+        return {
+            "rows": rows,
+            "ingested": ingested,
+            "failed": failed,
+            "errors": errors,
+            "elapsed_seconds": round(elapsed, 3),
+            "rows_per_second": round(rows / elapsed, 1) if elapsed > 0 else 0.0
+        }
+    
+    def _store_batch(self, batch: Dict[str, SupplyChainEntry]):
+        with self._component_locks(batch), self._shared_lock:
+            self._store_components(list(batch.values()))
+    
+    @staticmethod
+    def _iter_manifest(source) -> Iterator:
+        """Yield manifest rows one at a time from a .csv/.jsonl path or an iterable"""
+        if not isinstance(source, (str, os.PathLike)):
+            yield from source
+            return
+        
+        if os.fspath(source).lower().endswith(".csv"):
+            with open(source, newline="", encoding="utf-8") as f:
+                yield from csv.DictReader(f)
+            return
+        
+        with open(source, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as exc:
+                    yield exc
+    
+    def _validate_manifest_row(self, row) -> Dict:
+        """Check a manifest row (or register_component input) and normalise its types"""
+        if isinstance(row, Exception):
+            raise ValueError(f"Malformed row: {row}")
+        if not isinstance(row, dict):
+            raise TypeError(f"Expected an object per row, got {type(row).__name__}")
+        
+        missing = [name for name in _MANIFEST_FIELDS if row.get(name) in (None, "")]
+        if missing:
+            raise ValueError(f"Missing field(s): {', '.join(missing)}")
+        for name in _MANIFEST_FIELDS:
+            # JSONL rows can carry any JSON type; only the certification flag may be a boolean
+            if not isinstance(row[name], str) and not (
+                name == 'indigenous_certification' and isinstance(row[name], bool)
+            ):
+                raise ValueError(f"Invalid {name}: {row[name]!r}")
+        if row['manufacturer'] not in self.manufacturers_db:
+            raise ValueError(f"Unknown manufacturer: {row['manufacturer']}")
+        
+        component_data = {name: row[name] for name in _MANIFEST_FIELDS}
+        certification = component_data['indigenous_certification']
+        if isinstance(certification, str):
+            # CSV manifests carry booleans as text
+            normalized = certification.strip().lower()
+            if normalized not in ("true", "false", "1", "0", "yes", "no"):
+                raise ValueError(f"Invalid indigenous_certification: {certification}")
+            component_data['indigenous_certification'] = normalized in ("true", "1", "yes")
+        return component_data
+    
+    def add_custody_event(self, component_id: str, event_data: Dict, durable: bool = False) -> bool:
+        """Add custody chain event for component tracking
+        
+        With ``durable=True`` the call returns only once the event is fsynced
+        (group-committed with other writers); otherwise the storage backend's
+        batched fsync policy applies. Raises ValueError for a missing or
+        non-string event field.
+        """
+        self._check_writable()
+        self._validate_event_data(event_data)
+        if self._known_unregistered(component_id):
+            return False
+        # The shard lock keeps this component's chain tail fixed while the event is signed
+        with self._component_lock(component_id):
+            with self._shared_lock:
+                component = self.components_db.get(component_id)
+                if component is None:
+                    return False
+                chain_length = len(component.custody_chain)
+                previous_event = component.custody_chain[-1] if chain_length else None
+            
+            custody_event = self._sign_custody_event(component, previous_event, event_data)
+            
+            with self._shared_lock:
+                self._check_assembly_action(component_id, custody_event['action'])
+                token = self._append_custody_event(component_id, chain_length, custody_event)
+        
+        if durable:
+            # Outside every lock, so concurrent durable writers share one fsync
+            self.components_db.wait_durable(token)
+        return True
+    
+    def add_custody_events_bulk(self, events: Iterable[Tuple[str, Dict]], durable: bool = False,
+                                batch_size: int = 5000, max_errors: int = 1000) -> Dict:
+        """Append many (component_id, event_data) pairs, e.g. every move of a pallet run
+        
+        Pairs are validated in one pass and committed ``batch_size`` at a
+        time: each batch takes its shard locks once, signs every component's
+        new events as one chain segment, writes them in a single storage
+        append and updates indexes and aggregates once per component. Events
+        for one component keep their input order. Failed pairs are skipped
+        and reported by 0-based input position (only the first
+        ``max_errors`` are kept); a rejected event also fails the later
+        events for the same component in its batch, since they would chain
+        from it. Each batch checks the hash-based signing key first; once
+        it cannot sign a batch, that batch and every later pair fail with
+        the exhaustion error while earlier batches stay recorded. With
+        ``durable=True`` the call returns once everything recorded is fsynced.
+        """
+        self._check_writable()
+        started = time.perf_counter()
+        submitted = recorded = 0
+        errors = []
+        failed = [0]
+        token = None
+        
+        def fail(position: int, component_id, error: str):
+            failed[0] += 1
+            if len(errors) < max_errors:
+                errors.append({"index": position, "component_id": component_id, "error": error})
+        
+        exhausted = None
+        
+        def flush(batch):
+            nonlocal recorded, token, exhausted
+            try:
+                stored, token = self._append_event_batch(batch, fail, token)
+                recorded += stored
+            except KeyExhaustedError as exc:
+                # Nothing in this batch was stored
+                exhausted = str(exc)
+                for component_id, items in batch.items():
+                    for position, _ in items:
+                        fail(position, component_id, exhausted)
+        
+        batch = {}
+        pending = 0
+        for position, item in enumerate(events):
+            submitted += 1
+            try:
+                component_id, event_data = item
+                self._validate_event_data(event_data)
+            except (ValueError, TypeError) as exc:
+                fail(position, item[0] if isinstance(item, (tuple, list)) and item else None, str(exc))
+                continue
+            if exhausted is not None:
+                fail(position, component_id, exhausted)
+                continue
+            if self._known_unregistered(component_id):
+                fail(position, component_id, "Component not found")
+                continue
+            batch.setdefault(component_id, []).append((position, event_data))
+            pending += 1
+            if pending >= batch_size:
+                flush(batch)
+                batch, pending = {}, 0
+        if batch:
+            flush(batch)
+        
+        if durable:
+            self.components_db.wait_durable(token)
+        elapsed = time.perf_counter() - started
+        return {
+            "submitted": submitted,
+            "recorded": recorded,
+            "failed": failed[0],
+            "errors": errors,
+            "elapsed_seconds": round(elapsed, 3),
+            "events_per_second": round(submitted / elapsed, 1) if elapsed > 0 else 0.0
+        }
+    
+    @staticmethod
+    def _validate_event_data(event_data: Dict):
+        if not isinstance(event_data, dict):
+            raise TypeError(f"Expected an event dict, got {type(event_data).__name__}")
+        missing = [name for name in _EVENT_FIELDS if event_data.get(name) is None]
+        if missing:
+            raise ValueError(f"Missing field(s): {', '.join(missing)}")
+        for name in _EVENT_FIELDS + _OPTIONAL_EVENT_FIELDS:
+            if name in event_data and not isinstance(event_data[name], str):
+                raise ValueError(f"Invalid {name}: {event_data[name]!r}")
+    
+    def _append_event_batch(self, batch: Dict[str, List[Tuple[int, Dict]]], fail, token: Optional[int]):
+        """Sign and store one bulk batch; returns (events stored, latest durability token)"""
+        with self._component_locks(batch):
+            with self._shared_lock:
+                tails = {}
+                for component_id in list(batch):
+                    component = self.components_db.get(component_id)
+                    if component is None:
+                        for position, _ in batch.pop(component_id):
+                            fail(position, component_id, "Component not found")
+                        continue
+                    chain = component.custody_chain
+                    tails[component_id] = (component, len(chain), chain[-1] if chain else None)
+            
+            # One hash-based signature per component segment; check before spending any leaf
+            if self.pq_signer is not None and self.pq_signer.remaining < len(batch):
+                raise KeyExhaustedError(
+                    f"Hash-based signing key is exhausted ({self.pq_signer.remaining} signatures left, "
+                    f"batch needs {len(batch)})"
+                )
+            
+            # Chain each component's events from its current tail; attesting the segment's
+            # last digest covers the events before it, so it costs one signature
+            signed = {}
+            for component_id, items in batch.items():
+                component, _, previous_event = tails[component_id]
+                segment = signed[component_id] = []
+                last = len(items) - 1
+                for i, (position, event_data) in enumerate(items):
+                    previous_event = self._sign_custody_event(component, previous_event, event_data, attest=i == last)
+                    segment.append((position, previous_event))
+            
+            with self._shared_lock:
+                writes = []
+                # Assembly changes are only checked here; the graph takes them once the events are stored
+                staged = self.assembly.staged()
+                for component_id, segment in signed.items():
+                    for accepted, (position, event) in enumerate(segment):
+                        try:
+                            self._check_assembly_action(component_id, event['action'], staged)
+                        except ValueError as exc:
+                            fail(position, component_id, str(exc))
+                            for later, _ in segment[accepted + 1:]:
+                                fail(later, component_id, "Skipped: an earlier event for this component was rejected")
+                            del segment[accepted:]
+                            if segment:
+                                # The truncated segment needs its own attested tail
+                                position, tail = segment[-1]
+                                tail = dict(tail)
+                                try:
+                                    self._attest_event(tail, tails[component_id][0].manufacturer)
+                                except KeyExhaustedError as exc:
+                                    for earlier, _ in segment:
+                                        fail(earlier, component_id, str(exc))
+                                    del writes[len(writes) - len(segment):]
+                                    del segment[:]
+                                    break
+                                segment[-1] = (position, CustodyEvent.from_dict(tail))
+                                writes[-1] = (component_id, segment[-1][1])
+                            break
+                        # Later installs in this batch are checked against the graph including this one
+                        staged.apply(component_id, event['action'])
+                        writes.append((component_id, event))
+                if not writes:
+                    return 0, token
+                
+                token = self.components_db.append_events(writes) or token
+                for component_id, segment in signed.items():
+                    if segment:
+                        self._record_appended_events(
+                            component_id, tails[component_id][1], [event for _, event in segment]
+                        )
+                self._count_writes(len(writes))
+        return len(writes), token
+    
+    def _record_appended_events(self, component_id: str, chain_length: int, events: List[CustodyEvent]):
+        """Bring caches, indexes, watermarks and aggregates up to date after stored appends (shared lock held)"""
+        self.verification_cache.invalidate(component_id)
+        for offset, event in enumerate(events):
+            self._log_event(component_id, chain_length + offset, event)
+        
+        self.indexes.assign(component_id, "stage", self._current_stage(component_id, events[-1]))
+        
+        # We built these links ourselves, so a fully verified chain stays fully verified
+        new_length = chain_length + len(events)
+        watermark = self._chain_watermarks.get(component_id)
+        if watermark is not None and watermark[0] == chain_length:
+            self._chain_watermarks[component_id] = (new_length, events[-1]["signature"])
+        if self._signature_watermarks.get(component_id) == chain_length:
+            self._signature_watermarks[component_id] = new_length
+        
+        # Signed events keep a verified chain verified; otherwise re-evaluate
+        if not self._verified_state[component_id]:
+            self._set_verified(component_id, self._is_authentic(self.components_db[component_id]))
+    
+    def create_shipment(self, shipment_id: str, component_ids: Iterable[str], handler: str, location: str,
+                        verified_by: str = 'SYSTEM_AUTOMATED', timestamp: Optional[str] = None) -> Dict:
+        """Pack components into a shipment (pallet, container) whose custody events they all inherit
+        
+        The manifest (naming ``handler``) is hashed and signed with the
+        tracker's shipment key (SHIPMENT_SIGNER) along with a
+        SHIPMENT_PACKED event; later moves go to ``add_shipment_event`` once
+        for the whole shipment, until ``close_shipment``. Raises ValueError
+        for a non-string field, a duplicate shipment id, an empty or repeated
+        manifest, unregistered components or components already in an open
+        shipment.
+        """
+        self._check_writable()
+        if isinstance(component_ids, str):
+            raise ValueError("component_ids must be a list of ids, not a string")
+        members = list(component_ids)
+        for name, value in (("shipment_id", shipment_id), ("handler", handler), ("location", location)):
+            if not isinstance(value, str):
+                raise ValueError(f"Invalid {name}: {value!r}")
+        if not all(isinstance(member, str) for member in members):
+            raise ValueError("Component ids must be strings")
+        if not members:
+            raise ValueError("A shipment needs at least one component")
+        if len(set(members)) != len(members):
+            raise ValueError("Shipment manifest lists a component more than once")
+        created_at = timestamp or datetime.datetime.now().isoformat()
+        
+        with self._shared_lock:
+            if shipment_id in self.shipments:
+                raise DuplicateIdError(f"Shipment {shipment_id} already exists")
+            unknown = [cid for cid in members if self._known_unregistered(cid) or cid not in self.components_db]
+            if unknown:
+                raise ValueError(f"Unregistered component(s): {self._id_list(unknown)}")
+            busy = [cid for cid in members if self._open_shipment(cid) is not None]
+            if busy:
+                raise ValueError(f"Already in an open shipment: {self._id_list(busy)}")
+            
+            manifest_hash = compute_manifest_hash(shipment_id, handler, created_at, members)
+            shipment = Shipment(shipment_id, handler, created_at, members, manifest_hash, "", [])
+            self.keyring.provision(SHIPMENT_SIGNER)
+            shipment.digital_signature = self.keyring.sign(SHIPMENT_SIGNER, shipment_signing_message(shipment)).hex()
+            shipment.custody_chain.append(self._chain_event(shipment_id, manifest_hash, SHIPMENT_SIGNER, {
+                "stage": "DISTRIBUTION",
+                "handler": handler,
+                "timestamp": created_at,
+                "location": location,
+                "action": SHIPMENT_PACKED,
+                "verified_by": verified_by
+            }))
+            self.shipments.put_shipment(shipment)
+            self._restage_members(shipment)
+            return self._shipment_summary(shipment)
+    
+    def add_shipment_event(self, shipment_id: str, event_data: Dict) -> bool:
+        """Record one custody event (e.g. a pallet move) for every component in an open shipment"""
+        self._validate_event_data(event_data)
+        if event_data['action'] in (SHIPMENT_PACKED, SHIPMENT_UNPACKED):
+            raise ValueError(f"{event_data['action']} is recorded by create_shipment/close_shipment")
+        if event_data['action'].startswith((INSTALLED_INTO, REMOVED_FROM)):
+            raise ValueError("Assembly changes are recorded on the component, not its shipment")
+        return self._append_shipment_event(shipment_id, event_data)
+    
+    def close_shipment(self, shipment_id: str, handler: str, location: str,
+                       verified_by: str = 'SYSTEM_AUTOMATED') -> bool:
+        """Unpack a shipment: members inherit nothing recorded for it afterwards"""
+        return self._append_shipment_event(shipment_id, {
+            "stage": "DISTRIBUTION",
+            "handler": handler,
+            "location": location,
+            "action": SHIPMENT_UNPACKED,
+            "verified_by": verified_by
+        })
+    
+    def _append_shipment_event(self, shipment_id: str, event_data: Dict) -> bool:
+        self._check_writable()
+        with self._shared_lock:
+            shipment = self.shipments.get(shipment_id)
+            if shipment is None:
+                return False
+            if shipment.closed:
+                raise ValueError(f"Shipment {shipment_id} is closed")
+            event = self._chain_event(
+                shipment_id, shipment.custody_chain[-1]['signature'], SHIPMENT_SIGNER, event_data
+            )
+            self.shipments.append_event(shipment_id, event)
+            self._restage_members(shipment)
+        return True
+    
+    def get_shipment(self, shipment_id: str) -> Optional[Dict]:
+        """Shipment manifest, status and custody chain as plain data (None if unknown)"""
+        with self._shared_lock:
+            shipment = self.shipments.get(shipment_id)
+            if shipment is None:
+                return None
+            summary = self._shipment_summary(shipment)
+            summary["members"] = list(shipment.members)
+            summary["custody_chain"] = [dict(event) for event in shipment.custody_chain]
+            summary["verified"] = self._verify_shipment(shipment)
+        return summary
+    
+    @staticmethod
+    def _shipment_summary(shipment: Shipment) -> Dict:
+        return {
+            "shipment_id": shipment.shipment_id,
+            "handler": shipment.handler,
+            "created_at": shipment.created_at,
+            "component_count": len(shipment.members),
+            "manifest_hash": shipment.manifest_hash,
+            "status": "CLOSED" if shipment.closed else "OPEN",
+            "custody_events": len(shipment.custody_chain)
+        }
+    
+    @staticmethod
+    def _id_list(component_ids: List[str], limit: int = 10) -> str:
+        shown = ", ".join(component_ids[:limit])
+        return shown if len(component_ids) <= limit else f"{shown} (+{len(component_ids) - limit} more)"
+    
+    def _open_shipment(self, component_id: str) -> Optional[str]:
+        for shipment_id in reversed(self.shipments.shipments_of(component_id)):
+            if not self.shipments.get(shipment_id).closed:
+                return shipment_id
+        return None
+    
+    def _verify_shipment(self, shipment: Shipment) -> bool:
+        """Check a shipment's manifest, record signature and the chain events not yet verified (shared lock held)"""
+        chain = shipment.custody_chain
+        verified = self._shipment_watermarks.get(shipment.shipment_id)
+        if verified is not None and verified > len(chain):
+            verified = None
+        valid = self._shipment_tail_valid(shipment, verified, chain[verified or 0:])
+        self._publish_shipment_watermark(shipment, len(chain), valid)
+        return valid
+    
+    def _publish_shipment_watermark(self, shipment: Shipment, verified: int, valid: bool):
+        if not valid:
+            self._shipment_watermarks.pop(shipment.shipment_id, None)
+        elif self._shipment_watermarks.get(shipment.shipment_id, 0) < verified:
+            self._shipment_watermarks[shipment.shipment_id] = verified
+    
+    def _shipment_tail_valid(self, shipment: Shipment, verified: Optional[int], unverified: List) -> bool:
+        """Check the events after the first ``verified`` (plus manifest and record signature when None)"""
+        chain = shipment.custody_chain
+        if not unverified and verified is not None:
+            return True
+        
+        if verified is None:
+            manifest_hash = compute_manifest_hash(
+                shipment.shipment_id, shipment.handler, shipment.created_at, shipment.members
+            )
+            if not chain or manifest_hash != shipment.manifest_hash:
+                return False
+            previous_digest, record_message = manifest_hash, shipment_signing_message(shipment)
+        else:
+            previous_digest, record_message = chain[verified - 1]['signature'], None
+        
+        if not verify_chain_segment(previous_digest, shipment.shipment_id, unverified):
             return False
+        items = _signed_items(SHIPMENT_SIGNER, record_message, shipment.digital_signature, unverified)
+        return all(self.keyring.verify_batch(items)) and _pq_signatures_valid(self.pq_public_key, unverified)
+    
+    def _inherited_events(self, component_id: str) -> List[Tuple[Dict, str]]:
+        """(event, shipment_id) pairs a component inherits from its shipments, oldest shipment first"""
+        inherited = []
+        for shipment_id in self.shipments.shipments_of(component_id):
+            inherited.extend((event, shipment_id) for event in self.shipments.get(shipment_id).custody_chain)
+        return inherited
+    
+    def _custody_timeline(self, component: SupplyChainEntry) -> List[Tuple[Dict, Optional[str]]]:
+        """(event, shipment_id or None) for a component's own and inherited events, merged by time"""
+        own = [(event, None) for event in component.custody_chain]
+        inherited = self._inherited_events(component.component_id)
+        if not inherited:
+            return own
+        return list(heapq.merge(own, inherited, key=_timeline_key))
+    
+    def iter_custody_events(self, component_id: str, newest_first: bool = True,
+                            stages: Optional[Iterable[str]] = None, start: Optional[int] = None
+                            ) -> Optional[Iterator[Tuple[int, Dict, Optional[str]]]]:
+        """Lazily walk a component's custody timeline as (position, event, shipment_id or None)
+        
+        Positions number the merged timeline (own and shipment events, as in
+        get_component_tracking) from 0 for the oldest event; chains only grow
+        at the end, so a position stays valid as a resume point. ``start``
+        is the first position to yield, ``stages`` keeps only those stages.
+        Only the events walked are read, so a page of a long chain costs the
+        page (chains with shipment events first place the shipment events by
+        time). None if the component is unknown.
+        """
+        if self._known_unregistered(component_id):
+            return None
+        with self._shared_lock:
+            component = self.components_db.get(component_id)
+            if component is None:
+                return None
+            # Snapshot the lengths: events appended later are left for the next walk
+            chain = component.custody_chain
+            count = len(chain)
+            inherited = self._inherited_events(component_id)
+        stages = None if stages is None else frozenset([stages] if isinstance(stages, str) else stages)
+        return self._walk_timeline(chain, count, inherited, newest_first, stages, start)
+    
+    @staticmethod
+    def _walk_timeline(chain, count: int, inherited: List[Tuple[Dict, str]], newest_first: bool,
+                       stages: Optional[frozenset], start: Optional[int]) -> Iterator[Tuple[int, Dict, Optional[str]]]:
+        # before[j]: own events ahead of inherited event j in the merged timeline
+        before = []
+        if inherited:
+            own_seen = 0
+            own = ((chain[i], None) for i in range(count))
+            for _, shipment_id in heapq.merge(own, inherited, key=_timeline_key):
+                if shipment_id is None:
+                    own_seen += 1
+                else:
+                    before.append(own_seen)
+        total = count + len(inherited)
+        if start is None:
+            start = total - 1 if newest_first else 0
+        start = max(-1, min(start, total - 1 if newest_first else total))
+        
+        # i, j: own and inherited events ahead of the walk position
+        j = bisect.bisect_left([own_ahead + index for index, own_ahead in enumerate(before)], start)
+        i = start - j
+        if newest_first:
+            # Position ``start`` itself is yielded first
+            if start >= 0 and j < len(before) and before[j] + j == start:
+                j += 1
+            else:
+                i += 1
+            position = start
+            while position >= 0:
+                if j and before[j - 1] >= i:
+                    j -= 1
+                    event, shipment_id = inherited[j]
+                else:
+                    i -= 1
+                    event, shipment_id = chain[i], None
+                if stages is None or event['stage'] in stages:
+                    yield position, event, shipment_id
+                position -= 1
+        else:
+            position = max(start, 0)
+            i = position - j
+            while position < total:
+                if j < len(before) and before[j] <= i:
+                    event, shipment_id = inherited[j]
+                    j += 1
+                else:
+                    event, shipment_id = chain[i], None
+                    i += 1
+                if stages is None or event['stage'] in stages:
+                    yield position, event, shipment_id
+                position += 1
+    
+    def get_custody_page(self, component_id: str, limit: int = 50, cursor: Optional[int] = None,
+                         newest_first: bool = True, stages: Optional[Iterable[str]] = None) -> Optional[Dict]:
+        """One page of a component's custody timeline as plain data (None if the component is unknown)
         
-        component = self.components_db[component_id]
+        Pass the returned ``next_cursor`` back as ``cursor`` for the next
+        page; it is None once the timeline is exhausted. Events carry their
+        timeline ``position`` and, when inherited, their ``shipment_id``.
+        """
+        if limit < 1:
+            raise ValueError(f"limit must be at least 1, got {limit}")
+        walk = self.iter_custody_events(component_id, newest_first, stages, cursor)
+        if walk is None:
+            return None
+        # One match past the page tells whether there is a next page and where it starts
+        rows = list(itertools.islice(walk, limit + 1))
+        next_cursor = rows.pop()[0] if len(rows) > limit else None
+        events = []
+        for position, event, shipment_id in rows:
+            record = dict(event, position=position)
+            if shipment_id:
+                record["shipment_id"] = shipment_id
+            events.append(record)
+        return {
+            "component_id": component_id,
+            "order": "newest_first" if newest_first else "oldest_first",
+            "events": events,
+            "next_cursor": next_cursor
+        }
+    
+    def install_component(self, component_id: str, assembly_id: str, handler: str, location: str,
+                          verified_by: str = 'SYSTEM_AUTOMATED', durable: bool = False) -> bool:
+        """Record installing a component into an assembly (e.g. a processor onto a PCB)
         
-        # Generate event signature
-        event_signature = hashlib.sha256(
-            f"{component_id}_{event_data['stage']}_{event_data['timestamp']}".encode()
-        ).hexdigest()[:16]
+        The edge is an INSTALLATION custody event on the part itself, so it is
+        signed and hash-chained like any other event. Raises ValueError if the
+        assembly is unknown, the part is already installed elsewhere, or the
+        install would make an assembly contain itself.
+        """
+        return self.add_custody_event(component_id, {
+            "stage": "INSTALLATION",
+            "handler": handler,
+            "location": location,
+            "action": INSTALLED_INTO + assembly_id,
+            "verified_by": verified_by
+        }, durable=durable)
+    
+    def uninstall_component(self, component_id: str, handler: str, location: str,
+                            verified_by: str = 'SYSTEM_AUTOMATED', durable: bool = False) -> bool:
+        """Record removing a component from the assembly it is installed in"""
+        with self._shared_lock:
+            assembly_id = self.assembly.parent(component_id)
+        if assembly_id is None:
+            if self.components_db.get(component_id) is None:
+                return False
+            raise ValueError(f"{component_id} is not installed in an assembly")
+        return self.add_custody_event(component_id, {
+            "stage": "MAINTENANCE",
+            "handler": handler,
+            "location": location,
+            "action": REMOVED_FROM + assembly_id,
+            "verified_by": verified_by
+        }, durable=durable)
+    
+    def _check_assembly_action(self, component_id: str, action: str,
+                               graph: Union[AssemblyGraph, StagedAssembly, None] = None):
+        """Reject an install/removal event that would corrupt the assembly graph (shared lock held)
         
+        ``graph`` is the assembly graph or a staged overlay of it to check against.
+        """
+        if graph is None:
+            graph = self.assembly
+        if action.startswith(INSTALLED_INTO):
+            assembly_id = action[len(INSTALLED_INTO):]
+            if self.components_db.get(assembly_id) is None:
+                raise ValueError(f"Unknown assembly: {assembly_id}")
+            current = graph.parent(component_id)
+            if current is not None:
+                raise ValueError(f"{component_id} is already installed in {current}")
+            if assembly_id == component_id or component_id in graph.ancestors(assembly_id):
+                raise ValueError(f"Installing {component_id} into {assembly_id} would create a cycle")
+        elif action.startswith(REMOVED_FROM):
+            assembly_id = action[len(REMOVED_FROM):]
+            if graph.parent(component_id) != assembly_id:
+                raise ValueError(f"{component_id} is not installed in {assembly_id}")
+    
+    def get_assembly(self, component_id: str) -> Optional[Dict]:
+        """Where a component is installed and what is installed in it (None if unknown)"""
+        self._ensure_derived_state()
+        with self._shared_lock:
+            if self.components_db.get(component_id) is None:
+                return None
+            ancestors = self.assembly.ancestors(component_id)
+            return {
+                "component_id": component_id,
+                "installed_in": ancestors[0] if ancestors else None,
+                "top_level_unit": ancestors[-1] if ancestors else component_id,
+                "enclosing_assemblies": ancestors,
+                "parts": sorted(self.assembly.children(component_id)),
+                "all_parts": sorted(self.assembly.descendants(component_id))
+            }
+    
+    def units_containing(self, component_ids: Iterable[str], stage: Optional[str] = None) -> List[str]:
+        """Top-level units containing any of the given components, optionally only those at ``stage``
+        
+        A component not installed anywhere counts as its own unit.
+        """
+        self._ensure_derived_state()
+        with self._shared_lock:
+            units = self.assembly.roots_containing(component_ids)
+            if stage is not None:
+                units &= self.indexes.find(stage=stage)
+            return sorted(units)
+    
+    def recall_batch(self, batch_id: str, stage: Optional[str] = None) -> List[str]:
+        """Every top-level unit containing any part from a batch, e.g. ``recall_batch(b, stage="OPERATIONAL")``"""
+        self._ensure_derived_state()
+        with self._shared_lock:
+            parts = self.indexes.find(batch_id=batch_id)
+        return self.units_containing(parts, stage)
+    
+    def _sign_custody_event(self, component: SupplyChainEntry, previous_event: Optional[Dict],
+                            event_data: Dict, attest: bool = True) -> CustodyEvent:
+        """Build a custody event chained to the component's current last event
+        
+        ``attest=False`` leaves it to a later event of the same bulk segment
+        to carry the attestation that covers it.
+        """
+        previous_digest = previous_event['signature'] if previous_event else component.verification_hash
+        return self._chain_event(component.component_id, previous_digest, component.manufacturer, event_data, attest)
+    
+    def _chain_event(self, owner_id: str, previous_digest: str, signer: str, event_data: Dict,
+                     attest: bool = True) -> CustodyEvent:
+        """Build a custody event for a component or shipment, chained to ``previous_digest``"""
         custody_event = {
             "stage": event_data['stage'],
             "handler": event_data['handler'],
             "timestamp": event_data.get('timestamp', datetime.datetime.now().isoformat()),
             "location": event_data['location'],
             "action": event_data['action'],
-            "verified_by": event_data.get('verified_by', 'SYSTEM_AUTOMATED'),
-            "signature": event_signature
+            "verified_by": event_data.get('verified_by', 'SYSTEM_AUTOMATED')
         }
         
-        component.custody_chain.append(custody_event)
-        return True
+        # Generate event signature, committing to the previous event's digest, and attest it
+        custody_event["signature"] = compute_event_digest(previous_digest, owner_id, custody_event)
+        if attest:
+            self._attest_event(custody_event, signer)
+        return CustodyEvent.from_dict(custody_event)
     
-    def verify_component_authenticity(self, component_id: str) -> Dict:
-        """Verify component authenticity and supply chain integrity"""
-        if component_id not in self.components_db:
-            return {
-                "component_id": component_id,
-                "verification_status": "COMPONENT_NOT_FOUND",
-                "authentic": False,
-                "indigenous": False,
-                "security_cleared": False,
-                "chain_integrity": False,
-                "error": "Component not registered in database"
-            }
+    def _append_custody_event(self, component_id: str, chain_length: int,
+                              custody_event: CustodyEvent) -> Optional[int]:
+        """Store a signed event and update aggregates and indexes (shared lock held)
         
-        component = self.components_db[component_id]
+        Returns the storage durability token for the event.
+        """
+        token = self.components_db.append_event(component_id, custody_event)
+        self._record_appended_events(component_id, chain_length, [custody_event])
+        self._count_writes(1)
+        return token
+    
+    def verify_component_authenticity(self, component_id: str, full_chain: bool = False) -> Dict:
+        """Verify component authenticity and supply chain integrity
         
-        # Verify hash integrity
-        hash_input = f"{component.component_id}_{component.manufacturer}_{component.batch_id}"
-        expected_hash = self.generate_component_hash(hash_input)
-        hash_valid = expected_hash == component.verification_hash
+        Results are cached per (component, chain length) until a custody
+        write invalidates them. Otherwise only custody events appended since
+        the last successful check are re-hashed; pass ``full_chain=True`` to
+        bypass the cache and re-walk the whole hash chain. Events inherited
+        from the component's shipments are verified once per shipment and
+        count towards ``custody_events``. Unregistered ids are usually
+        answered from the id filter without touching storage.
         
-        # Verify manufacturer authenticity  
-        manufacturer_valid = component.manufacturer in self.manufacturers_db
+        The shared lock is only held to snapshot the unverified chain tails
+        and watermarks and to publish the advanced watermarks afterwards;
+        hashing and signature checks run outside it, so concurrent calls
+        for different components proceed in parallel.
+        """
+        if self._known_unregistered(component_id):
+            return self._not_found_result(component_id)
         
-        # Verify indigenous certification
-        indigenous_valid = component.indigenous_certification
+        with self._shared_lock:
+            component = self.components_db.get(component_id)
+            if component is None:
+                return self._not_found_result(component_id)
+            chain = component.custody_chain
+            chain_length = len(chain)
+            shipments = [self.shipments.get(sid) for sid in self.shipments.shipments_of(component_id)]
+            # Cached per own + inherited event count, so a shipment move retires every member's entry
+            history_length = chain_length + sum(len(shipment.custody_chain) for shipment in shipments)
+            if not full_chain:
+                cached = self.verification_cache.get(component_id, history_length)
+                if cached is not None:
+                    return self._copy_verification(cached)
+            
+            # Work still to do: events past each watermark (everything with full_chain)
+            chain_mark = None if full_chain else self._chain_watermarks.get(component_id)
+            if chain_mark is None or chain_mark[0] > chain_length:
+                chain_mark = (0, component.verification_hash)
+            signature_mark = None if full_chain else self._signature_watermarks.get(component_id)
+            if signature_mark is not None and signature_mark > chain_length:
+                signature_mark = None
+            chain_tail = chain[chain_mark[0]:]
+            signature_tail = chain_tail if signature_mark == chain_mark[0] else chain[signature_mark or 0:]
+            shipment_work = []
+            for shipment in shipments:
+                shipment_mark = None if full_chain else self._shipment_watermarks.get(shipment.shipment_id)
+                if shipment_mark is not None and shipment_mark > len(shipment.custody_chain):
+                    shipment_mark = None
+                shipment_work.append((shipment, shipment_mark, shipment.custody_chain[shipment_mark or 0:]))
+            last_events = [(chain[-1], None)] if chain else []
+            last_events.extend((shipment.custody_chain[-1], shipment.shipment_id)
+                               for shipment in shipments if shipment.custody_chain)
+            last_event = max(last_events, key=_timeline_key)[0] if last_events else None
         
-        # Verify custody chain integrity
-        chain_valid = len(component.custody_chain) > 0 and all(
-            'signature' in event for event in component.custody_chain
+        hash_valid, manufacturer_valid = _check_identity(
+            component_id, component.manufacturer, component.batch_id,
+            component.verification_hash, self.manufacturers_db
         )
+        chain_valid = chain_length > 0 and verify_chain_segment(chain_mark[1], component_id, chain_tail)
+        signature_valid = self._signatures_valid(component, signature_mark is None, signature_tail)
+        shipment_results = [
+            (shipment, (shipment_mark or 0) + len(tail), self._shipment_tail_valid(shipment, shipment_mark, tail))
+            for shipment, shipment_mark, tail in shipment_work
+        ]
+        shipments_valid = all(valid for _, _, valid in shipment_results)
+        
+        with self._shared_lock:
+            self._publish_watermarks(component, chain_length, chain_valid, signature_valid)
+            for shipment, verified, valid in shipment_results:
+                self._publish_shipment_watermark(shipment, verified, valid)
+        
+        # Verify indigenous certification
+        indigenous_valid = component.indigenous_certification
         
         # Overall verification
-        overall_authentic = hash_valid and manufacturer_valid and chain_valid
+        overall_authentic = hash_valid and manufacturer_valid and chain_valid and signature_valid and shipments_valid
         
-        return {
+        result = {
             "component_id": component_id,
             "component_name": component.component_name,
             "manufacturer": self.manufacturers_db.get(component.manufacturer, {}).get('name', 'UNKNOWN'),
@@ -257,34 +1385,422 @@ class SupplyChainTracker:
             "security_clearance": component.security_clearance,
             "chain_integrity": chain_valid,
             "hash_verification": hash_valid,
-            "custody_events": len(component.custody_chain),
+            "signature_verification": signature_valid,
+            "shipment_verification": shipments_valid,
+            "custody_events": history_length,
+            "inherited_events": history_length - chain_length,
+            "shipments": [shipment.shipment_id for shipment in shipments],
             "manufacturing_date": component.manufacturing_date,
             "batch_id": component.batch_id,
-            "last_update": component.custody_chain[-1]['timestamp'] if component.custody_chain else "N/A",
+            "last_update": last_event['timestamp'] if last_event else "N/A",
             "verification_hash": component.verification_hash[:16] + "..."
         }
+        
+        with self._shared_lock:
+            self.verification_cache.put(component_id, history_length, result)
+        return self._copy_verification(result)
     
-    def get_supply_chain_report(self) -> Dict:
-        """Generate comprehensive supply chain report"""
-        total_components = len(self.components_db)
-        verified_components = sum(
-            1 for comp_id in self.components_db 
-            if self.verify_component_authenticity(comp_id)['authentic']
+    @staticmethod
+    def _copy_verification(result: Dict) -> Dict:
+        """A caller's copy of a cached result; the shipments list is copied too"""
+        return dict(result, shipments=list(result["shipments"]))
+    
+    def _signatures_valid(self, component: SupplyChainEntry, check_record: bool, events: List) -> bool:
+        """Batch-verify the record signature (when ``check_record``) and the given events' signatures"""
+        items = _signed_items(
+            component.manufacturer,
+            component_signing_message(component) if check_record else None,
+            component.digital_signature,
+            events
+        )
+        return all(self.keyring.verify_batch(items)) and _pq_signatures_valid(self.pq_public_key, events)
+    
+    def _publish_watermarks(self, component: SupplyChainEntry, verified: int, chain_valid: bool,
+                            signature_valid: bool):
+        """Record a check of ``component``'s first ``verified`` events (shared lock held)
+        
+        A failed check drops the watermarks so the next call starts from
+        genesis. A passed one only advances them, and only while the stored
+        chain still holds the verified events (not re-registered meanwhile).
+        """
+        component_id = component.component_id
+        if not chain_valid:
+            self._chain_watermarks.pop(component_id, None)
+        if not signature_valid:
+            self._signature_watermarks.pop(component_id, None)
+        current = self.components_db.get(component_id)
+        if current is None or current.digital_signature != component.digital_signature:
+            return
+        chain = current.custody_chain
+        if not verified or len(chain) < verified:
+            return
+        last_digest = component.custody_chain[verified - 1]['signature']
+        if chain[verified - 1]['signature'] != last_digest:
+            return
+        if chain_valid and self._chain_watermarks.get(component_id, (0,))[0] < verified:
+            self._chain_watermarks[component_id] = (verified, last_digest)
+        if signature_valid and self._signature_watermarks.get(component_id, 0) < verified:
+            self._signature_watermarks[component_id] = verified
+    
+    @staticmethod
+    def _not_found_result(component_id: str) -> Dict:
+        return {
+            "component_id": component_id,
+            "verification_status": "COMPONENT_NOT_FOUND",
+            "authentic": False,
+            "indigenous": False,
+            "security_cleared": False,
+            "chain_integrity": False,
+            "error": "Component not registered in database"
+        }
+    
+    def verification_cache_stats(self) -> Dict:
+        """Hit/miss/eviction counters of the verification result cache"""
+        with self._shared_lock:
+            return self.verification_cache.stats()
+    
+    def verify_many(self, component_ids: Iterable[str], workers: Optional[int] = None,
+                    chunk_size: int = 2048, as_iterator: bool = False
+                    ) -> Union[List[VerificationResult], Iterator[VerificationResult]]:
+        """Verify a whole shipment, fanning hash and chain checks across a process pool
+        
+        Results come back in input order as compact VerificationResult tuples.
+        Each chunk's Ed25519 signatures are checked in one batch verification;
+        shipments the components inherit events from are checked here, once each.
+        ``workers`` defaults to the CPU count; ``workers=1`` verifies in-process.
+        With ``as_iterator=True`` results are yielded chunk by chunk and only a
+        bounded number of chunks are in flight at once.
+        """
+        results = self._iter_verify_many(component_ids, workers or os.cpu_count() or 1, max(1, chunk_size))
+        if len(self.shipments):
+            results = self._check_shipments(results)
+        return results if as_iterator else list(results)
+    
+    def _check_shipments(self, results: Iterator[VerificationResult]) -> Iterator[VerificationResult]:
+        """Fail results whose inherited shipment events do not verify (each shipment checked once)"""
+        for result in results:
+            shipment_ids = self.shipments.shipments_of(result.component_id)
+            if shipment_ids:
+                with self._shared_lock:
+                    valid = all([self._verify_shipment(self.shipments.get(sid)) for sid in shipment_ids])
+                if not valid:
+                    result = result._replace(authentic=False, shipments_valid=False)
+            yield result
+    
+    def _iter_verify_many(self, component_ids: Iterable[str], workers: int,
+                          chunk_size: int) -> Iterator[VerificationResult]:
+        manufacturers = frozenset(self.manufacturers_db)
+        public_keys = self.keyring.public_keys()
+        
+        if workers <= 1:
+            for chunk in self._verification_chunks(component_ids, chunk_size):
+                yield from self._unpack_results(chunk, _verify_chunk(manufacturers, public_keys, self.pq_public_key, chunk[2]))
+            return
+        
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            in_flight = deque()
+            for chunk in self._verification_chunks(component_ids, chunk_size):
+                in_flight.append((chunk, pool.submit(_verify_chunk, manufacturers, public_keys, self.pq_public_key, chunk[2])))
+                if len(in_flight) >= workers * 2:
+                    done_chunk, future = in_flight.popleft()
+                    yield from self._unpack_results(done_chunk, future.result())
+            while in_flight:
+                done_chunk, future = in_flight.popleft()
+                yield from self._unpack_results(done_chunk, future.result())
+    
+    def _verification_chunks(self, component_ids: Iterable[str], chunk_size: int):
+        """Yield (ordered ids, found flags, rows for registered ids) chunks for the verification workers"""
+        ids, found, rows = [], [], []
+        for component_id in component_ids:
+            ids.append(component_id)
+            if self._known_unregistered(component_id):
+                component = None
+            else:
+                with self._shared_lock:
+                    component = self.components_db.get(component_id)
+                    # Snapshot the chain so concurrent appends cannot race the worker pickling
+                    custody_chain = tuple(component.custody_chain) if component is not None else None
+            found.append(component is not None)
+            if component is not None:
+                rows.append((
+                    component.component_id, component.manufacturer, component.batch_id,
+                    component.verification_hash, custody_chain,
+                    component.indigenous_certification,
+                    component_signing_message(component), component.digital_signature
+                ))
+            if len(ids) >= chunk_size:
+                yield ids, found, rows
+                ids, found, rows = [], [], []
+        if ids:
+            yield ids, found, rows
+    
+    @staticmethod
+    def _unpack_results(chunk, flags: bytes) -> Iterator[VerificationResult]:
+        """Expand worker flag bytes into results, with not-found entries back in input order"""
+        ids, found, _ = chunk
+        position = 0
+        for component_id, registered in zip(ids, found):
+            if not registered:
+                yield VerificationResult(component_id, False, False, False, False, False, False)
+                continue
+            flag = flags[position]
+            position += 1
+            yield VerificationResult(
+                component_id, True, bool(flag & _FLAG_AUTHENTIC), bool(flag & _FLAG_HASH),
+                bool(flag & _FLAG_CHAIN), bool(flag & _FLAG_INDIGENOUS), bool(flag & _FLAG_SIGNATURE)
+            )
+    
+    def _start_event_log(self, component_id: str):
+        """Reset per-component event bookkeeping for a newly (re-)registered component"""
+        self.blocks.reset_component(component_id)
+        self.event_times.reset_component(component_id)
+        self.assembly.detach(component_id)
+    
+    def _log_event(self, component_id: str, event_index: int, event: Dict):
+        """Feed a stored custody event to the block layer, time index and assembly graph"""
+        self.blocks.add_event(component_id, event['signature'])
+        self.event_times.add(component_id, event_index, event.epoch, event['location'])
+        self.assembly.apply(component_id, event['action'])
+    
+    def find_events(self, start, end, location: Optional[str] = None) -> List[Dict]:
+        """Custody events between two ISO timestamps (inclusive), optionally at one location
+        
+        Served from the time index, oldest first; each result is the event
+        plus its ``component_id`` and ``event_index``. Naive timestamps are
+        read as UTC, and events with unparseable timestamps are not indexed.
+        """
+        self._ensure_derived_state()
+        results = []
+        with self._shared_lock:
+            for component_id, event_index in self.event_times.range(start, end, location):
+                event = self.components_db[component_id].custody_chain[event_index]
+                results.append({"component_id": component_id, "event_index": event_index, **event})
+        return results
+    
+    def get_inclusion_proof(self, component_id: str, event_index: int) -> Optional[Dict]:
+        """O(log n) Merkle proof that a custody event is recorded in a sealed block
+        
+        Check it with ``ledger_blocks.verify_inclusion_proof(proof, merkle_root)``
+        against the block's published root. Returns None for unknown events.
+        """
+        self._ensure_derived_state()
+        with self._shared_lock:
+            component = self.components_db.get(component_id)
+            if component is None or not 0 <= event_index < len(component.custody_chain):
+                return None
+            return self.blocks.get_inclusion_proof(
+                component_id, event_index, component.custody_chain[event_index]['signature']
+            )
+    
+    def seal_block(self) -> Optional[Dict]:
+        """Seal pending custody events into a block now, returning its header"""
+        self._ensure_derived_state()
+        with self._shared_lock:
+            block = self.blocks.seal()
+        return block.header() if block else None
+    
+    def _component_lock(self, component_id: str):
+        """Lock for the shard owning a component (a no-op outside concurrency mode)"""
+        return self._shard_locks[hash(component_id) % len(self._shard_locks)]
+    
+    def _component_locks(self, component_ids: Iterable[str]) -> ExitStack:
+        """Hold the shard locks of several components, taken in shard order to avoid deadlock"""
+        stack = ExitStack()
+        shards = sorted({hash(component_id) % len(self._shard_locks) for component_id in component_ids})
+        for shard in shards:
+            stack.enter_context(self._shard_locks[shard])
+        return stack
+    
+    def _check_component(self, component: SupplyChainEntry):
+        """Return (hash_valid, manufacturer_valid, chain_valid) for a component"""
+        hash_valid, manufacturer_valid = _check_identity(
+            component.component_id, component.manufacturer, component.batch_id,
+            component.verification_hash, self.manufacturers_db
+        )
+        return hash_valid, manufacturer_valid, self._verify_chain_incremental(component)
+    
+    def _verify_chain_incremental(self, component: SupplyChainEntry) -> bool:
+        """Hash only the custody events past the component's verified-up-to watermark"""
+        chain = component.custody_chain
+        if not chain:
+            return False
+        
+        verified_count, last_digest = self._chain_watermarks.get(
+            component.component_id, (0, component.verification_hash)
         )
-        indigenous_components = sum(
-            1 for comp in self.components_db.values()
-            if comp.indigenous_certification
+        if verified_count > len(chain):
+            # Chain shrank underneath us: start over from genesis
+            verified_count, last_digest = 0, component.verification_hash
+        
+        if not verify_chain_segment(last_digest, component.component_id, chain[verified_count:]):
+            return False
+        self._chain_watermarks[component.component_id] = (len(chain), chain[-1]['signature'])
+        return True
+    
+    def _is_authentic(self, component: SupplyChainEntry) -> bool:
+        """Hash, manufacturer, chain and signature checks, as verify_component_authenticity counts them"""
+        return all(self._check_component(component)) and self._verify_signatures_incremental(component)
+    
+    def _verify_signatures_incremental(self, component: SupplyChainEntry) -> bool:
+        """Batch-verify the record and event signatures past the signature watermark (shared lock held)"""
+        chain = component.custody_chain
+        verified = self._signature_watermarks.get(component.component_id)
+        if verified is not None and verified > len(chain):
+            verified = None
+        if not self._signatures_valid(component, verified is None, chain[verified or 0:]):
+            self._signature_watermarks.pop(component.component_id, None)
+            return False
+        self._signature_watermarks[component.component_id] = len(chain)
+        return True
+    
+    def _adjust_count(self, bucket: Dict, key: str, delta: int):
+        count = bucket.get(key, 0) + delta
+        if count:
+            bucket[key] = count
+        else:
+            bucket.pop(key, None)
+    
+    def _set_verified(self, component_id: str, verified: bool):
+        previous = self._verified_state.get(component_id, False)
+        self._verified_state[component_id] = verified
+        self._aggregates["verified"] += int(verified) - int(previous)
+    
+    def _track_component(self, component: SupplyChainEntry):
+        """Add a component's contribution to the running aggregates"""
+        self._aggregates["total"] += 1
+        self._aggregates["indigenous"] += int(bool(component.indigenous_certification))
+        self._adjust_count(self._aggregates["manufacturers"], component.manufacturer, 1)
+        self._adjust_count(self._aggregates["clearances"], component.security_clearance, 1)
+        self._set_verified(component.component_id, self._is_authentic(component))
+        self.indexes.add(component.component_id, self._index_values(component))
+        chain = component.custody_chain
+        self.indexes.assign(
+            component.component_id, "stage", self._current_stage(component.component_id, chain[-1] if chain else None)
         )
+    
+    def _untrack_component(self, component: SupplyChainEntry):
+        """Remove a component's contribution (used when an id is re-registered)"""
+        self._aggregates["total"] -= 1
+        self._aggregates["indigenous"] -= int(bool(component.indigenous_certification))
+        self._adjust_count(self._aggregates["manufacturers"], component.manufacturer, -1)
+        self._adjust_count(self._aggregates["clearances"], component.security_clearance, -1)
+        self._set_verified(component.component_id, False)
+        del self._verified_state[component.component_id]
+        self.indexes.remove(component.component_id, self._index_values(component))
+        self.indexes.assign(component.component_id, "stage", None)
+    
+    @staticmethod
+    def _index_values(component: SupplyChainEntry) -> Dict[str, str]:
+        return {
+            "batch_id": component.batch_id,
+            "manufacturer": component.manufacturer,
+            "security_clearance": component.security_clearance
+        }
+    
+    def _current_stage(self, component_id: str, last_event: Optional[Dict]) -> Optional[str]:
+        """Stage of the latest event in a component's timeline, own or inherited (shared lock held)"""
+        last_events = [(last_event, None)] if last_event is not None else []
+        for shipment_id in self.shipments.shipments_of(component_id):
+            chain = self.shipments.get(shipment_id).custody_chain
+            if chain:
+                last_events.append((chain[-1], shipment_id))
+        if not last_events:
+            return None
+        # Same-instant events: the timeline puts inherited ones last
+        return max(reversed(last_events), key=_timeline_key)[0]['stage']
+    
+    def _restage_members(self, shipment: Shipment):
+        """Re-index the stage of every member after a shipment event (shared lock held)"""
+        for component_id in shipment.members:
+            chain = self.components_db[component_id].custody_chain
+            self.indexes.assign(component_id, "stage", self._current_stage(component_id, chain[-1] if chain else None))
+    
+    def find(self, **criteria) -> List[str]:
+        """Look up component ids by indexed fields, e.g. ``find(manufacturer="C_DAC", stage="INSTALLATION")``
+        
+        Indexed fields are batch_id, manufacturer, security_clearance and the
+        current custody stage, taken from the latest event in the tracked
+        timeline (a shipment's events move all of its members).
+        """
+        self._ensure_derived_state()
+        with self._shared_lock:
+            return sorted(self.indexes.find(**criteria))
+    
+    def refresh_aggregates(self):
+        """Rebuild report aggregates with one pass over the ledger (e.g. after editing manufacturers_db)"""
+        with self._shared_lock:
+            self._rebuild_aggregates()
+    
+    def _rebuild_aggregates(self):
+        # Manufacturer edits change verification outcomes, so cached results go too
+        self.verification_cache.clear()
+        self._verified_state = {}
+        self.indexes = SecondaryIndex()
+        self._aggregates = {
+            "total": 0,
+            "verified": 0,
+            "indigenous": 0,
+            "manufacturers": {},
+            "clearances": {}
+        }
+        components = iter(self.components_db.values())
+        while True:
+            chunk = list(itertools.islice(components, _SIGNATURE_BATCH))
+            if not chunk:
+                break
+            self._verify_signature_batch(chunk)
+            for component in chunk:
+                self._track_component(component)
+    
+    def _verify_signature_batch(self, components: List[SupplyChainEntry]):
+        """Advance the signature watermarks of many components with one batch verification
+        
+        Components whose signatures fail keep no watermark, so _is_authentic
+        re-checks (and rejects) them one by one.
+        """
+        items = []
+        spans = []
+        for component in components:
+            chain = component.custody_chain
+            verified = self._signature_watermarks.get(component.component_id)
+            if verified is not None and verified > len(chain):
+                verified = None
+            if verified == len(chain):
+                continue
+            unverified = chain[verified or 0:]
+            component_items = _signed_items(
+                component.manufacturer,
+                component_signing_message(component) if verified is None else None,
+                component.digital_signature,
+                unverified
+            )
+            spans.append((component, len(items), len(items) + len(component_items), unverified))
+            items.extend(component_items)
+        
+        results = self.keyring.verify_batch(items)
+        for component, start, end, unverified in spans:
+            if all(results[start:end]) and _pq_signatures_valid(self.pq_public_key, unverified):
+                self._signature_watermarks[component.component_id] = len(component.custody_chain)
+    
+    def get_supply_chain_report(self) -> Dict:
+        """Generate comprehensive supply chain report from running aggregates"""
+        self._ensure_derived_state()
+        with self._shared_lock:
+            total_components = self._aggregates["total"]
+            verified_components = self._aggregates["verified"]
+            indigenous_components = self._aggregates["indigenous"]
+            manufacturer_counts = list(self._aggregates["manufacturers"].items())
+            clearances = dict(self._aggregates["clearances"])
         
         manufacturer_breakdown = {}
-        for component in self.components_db.values():
-            mfg_name = self.manufacturers_db.get(component.manufacturer, {}).get('name', 'UNKNOWN')
-            manufacturer_breakdown[mfg_name] = manufacturer_breakdown.get(mfg_name, 0) + 1
+        for manufacturer, count in manufacturer_counts:
+            mfg_name = self.manufacturers_db.get(manufacturer, {}).get('name', 'UNKNOWN')
+            manufacturer_breakdown[mfg_name] = manufacturer_breakdown.get(mfg_name, 0) + count
         
         security_clearance_dist = {
-            "TOP_SECRET": len([c for c in self.components_db.values() if c.security_clearance == "TOP_SECRET"]),
-            "SECRET": len([c for c in self.components_db.values() if c.security_clearance == "SECRET"]),
-            "CONFIDENTIAL": len([c for c in self.components_db.values() if c.security_clearance == "CONFIDENTIAL"])
+            "TOP_SECRET": clearances.get("TOP_SECRET", 0),
+            "SECRET": clearances.get("SECRET", 0),
+            "CONFIDENTIAL": clearances.get("CONFIDENTIAL", 0)
         }
         
         return {
@@ -304,6 +1820,180 @@ class SupplyChainTracker:
             "audit_timestamp": datetime.datetime.now().isoformat()
         }
     
+    def _count_writes(self, writes: int):
+        self._writes_since_snapshot += writes
+        if self.snapshot_every and self._writes_since_snapshot >= self.snapshot_every:
+            self.snapshot()
+    
+    def _tracker_snapshot_path(self) -> Optional[str]:
+        directory = getattr(self.components_db, "directory", None)
+        return os.path.join(directory, TRACKER_SNAPSHOT_FILE) if directory else None
+    
+    def snapshot(self) -> Optional[int]:
+        """Snapshot the ledger index plus aggregates and indexes; returns the log position covered
+        
+        The storage backend writes its index snapshot and compacts its index
+        journal; the tracker state (aggregates, verification state, chain
+        watermarks, secondary/time indexes, assembly graph and block locations) goes next to it
+        as one checksummed file. A restart loads both and replays only the
+        components written afterwards; a missing, corrupt or stale tracker
+        snapshot means a full rebuild instead. Returns None for in-memory storage.
+        """
+        path = self._tracker_snapshot_path()
+        if path is None or not hasattr(self.components_db, "snapshot"):
+            self._writes_since_snapshot = 0
+            return None
+        
+        with self._shared_lock:
+            # Pending events go into a block so the snapshot only holds sealed ones
+            self.blocks.seal()
+            log_end = self.components_db.snapshot()
+            state = {
+                "log_end": log_end,
+                "aggregates": self._aggregates,
+                "verified_state": self._verified_state,
+                "watermarks": self._chain_watermarks,
+                "signature_watermarks": self._signature_watermarks,
+                "indexes": self.indexes.to_state(),
+                "blocks": self.blocks.to_state(),
+                "event_times": self.event_times.to_state(),
+                "assembly": self.assembly.to_state()
+            }
+            payload = pickle.dumps(state, protocol=TRACKER_SNAPSHOT_PROTOCOL)
+            temp_path = path + ".tmp"
+            with open(temp_path, "wb") as f:
+                f.write(TRACKER_SNAPSHOT_HEADER.pack(TRACKER_SNAPSHOT_MAGIC, zlib.crc32(payload), len(payload)))
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, path)
+            self._writes_since_snapshot = 0
+        return log_end
+    
+    def _read_snapshot_state(self) -> Optional[Dict]:
+        """The saved tracker state if it is intact and matches the storage snapshot, else None"""
+        path = self._tracker_snapshot_path()
+        snapshot_end = getattr(self.components_db, "snapshot_end", 0)
+        if path is None or not snapshot_end or not os.path.exists(path):
+            return None
+        
+        with open(path, "rb") as f:
+            data = f.read()
+        if len(data) < TRACKER_SNAPSHOT_HEADER.size:
+            return None
+        magic, crc, length = TRACKER_SNAPSHOT_HEADER.unpack_from(data)
+        payload = io.BytesIO(data)
+        payload.seek(TRACKER_SNAPSHOT_HEADER.size)
+        if (magic != TRACKER_SNAPSHOT_MAGIC or len(data) - TRACKER_SNAPSHOT_HEADER.size != length
+                or zlib.crc32(memoryview(data)[TRACKER_SNAPSHOT_HEADER.size:]) != crc):
+            return None  # older format, truncated or corrupt
+        try:
+            state = _StateUnpickler(payload).load()
+        except (pickle.UnpicklingError, EOFError, ValueError):
+            return None
+        if not isinstance(state, dict) or state.get("log_end") != snapshot_end:
+            return None  # tracker state is from a different storage snapshot
+        return state
+    
+    def _restore_snapshot(self) -> bool:
+        """Load tracker state matching the storage snapshot, then replay later writes"""
+        state = self._read_snapshot_state()
+        if state is None:
+            return False
+        try:
+            blocks = BlockBuilder.from_state(state["blocks"], self.blocks.path, self.blocks.read_only)
+        except ValueError:
+            return False  # block log lost blocks the snapshot refers to
+        self.blocks.close()
+        self.blocks = blocks
+        
+        self._aggregates = state["aggregates"]
+        self._verified_state = state["verified_state"]
+        self._chain_watermarks = state["watermarks"]
+        self._signature_watermarks = state["signature_watermarks"]
+        self.indexes = SecondaryIndex.from_state(state["indexes"])
+        self.event_times = EventTimeIndex.from_state(state["event_times"])
+        self.assembly = AssemblyGraph.from_state(state["assembly"])
+        
+        for component_id, previous_offsets, appended_only in self.components_db.changes_since_snapshot():
+            if previous_offsets is not None:
+                self._untrack_component(self.components_db.entry_at(previous_offsets))
+            if appended_only:
+                first_event = previous_offsets[2]
+            else:
+                self._chain_watermarks.pop(component_id, None)
+                self._signature_watermarks.pop(component_id, None)
+                self._start_event_log(component_id)
+                first_event = 0
+            
+            component = self.components_db[component_id]
+            self._track_component(component)
+            for event_index in range(first_event, len(component.custody_chain)):
+                self._log_event(component_id, event_index, component.custody_chain[event_index])
+            self._writes_since_snapshot += 1
+        
+        # Shipments have their own log, so events recorded after the snapshot are not in its stages
+        for shipment in self.shipments.values():
+            self._restage_members(shipment)
+        return True
+    
+    def export_mapped_ledger(self, path: str) -> Dict:
+        """Write the ledger as a fixed-layout file for read-only audit trackers
+        
+        Open it on an audit node with
+        ``SupplyChainTracker(MappedLedgerStorage(path))``; the export is a
+        point-in-time copy and is not updated by later writes here. The
+        manufacturers' public keys go to ``path + ".keys"`` for signature checks,
+        shipments, if any, to ``path + ".shipments"`` and sealed blocks to
+        ``path + ".blocks"`` so the audit node serves the same inclusion proofs.
+        """
+        self._ensure_derived_state()
+        with self._shared_lock:
+            self.keyring.save(path + PUBLIC_KEYS_SUFFIX, public_only=True)
+            if len(self.shipments):
+                self.shipments.export(path + SHIPMENTS_SUFFIX)
+            self.blocks.seal()
+            self.blocks.export(path + BLOCKS_SUFFIX)
+            return write_mapped_ledger(self.components_db.values(), path)
+    
+    def export_columnar(self, directory: str, chunk_rows: int = 65536, format: Optional[str] = None) -> Dict:
+        """Stream the ledger into columnar ``components``/``events`` tables for analytics
+        
+        Parquet when pyarrow is installed (or ``format="parquet"``), else the
+        built-in ``.lcol`` tables read back with ``ledger_columnar.read_columnar``.
+        Rows are written ``chunk_rows`` at a time and components are read one
+        by one, so memory stays bounded and writers are only paused per
+        component. Covers each component's own chain, not shipment events.
+        """
+        with self._shared_lock:
+            component_ids = list(self.components_db.keys())
+        return write_columnar_export(self._iter_entries(component_ids), directory, chunk_rows, format)
+    
+    def _iter_entries(self, component_ids: Iterable[str]) -> Iterator[SupplyChainEntry]:
+        """Current entries for the ids still registered (chains copied when writers may race the reader)"""
+        for component_id in component_ids:
+            with self._shared_lock:
+                component = self.components_db.get(component_id)
+                if component is not None and self.concurrent:
+                    component = replace(component, custody_chain=list(component.custody_chain))
+            if component is not None:
+                yield component
+    
+    def close(self):
+        """Flush pending writes and release the storage backend, shipment and block logs and hash-based signer
+        
+        Durable trackers snapshot first when anything changed since the last
+        snapshot, so a clean restart loads state instead of rebuilding it.
+        """
+        with self._shared_lock:
+            if self.snapshot_on_close and self._derived_ready and not self.read_only and self._writes_since_snapshot:
+                self.snapshot()
+            self.components_db.close()
+            self.shipments.close()
+            self.blocks.close()
+            if self.pq_signer is not None:
+                self.pq_signer.close()
+    
     def simulate_deployment_tracking(self):
         """Simulate component deployment tracking for demo"""
         deployment_locations = [
@@ -364,13 +2054,95 @@ class SupplyChainTracker:
         
         print("🎯 All components successfully tracked through deployment pipeline!")
     
-    def track_specific_component(self, component_id: str):
-        """Track specific component through its entire journey"""
-        if component_id not in self.components_db:
+    def get_component_tracking(self, component_id: str) -> Optional[Dict]:
+        """Component record, verification result and full custody chain as plain data (None if unknown)
+        
+        Events inherited from a shipment are merged in by time and carry its ``shipment_id``.
+        """
+        if self._known_unregistered(component_id):
+            return None
+        with self._shared_lock:
+            component = self.components_db.get(component_id)
+            if component is None:
+                return None
+            custody_chain = [
+                dict(event, shipment_id=shipment_id) if shipment_id else dict(event)
+                for event, shipment_id in self._custody_timeline(component)
+            ]
+        
+        return {
+            "component_id": component.component_id,
+            "component_name": component.component_name,
+            "manufacturer": component.manufacturer,
+            "manufacturing_date": component.manufacturing_date,
+            "batch_id": component.batch_id,
+            "security_clearance": component.security_clearance,
+            "indigenous_certification": component.indigenous_certification,
+            "verification": self.verify_component_authenticity(component_id),
+            "custody_chain": custody_chain
+        }
+    
+    def get_component_wire(self, component_id: str) -> Optional[bytes]:
+        """Component record and its own custody chain in the ``ledger_wire`` binary format (None if unknown)"""
+        if self._known_unregistered(component_id):
+            return None
+        with self._shared_lock:
+            component = self.components_db.get(component_id)
+            return None if component is None else encode_component(component)
+    
+    def render_custody_events(self, component_id: str, newest_first: bool = False,
+                              stages: Optional[Iterable[str]] = None, limit: Optional[int] = None,
+                              start: Optional[int] = None) -> Optional[Iterator[str]]:
+        """Text block per custody event, produced as the timeline is walked (None if the component is unknown)"""
+        walk = self.iter_custody_events(component_id, newest_first, stages, start)
+        if walk is None:
+            return None
+        if limit is not None:
+            walk = itertools.islice(walk, limit)
+        return (self._render_custody_event(*row) for row in walk)
+    
+    @staticmethod
+    def _render_custody_event(position: int, event: Dict, shipment_id: Optional[str]) -> str:
+        if shipment_id:
+            status_icon = "📦"
+        else:
+            status_icon = "🟢" if "PASSED" in event['action'] or "OPERATIONAL" in event['action'] else "🔵"
+        lines = [f"{status_icon} Event {position + 1}: {event['stage']}"]
+        if shipment_id:
+            lines.append(f"   Shipment: {shipment_id}")
+        lines.extend((
+            f"   Handler: {event['handler']}",
+            f"   Location: {event['location']}",
+            f"   Action: {event['action']}",
+            f"   Verified By: {event['verified_by']}",
+            f"   Timestamp: {event['timestamp']}",
+            f"   Signature: {event['signature']}",
+            ""
+        ))
+        return "\n".join(lines)
+    
+    def track_specific_component(self, component_id: str, newest_first: bool = False,
+                                 stages: Optional[Iterable[str]] = None, limit: Optional[int] = None):
+        """Track specific component through its entire journey
+        
+        Events are printed as they are read, so a long chain is never held
+        in memory; ``newest_first``, ``stages`` and ``limit`` narrow the view.
+        """
+        if self._known_unregistered(component_id):
+            component = None
+        else:
+            with self._shared_lock:
+                component = self.components_db.get(component_id)
+                if component is not None:
+                    own_events = len(component.custody_chain)
+                    inherited = sum(
+                        len(self.shipments.get(shipment_id).custody_chain)
+                        for shipment_id in self.shipments.shipments_of(component_id)
+                    )
+        if component is None:
             print(f"❌ Component {component_id} not found!")
             return
         
-        component = self.components_db[component_id]
         verification = self.verify_component_authenticity(component_id)
         
         print(f"\n🔍 DETAILED COMPONENT TRACKING: {component_id}")
@@ -383,19 +2155,12 @@ class SupplyChainTracker:
         print(f"Indigenous Certified: {'✅ YES' if component.indigenous_certification else '❌ NO'}")
         print(f"Verification Status: {'✅ VERIFIED' if verification['authentic'] else '❌ FAILED'}")
         
-        print(f"\n📋 CUSTODY CHAIN ({len(component.custody_chain)} events):")
+        shipment_note = f", {inherited} via shipments" if inherited else ""
+        print(f"\n📋 CUSTODY CHAIN ({own_events + inherited} events{shipment_note}):")
         print("-" * 60)
         
-        for i, event in enumerate(component.custody_chain, 1):
-            status_icon = "🟢" if "PASSED" in event['action'] or "OPERATIONAL" in event['action'] else "🔵"
-            print(f"{status_icon} Event {i}: {event['stage']}")
-            print(f"   Handler: {event['handler']}")
-            print(f"   Location: {event['location']}")
-            print(f"   Action: {event['action']}")
-            print(f"   Verified By: {event['verified_by']}")
-            print(f"   Timestamp: {event['timestamp']}")
-            print(f"   Signature: {event['signature']}")
-            print()
+        for block in self.render_custody_events(component_id, newest_first, stages, limit) or ():
+            print(block)
 
 def demo_supply_chain_tracking():
     """Comprehensive demo function for hackathon presentation"""
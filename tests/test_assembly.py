@@ -0,0 +1,63 @@
+import pytest
+
+from ledger_storage import AppendOnlyLogStorage
+from supply_chain_tracker import SupplyChainTracker
+
+def component(component_id, batch_id="B-1"):
+    return {
+        "component_id": component_id, "component_name": "Part", "manufacturer": "IIT_MADRAS",
+        "manufacturing_date": "2024-08-01", "batch_id": batch_id, "indigenous_certification": True,
+        "security_clearance": "SECRET"
+    }
+
+def open_tracker(directory):
+    return SupplyChainTracker(storage=AppendOnlyLogStorage(str(directory)), load_samples=False)
+
+@pytest.fixture
+def tracker(tmp_path):
+    tracker = open_tracker(tmp_path)
+    # CHIP (batch B-BAD) -> BOARD -> RADAR, SPARE (batch B-BAD) on its own, MAST (B-1) -> RADAR
+    for component_id, batch_id in (("CHIP", "B-BAD"), ("BOARD", "B-1"), ("RADAR", "B-1"),
+                                   ("SPARE", "B-BAD"), ("MAST", "B-1")):
+        tracker.register_component(component(component_id, batch_id))
+    tracker.install_component("CHIP", "BOARD", "H", "Line 1")
+    tracker.install_component("BOARD", "RADAR", "H", "Line 2")
+    tracker.install_component("MAST", "RADAR", "H", "Line 2")
+    yield tracker
+    tracker.close()
+
+def test_assembly_queries_and_batch_recall(tracker):
+    assembly = tracker.get_assembly("CHIP")
+    assert assembly["installed_in"] == "BOARD" and assembly["top_level_unit"] == "RADAR"
+    assert assembly["enclosing_assemblies"] == ["BOARD", "RADAR"]
+    assert tracker.get_assembly("RADAR")["all_parts"] == ["BOARD", "CHIP", "MAST"]
+    assert tracker.recall_batch("B-BAD") == ["RADAR", "SPARE"]
+
+    tracker.add_custody_event("RADAR", {"stage": "OPERATIONAL", "handler": "H", "location": "Site", "action": "LIVE"})
+    assert tracker.recall_batch("B-BAD", stage="OPERATIONAL") == ["RADAR"]
+    assert tracker.get_assembly("NOPE") is None
+
+def test_invalid_installs_are_rejected_without_writing(tracker):
+    length = len(tracker.components_db["RADAR"].custody_chain)
+    with pytest.raises(ValueError, match="cycle"):
+        tracker.install_component("RADAR", "CHIP", "H", "Line 3")
+    with pytest.raises(ValueError, match="already installed"):
+        tracker.install_component("CHIP", "MAST", "H", "Line 3")
+    with pytest.raises(ValueError, match="Unknown assembly"):
+        tracker.install_component("SPARE", "NOPE", "H", "Line 3")
+    with pytest.raises(ValueError, match="not installed"):
+        tracker.uninstall_component("SPARE", "H", "Bench")
+    assert len(tracker.components_db["RADAR"].custody_chain) == length
+
+def test_uninstall_and_restart_rebuild_the_graph(tracker, tmp_path):
+    tracker.uninstall_component("BOARD", "H", "Bench")
+    assert tracker.get_assembly("CHIP")["top_level_unit"] == "BOARD"
+    assert tracker.recall_batch("B-BAD") == ["BOARD", "SPARE"]
+    expected = {cid: tracker.get_assembly(cid) for cid in tracker.components_db.keys()}
+    tracker.close()
+
+    reopened = open_tracker(tmp_path)
+    try:
+        assert {cid: reopened.get_assembly(cid) for cid in reopened.components_db.keys()} == expected
+    finally:
+        reopened.close()
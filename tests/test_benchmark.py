@@ -0,0 +1,25 @@
+import tracemalloc
+
+from tracker_benchmark import run_scenario
+
+def test_verify_phase_separates_cold_and_cached_checks():
+    run = run_scenario(components=20, events=2, storage="memory", verify_calls=20,
+                       report_calls=2, latency_capacity=100, seed=7)
+    operations = run["operations"]
+    assert operations["verify_component_cold"]["ops"] == 20
+    assert operations["verify_component_cached"]["cache_hit_rate"] == 1.0
+    assert "verify_component_authenticity" not in operations
+
+def test_memory_is_measured_per_operation_not_per_process():
+    run = run_scenario(components=10, events=1, storage="memory", verify_calls=5,
+                       report_calls=2, latency_capacity=100, seed=7, trace_memory=True)
+    operations = run["operations"]
+    assert all("peak_rss_kb" not in stats for stats in operations.values())
+    assert all(stats["traced_peak_kb"] >= 0 for stats in operations.values())
+    # Repeated report calls allocate far less than registering every component
+    assert operations["get_supply_chain_report"]["traced_peak_kb"] < operations["register_component"]["traced_peak_kb"]
+    assert not tracemalloc.is_tracing()
+
+    untraced = run_scenario(components=2, events=1, storage="memory", verify_calls=2,
+                            report_calls=1, latency_capacity=10, seed=7)
+    assert all(stats["traced_peak_kb"] is None for stats in untraced["operations"].values())
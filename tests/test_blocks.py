@@ -0,0 +1,113 @@
+import os
+
+from ledger_blocks import BlockBuilder, verify_inclusion_proof
+from ledger_mapped import MappedLedgerStorage
+from ledger_storage import AppendOnlyLogStorage
+from supply_chain_tracker import SupplyChainTracker, BLOCKS_FILE
+
+def open_tracker(directory, **kwargs):
+    storage = AppendOnlyLogStorage(str(directory), snapshot_on_close=False)
+    return SupplyChainTracker(storage=storage, block_size=4, snapshot_on_close=False, **kwargs)
+
+def add_events(tracker, rounds):
+    """Interleave events across components so log order differs from component order"""
+    for round_index in range(rounds):
+        for component_id in sorted(tracker.components_db.keys(), reverse=True):
+            tracker.add_custody_event(component_id, {
+                "stage": "DISTRIBUTION", "handler": "H", "location": f"Depot {round_index}", "action": "MOVED"
+            })
+
+def issued_proofs(tracker):
+    proofs = []
+    for component_id in tracker.components_db.keys():
+        for event_index in range(len(tracker.components_db[component_id].custody_chain)):
+            proofs.append(tracker.get_inclusion_proof(component_id, event_index))
+    return proofs
+
+def test_inclusion_proofs_verify_and_reject_tampering():
+    builder = BlockBuilder(block_size=5)
+    digests = [f"{i:064x}" for i in range(7)]
+    for i, digest in enumerate(digests):
+        builder.add_event(f"C{i % 2}", digest)
+    proof = builder.get_inclusion_proof("C0", 3, digests[6])
+    assert proof["block_height"] == 1
+    assert verify_inclusion_proof(proof, builder.blocks[1].merkle_root)
+
+    assert not verify_inclusion_proof(dict(proof, event_digest=digests[5]), builder.blocks[1].merkle_root)
+    assert not verify_inclusion_proof(proof, builder.blocks[0].merkle_root)
+
+def test_proofs_survive_restart_without_snapshot(tmp_path):
+    tracker = open_tracker(tmp_path)
+    add_events(tracker, 3)
+    proofs = issued_proofs(tracker)
+    headers = [block.header() for block in tracker.blocks.blocks]
+    tracker.close()
+
+    # No tracker snapshot: the restart replays the ledger in component order
+    assert not os.path.exists(tmp_path / "tracker.snap")
+    reopened = open_tracker(tmp_path)
+    try:
+        assert [block.header() for block in reopened.blocks.blocks] == headers
+        assert issued_proofs(reopened) == proofs
+        for proof in proofs:
+            assert verify_inclusion_proof(proof, headers[proof["block_height"]]["merkle_root"])
+    finally:
+        reopened.close()
+
+def test_proofs_survive_restart_from_snapshot(tmp_path):
+    tracker = open_tracker(tmp_path)
+    add_events(tracker, 2)
+    tracker.snapshot()
+    add_events(tracker, 2)
+    proofs = issued_proofs(tracker)
+    tracker.close()
+
+    reopened = open_tracker(tmp_path)
+    try:
+        assert issued_proofs(reopened) == proofs
+    finally:
+        reopened.close()
+
+def test_unsealed_events_after_crash_go_into_new_blocks(tmp_path):
+    tracker = open_tracker(tmp_path)
+    add_events(tracker, 1)
+    sealed = [block.header() for block in tracker.blocks.blocks]
+    pending = len(tracker.blocks._pending)
+    tracker.components_db.close()  # crash: the pending events were never sealed
+
+    reopened = open_tracker(tmp_path)
+    try:
+        assert [block.header() for block in reopened.blocks.blocks] == sealed
+        assert len(reopened.blocks._pending) == pending
+        for proof in issued_proofs(reopened):
+            assert verify_inclusion_proof(proof, reopened.blocks.blocks[proof["block_height"]].merkle_root)
+    finally:
+        reopened.close()
+
+def test_torn_block_log_tail_is_dropped(tmp_path):
+    tracker = open_tracker(tmp_path)
+    add_events(tracker, 2)
+    count = len(tracker.blocks.blocks)
+    tracker.close()
+    with open(tmp_path / BLOCKS_FILE, "ab") as f:
+        f.write(b"\x40\x00\x00\x00torn")
+
+    builder = BlockBuilder(4, str(tmp_path / BLOCKS_FILE))
+    try:
+        assert len(builder.blocks) == count
+    finally:
+        builder.close()
+
+def test_mapped_export_serves_the_same_proofs(tmp_path):
+    tracker = open_tracker(tmp_path / "ledger")
+    add_events(tracker, 2)
+    path = str(tmp_path / "audit.ledger")
+    tracker.export_mapped_ledger(path)
+    proofs = issued_proofs(tracker)
+    tracker.close()
+
+    audit = SupplyChainTracker(MappedLedgerStorage(path), block_size=4)
+    try:
+        assert issued_proofs(audit) == proofs
+    finally:
+        audit.close()
@@ -0,0 +1,54 @@
+import pytest
+
+from supply_chain_tracker import SupplyChainTracker
+
+def event(action, stage="ASSEMBLY"):
+    return {"stage": stage, "handler": "H", "location": "Line 1", "action": action}
+
+@pytest.fixture
+def tracker():
+    tracker = SupplyChainTracker(load_samples=False)
+    for component_id in ("BOARD", "CHIP", "CASE"):
+        tracker.register_component({
+            "component_id": component_id, "component_name": component_id, "manufacturer": "IIT_MADRAS",
+            "manufacturing_date": "2024-01-01", "batch_id": "B", "indigenous_certification": True,
+            "security_clearance": "SECRET"
+        })
+    yield tracker
+    tracker.close()
+
+def test_failed_append_leaves_no_phantom_install(tracker, monkeypatch):
+    def broken_append(writes):
+        raise OSError("disk full")
+    monkeypatch.setattr(tracker.components_db, "append_events", broken_append)
+    with pytest.raises(OSError):
+        tracker.add_custody_events_bulk([("CHIP", event("INSTALLED_INTO:BOARD"))])
+    monkeypatch.undo()
+
+    assert tracker.get_assembly("CHIP")["installed_in"] is None
+    assert tracker.get_assembly("BOARD")["parts"] == []
+    result = tracker.add_custody_events_bulk([("CHIP", event("INSTALLED_INTO:BOARD"))])
+    assert result["recorded"] == 1
+    assert tracker.get_assembly("CHIP")["installed_in"] == "BOARD"
+
+def test_batch_checks_installs_against_its_earlier_events(tracker):
+    result = tracker.add_custody_events_bulk([
+        ("CHIP", event("INSTALLED_INTO:BOARD")),
+        ("BOARD", event("INSTALLED_INTO:CASE")),
+        ("CASE", event("INSTALLED_INTO:CHIP")),  # would close a cycle through the staged installs
+    ])
+    assert result["recorded"] == 2
+    assert [error["index"] for error in result["errors"]] == [2]
+    assert "cycle" in result["errors"][0]["error"]
+    assert tracker.get_assembly("CHIP")["top_level_unit"] == "CASE"
+
+def test_rejected_event_fails_the_rest_of_its_segment(tracker):
+    result = tracker.add_custody_events_bulk([
+        ("CHIP", event("QA_PASSED", "QUALITY_CONTROL")),
+        ("CHIP", event("REMOVED_FROM:BOARD")),
+        ("CHIP", event("SHIPPED", "DISTRIBUTION")),
+    ])
+    assert result["recorded"] == 1
+    assert [error["index"] for error in result["errors"]] == [1, 2]
+    assert len(tracker.components_db["CHIP"].custody_chain) == 2
+    assert tracker.verify_component_authenticity("CHIP", full_chain=True)["authentic"]
@@ -0,0 +1,74 @@
+from dataclasses import replace
+
+import pytest
+
+from ledger_models import CustodyEvent, compute_event_digest, component_signing_message, length_prefixed
+from ledger_shipments import compute_manifest_hash, shipment_signing_message, Shipment
+from supply_chain_tracker import SupplyChainTracker
+
+COMPONENT = "SHAKTI-C-001"
+
+@pytest.fixture
+def tracker():
+    tracker = SupplyChainTracker()
+    yield tracker
+    tracker.close()
+
+def shifted(event, **fields):
+    """The same event (signature and attestation kept) with some fields rewritten"""
+    return CustodyEvent.from_dict(dict(event, **fields))
+
+def test_length_prefixed_keeps_field_boundaries():
+    assert length_prefixed("A|B", "C") != length_prefixed("A", "B|C")
+    assert length_prefixed("AB", "") != length_prefixed("A", "B")
+
+def test_event_digest_binds_field_boundaries():
+    event = {"stage": "DISTRIBUTION", "handler": "H", "timestamp": "2024-01-01T00:00:00",
+             "location": "A|B", "action": "C", "verified_by": "QA"}
+    moved = dict(event, location="A", action="B|C")
+    assert compute_event_digest("0" * 64, COMPONENT, event) != compute_event_digest("0" * 64, COMPONENT, moved)
+
+def test_text_moved_across_fields_fails_full_verification(tracker):
+    assert tracker.add_custody_event(COMPONENT, {
+        "stage": "DISTRIBUTION", "handler": "H", "location": "A|B", "action": "C"
+    })
+    assert tracker.verify_component_authenticity(COMPONENT, full_chain=True)["authentic"]
+
+    chain = tracker.components_db[COMPONENT].custody_chain
+    chain[-1] = shifted(chain[-1], location="A", action="B|C")
+    result = tracker.verify_component_authenticity(COMPONENT, full_chain=True)
+    assert not result["authentic"]
+    assert not result["chain_integrity"]
+
+def test_edited_event_fails_verification(tracker):
+    chain = tracker.components_db[COMPONENT].custody_chain
+    chain[0] = shifted(chain[0], handler="SOMEONE_ELSE")
+    assert not tracker.verify_component_authenticity(COMPONENT, full_chain=True)["authentic"]
+
+def test_component_signature_binds_field_boundaries(tracker):
+    component = tracker.components_db[COMPONENT]
+    moved = replace(component, component_name=component.component_name + "|X",
+                    manufacturing_date=component.manufacturing_date)
+    assert component_signing_message(moved) != component_signing_message(component)
+
+    tracker.components_db.put_component(replace(component, batch_id=component.batch_id + "X"))
+    result = tracker.verify_component_authenticity(COMPONENT, full_chain=True)
+    assert not result["authentic"]
+
+def test_shipment_manifest_binds_member_boundaries():
+    assert compute_manifest_hash("P", "H", "T", ["A\nB"]) != compute_manifest_hash("P", "H", "T", ["A", "B"])
+    assert compute_manifest_hash("P|Q", "H", "T", []) != compute_manifest_hash("P", "Q|H", "T", [])
+    first = Shipment("P|Q", "H", "T", [], "m", "", [])
+    second = Shipment("P", "H", "T", [], "Q|m", "", [])
+    assert shipment_signing_message(first) != shipment_signing_message(second)
+
+def test_tampered_shipment_event_fails_member_verification(tracker):
+    tracker.create_shipment("PALLET-1", [COMPONENT], "HANDLER", "Depot")
+    tracker.add_shipment_event("PALLET-1", {"stage": "DISTRIBUTION", "handler": "H", "location": "A|B", "action": "C"})
+    assert tracker.verify_component_authenticity(COMPONENT, full_chain=True)["authentic"]
+
+    chain = tracker.shipments.get("PALLET-1").custody_chain
+    chain[-1] = shifted(chain[-1], location="A", action="B|C")
+    result = tracker.verify_component_authenticity(COMPONENT, full_chain=True)
+    assert not result["authentic"]
+    assert not result["shipment_verification"]
@@ -0,0 +1,68 @@
+import json
+import os
+import tracemalloc
+
+from ledger_models import CustodyEvent, parse_timestamp
+
+def event_dict(index=0, **fields):
+    event = {
+        "stage": "DISTRIBUTION", "handler": "BPRD_LOGISTICS_DIVISION",
+        "timestamp": f"2024-09-01T10:{index % 60:02d}:00.{index:06d}",
+        "location": "Central Warehouse - New Delhi", "action": "MOVED", "verified_by": "SYSTEM_AUTOMATED",
+        "signature": os.urandom(32).hex(), "attestation": os.urandom(64).hex()
+    }
+    event.update(fields)
+    return {name: value for name, value in event.items() if value is not None}
+
+def test_mapping_round_trip_matches_the_dict_form():
+    source = event_dict(7, pq_signature=os.urandom(100).hex())
+    event = CustodyEvent.from_dict(source)
+    assert dict(event) == source and event.to_dict() == source
+    assert list(event) == list(CustodyEvent.KEYS) and len(event) == len(source)
+    assert event == source  # Mapping equality against a plain dict
+    assert event["stage"] == "DISTRIBUTION" and event.get("missing") is None
+
+    unsigned = CustodyEvent.from_dict(event_dict(signature=None, attestation=None))
+    assert list(unsigned) == list(CustodyEvent.BASE_KEYS)
+    assert "signature" not in unsigned and unsigned.get("attestation") is None
+    assert CustodyEvent.from_dict(dict(unsigned)) == unsigned
+
+def test_iso_timestamps_are_packed_and_others_kept_verbatim():
+    packed = CustodyEvent.from_dict(event_dict(timestamp="2024-09-01T10:15:30.000123"))
+    assert packed.timestamp_text is None
+    assert packed.epoch == parse_timestamp("2024-09-01T10:15:30.000123")
+    assert packed["timestamp"] == "2024-09-01T10:15:30.000123"
+
+    # Forms that would not render back identically stay as text, so signed bytes never change
+    for text in ("2024-09-01", "2024-09-01T10:15:30+05:30", "2024-09-01T10:15:30.100", "yesterday"):
+        event = CustodyEvent.from_dict(event_dict(timestamp=text))
+        assert event["timestamp"] == event.timestamp_text == text
+        assert event.epoch == parse_timestamp(text)
+
+def test_only_canonical_hex_is_packed_into_bytes():
+    digest, attestation = os.urandom(32).hex(), os.urandom(64).hex()
+    event = CustodyEvent.from_dict(event_dict(signature=digest, attestation=attestation))
+    assert isinstance(event._signature, bytes) and isinstance(event._attestation, bytes)
+    assert event["signature"] == digest and event["attestation"] == attestation
+
+    for odd in (digest.upper(), digest[:-2], "zz" + digest[2:], "not hex"):
+        kept = CustodyEvent.from_dict(event_dict(signature=odd))
+        assert kept["signature"] == odd and isinstance(kept._signature, str)
+
+def test_events_take_several_times_less_memory_than_dicts():
+    count = 2000
+    lines = [json.dumps(event_dict(index)) for index in range(count)]
+
+    def traced_size(build):
+        tracemalloc.start()
+        try:
+            kept = build()
+            return tracemalloc.get_traced_memory()[0], kept
+        finally:
+            tracemalloc.stop()
+
+    dict_bytes, _ = traced_size(lambda: [json.loads(line) for line in lines])
+    decoded = [json.loads(line) for line in lines]
+    event_bytes, events = traced_size(lambda: [CustodyEvent.from_dict(event) for event in decoded])
+    assert [dict(event) for event in events] == decoded
+    assert dict_bytes / event_bytes > 3
@@ -0,0 +1,86 @@
+import pytest
+
+from ledger_hashsig import HashSigner, KeyExhaustedError, verify_hash_signature
+from ledger_models import CustodyEvent
+from supply_chain_tracker import SupplyChainTracker
+
+@pytest.fixture
+def signer():
+    signer = HashSigner.generate(top_height=2, subtree_height=2)
+    yield signer
+    signer.close()
+
+def test_signatures_verify_across_subtrees_and_bind_the_message(signer):
+    signatures = [signer.sign(b"message %d" % i) for i in range(6)]  # subtrees of 4 leaves
+    for i, signature in enumerate(signatures):
+        assert verify_hash_signature(signer.public_key, b"message %d" % i, signature)
+    assert not verify_hash_signature(signer.public_key, b"message 1", signatures[0])
+    damaged = bytearray(signatures[5])
+    damaged[40] ^= 1
+    assert not verify_hash_signature(signer.public_key, b"message 5", bytes(damaged))
+    assert not verify_hash_signature(signer.public_key, b"message 5", None)
+
+def test_exhausted_key_refuses_to_sign(signer):
+    for i in range(signer.capacity):
+        signer.sign(b"%d" % i)
+    assert signer.remaining == 0
+    with pytest.raises(KeyExhaustedError):
+        signer.sign(b"one too many")
+
+def test_reloaded_key_never_reuses_a_leaf(tmp_path):
+    path = str(tmp_path / "pq.key")
+    signer = HashSigner.generate(top_height=4, subtree_height=4, path=path)
+    used = {int.from_bytes(signer.sign(b"a")[:4], "big") for _ in range(3)}
+    signer.close()  # crash: the in-memory index is lost
+    reloaded = HashSigner.load(path)
+    try:
+        assert int.from_bytes(reloaded.sign(b"b")[:4], "big") not in used
+    finally:
+        reloaded.close()
+
+def test_tracker_rejects_a_tampered_pq_signature(signer):
+    tracker = SupplyChainTracker(pq_signer=signer)
+    try:
+        component_id = next(iter(tracker.components_db.keys()))
+        tracker.add_custody_event(component_id, {"stage": "DISTRIBUTION", "handler": "H", "location": "L",
+                                                 "action": "MOVED"})
+        assert tracker.verify_component_authenticity(component_id, full_chain=True)["authentic"]
+
+        chain = tracker.components_db[component_id].custody_chain
+        forged = bytearray(bytes.fromhex(chain[-1]["pq_signature"]))
+        forged[-1] ^= 1
+        chain[-1] = CustodyEvent.from_dict(dict(chain[-1], pq_signature=forged.hex()))
+        assert not tracker.verify_component_authenticity(component_id, full_chain=True)["authentic"]
+    finally:
+        tracker.close()
+
+def test_bulk_events_stop_cleanly_when_the_key_runs_out(signer):
+    tracker = SupplyChainTracker(pq_signer=signer, load_samples=False)
+    try:
+        for name in ("PQ-1", "PQ-2", "PQ-3"):
+            tracker.register_component({
+                "component_id": name, "component_name": "Part", "manufacturer": "IIT_MADRAS",
+                "manufacturing_date": "2024-08-01", "batch_id": "B-1", "indigenous_certification": True,
+                "security_clearance": "SECRET"
+            })
+        assert signer.remaining == signer.capacity - 3
+        moves = [(name, {"stage": "DISTRIBUTION", "handler": "H", "location": "L", "action": f"MOVE {i}"})
+                 for i in range(5) for name in ("PQ-1", "PQ-2", "PQ-3")]
+        # Each batch of three components needs three leaves: seven cover two batches
+        while signer.remaining > 7:
+            signer.sign(b"spent")
+        result = tracker.add_custody_events_bulk(moves, batch_size=3)
+        assert result["recorded"] == 6 and result["failed"] == 9
+        assert {error["index"] for error in result["errors"]} == set(range(6, 15))
+        assert all("exhausted" in error["error"] for error in result["errors"])
+        assert signer.remaining == 1  # the refused batch spent nothing
+        for name in ("PQ-1", "PQ-2", "PQ-3"):
+            assert len(tracker.components_db[name].custody_chain) == 3
+            assert tracker.verify_component_authenticity(name, full_chain=True)["authentic"]
+
+        assert tracker.add_custody_event("PQ-1", moves[0][1])  # the last leaf
+        with pytest.raises(KeyExhaustedError):
+            tracker.add_custody_event("PQ-1", moves[0][1])
+        assert len(tracker.components_db["PQ-1"].custody_chain) == 4
+    finally:
+        tracker.close()
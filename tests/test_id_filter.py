@@ -0,0 +1,73 @@
+import pytest
+
+from ledger_bloom import BloomFilter
+from ledger_mapped import MappedLedgerStorage
+from ledger_storage import AppendOnlyLogStorage
+from supply_chain_tracker import SupplyChainTracker
+
+COUNT = 1100
+
+def component(index):
+    return {
+        "component_id": f"BLM-{index:05d}", "component_name": "Relay", "manufacturer": "IIT_MADRAS",
+        "manufacturing_date": "2024-07-01", "batch_id": "B-1", "indigenous_certification": True,
+        "security_clearance": "SECRET"
+    }
+
+def test_bloom_filter_has_no_false_negatives_and_few_false_positives():
+    keys = [f"K{i}" for i in range(2000)]
+    bloom = BloomFilter.from_keys(keys, 2000, 0.01)
+    assert all(key in bloom for key in keys)
+    false_positives = sum(f"X{i}" in bloom for i in range(10000))
+    assert false_positives < 300
+
+def test_unregistered_ids_skip_storage_and_registered_ids_survive_growth(tmp_path, monkeypatch):
+    storage = AppendOnlyLogStorage(str(tmp_path))
+    tracker = SupplyChainTracker(storage=storage, load_samples=False)
+    # Past the initial capacity, so the filter is rebuilt on saturation
+    for index in range(COUNT):
+        tracker.register_component(component(index))
+    assert tracker.id_filter.capacity > 1024
+    assert all(tracker.components_db.get(f"BLM-{index:05d}") is not None for index in range(0, COUNT, 37))
+
+    probes = []
+    monkeypatch.setattr(storage, "get", lambda *args: probes.append(args) or None)
+    assert tracker.get_component_tracking("NOPE-1") is None
+    assert tracker.add_custody_event("NOPE-2", {"stage": "DISTRIBUTION", "handler": "H", "location": "L",
+                                                "action": "A"}) is False
+    assert probes == [] and tracker.id_filter_stats()["rejections"] == 2
+    monkeypatch.undo()
+    tracker.close()
+
+    reopened = SupplyChainTracker(storage=AppendOnlyLogStorage(str(tmp_path)), load_samples=False)
+    try:
+        assert all(f"BLM-{index:05d}" in reopened.id_filter for index in range(COUNT))
+        assert reopened.get_component_tracking("BLM-01099")["component_id"] == "BLM-01099"
+    finally:
+        reopened.close()
+
+def test_re_registering_does_not_inflate_the_filter_count():
+    tracker = SupplyChainTracker(load_samples=False)
+    try:
+        for _ in range(3):
+            for index in range(10):
+                tracker.register_component(component(index))
+        assert tracker.id_filter_stats()["count"] == 10
+    finally:
+        tracker.close()
+
+def test_mapped_ledger_skips_the_filter_and_its_startup_scan(tmp_path, monkeypatch):
+    tracker = SupplyChainTracker(load_samples=False)
+    tracker.register_component(component(1))
+    path = str(tmp_path / "audit.ledger")
+    tracker.export_mapped_ledger(path)
+    tracker.close()
+
+    monkeypatch.setattr(MappedLedgerStorage, "keys", lambda self: pytest.fail("decoded every id"))
+    audit = SupplyChainTracker(MappedLedgerStorage(path))
+    try:
+        assert audit.id_filter_stats() == {"enabled": False}
+        assert audit.get_component_tracking("NOPE") is None
+        assert audit.get_component_tracking("BLM-00001")["component_id"] == "BLM-00001"
+    finally:
+        audit.close()
@@ -0,0 +1,143 @@
+import pytest
+
+import random
+
+from ledger_indexes import EventTimeIndex, SecondaryIndex, _TimeSeries
+from ledger_storage import AppendOnlyLogStorage
+from supply_chain_tracker import SupplyChainTracker
+
+MEMBERS = ["IDX-001", "IDX-002"]
+
+def component(component_id):
+    return {
+        "component_id": component_id, "component_name": "Receiver", "manufacturer": "IIT_MADRAS",
+        "manufacturing_date": "2024-04-01", "batch_id": "B-1", "indigenous_certification": True,
+        "security_clearance": "SECRET"
+    }
+
+def event(stage, action="MOVED"):
+    return {"stage": stage, "handler": "H", "location": "Depot", "action": action}
+
+def open_tracker(directory):
+    storage = AppendOnlyLogStorage(str(directory), snapshot_on_close=False)
+    return SupplyChainTracker(storage=storage, load_samples=False, snapshot_on_close=False)
+
+def assert_stages_match_tracking(tracker):
+    for component_id in tracker.components_db.keys():
+        stage = tracker.get_component_tracking(component_id)["custody_chain"][-1]["stage"]
+        assert component_id in tracker.find(stage=stage)
+        assert sum(component_id in posting for posting in tracker.indexes.to_state()["stage"].values()) == 1
+
+@pytest.fixture
+def tracker(tmp_path):
+    tracker = open_tracker(tmp_path)
+    for component_id in MEMBERS + ["IDX-003"]:
+        tracker.register_component(component(component_id))
+        tracker.add_custody_event(component_id, event("QUALITY_CONTROL", "INSPECTED"))
+    yield tracker
+    tracker.close()
+
+def test_find_intersects_postings_and_rejects_unindexed_fields():
+    index = SecondaryIndex()
+    index.add("A", {"batch_id": "B-1", "manufacturer": "M"})
+    index.add("B", {"batch_id": "B-1", "manufacturer": "N"})
+    assert index.find(batch_id="B-1", manufacturer="N") == {"B"}
+    assert index.find(batch_id="B-2") == set()
+    index.assign("A", "stage", "X")
+    index.assign("A", "stage", "Y")
+    assert index.find(stage="Y") == {"A"} and list(index.to_state()["stage"]) == ["Y"]
+    with pytest.raises(ValueError):
+        index.find(location="Depot")
+    with pytest.raises(ValueError):
+        index.find()
+
+def test_find_follows_registrations_replacements_and_restarts(tracker, tmp_path):
+    tracker.register_component(dict(component("IDX-004"), manufacturer="C_DAC", security_clearance="TOP_SECRET"))
+    assert tracker.find(batch_id="B-1") == ["IDX-001", "IDX-002", "IDX-003", "IDX-004"]
+    assert tracker.find(manufacturer="C_DAC") == ["IDX-004"]
+    assert tracker.find(batch_id="B-1", security_clearance="SECRET") == ["IDX-001", "IDX-002", "IDX-003"]
+
+    # A replaced record leaves its old postings, and its fresh chain restarts the stage
+    tracker.register_component(dict(component("IDX-002"), batch_id="B-2"))
+    assert tracker.find(batch_id="B-1") == ["IDX-001", "IDX-003", "IDX-004"]
+    assert tracker.find(batch_id="B-2", stage="MANUFACTURING") == ["IDX-002"]
+    assert tracker.find(stage="QUALITY_CONTROL") == ["IDX-001", "IDX-003"]
+    assert tracker.find(manufacturer="NOBODY") == []
+    expected = {field: tracker.find(**{field: value}) for field, value in (
+        ("batch_id", "B-1"), ("manufacturer", "IIT_MADRAS"), ("stage", "QUALITY_CONTROL"))}
+    tracker.close()
+
+    # Rebuilt from the log alone (this fixture takes no snapshots)
+    reopened = open_tracker(tmp_path)
+    try:
+        assert {field: reopened.find(**{field: value}) for field, value in (
+            ("batch_id", "B-1"), ("manufacturer", "IIT_MADRAS"), ("stage", "QUALITY_CONTROL"))} == expected
+    finally:
+        reopened.close()
+
+def test_find_stage_follows_shipment_events(tracker):
+    tracker.create_shipment("PAL-1", MEMBERS, "H", "Dock")
+    tracker.add_shipment_event("PAL-1", event("IN_TRANSIT"))
+    assert tracker.find(stage="IN_TRANSIT") == MEMBERS
+    assert tracker.find(stage="QUALITY_CONTROL") == ["IDX-003"]
+    assert_stages_match_tracking(tracker)
+
+    tracker.close_shipment("PAL-1", "H", "Base")
+    tracker.add_custody_event(MEMBERS[0], event("INSTALLATION", "MOUNTED"))
+    assert tracker.find(stage="INSTALLATION") == [MEMBERS[0]]
+    assert tracker.find(stage="DISTRIBUTION") == [MEMBERS[1]]
+    assert_stages_match_tracking(tracker)
+
+def test_shipment_events_after_the_snapshot_reach_the_restored_index(tracker, tmp_path):
+    tracker.create_shipment("PAL-1", MEMBERS, "H", "Dock")
+    tracker.snapshot()
+    tracker.add_shipment_event("PAL-1", event("IN_TRANSIT"))
+    tracker.close()
+
+    reopened = open_tracker(tmp_path)
+    try:
+        assert reopened.find(stage="IN_TRANSIT") == MEMBERS
+        assert_stages_match_tracking(reopened)
+    finally:
+        reopened.close()
+
+def test_find_events_by_time_range_and_location(tracker, tmp_path):
+    for day, location in ((9, "Depot"), (3, "Depot"), (5, "Base")):  # out of order on purpose
+        tracker.add_custody_event("IDX-003", dict(event("DISTRIBUTION"), location=location,
+                                                  timestamp=f"2024-02-{day:02d}T00:00:00"))
+    found = tracker.find_events("2024-02-01T00:00:00", "2024-02-09T00:00:00")
+    assert [result["timestamp"] for result in found] == [f"2024-02-0{day}T00:00:00" for day in (3, 5, 9)]
+    assert {result["component_id"] for result in found} == {"IDX-003"}
+    depot = tracker.find_events("2024-02-01T00:00:00", "2024-02-04T00:00:00", location="Depot")
+    chain = tracker.components_db["IDX-003"].custody_chain
+    assert [chain[result["event_index"]]["timestamp"] for result in depot] == ["2024-02-03T00:00:00"]
+
+    # Re-registering retires the old chain's events; the index survives a restart
+    tracker.register_component(dict(component("IDX-003"), batch_id="B-2"))
+    assert tracker.find_events("2024-02-01T00:00:00", "2024-02-09T00:00:00") == []
+    tracker.add_custody_event("IDX-002", dict(event("DISTRIBUTION"), timestamp="2024-02-04T00:00:00"))
+    tracker.snapshot()
+    tracker.close()
+    reopened = open_tracker(tmp_path)
+    try:
+        assert [result["component_id"] for result in reopened.find_events("2024-02-01", "2024-02-09")] == ["IDX-002"]
+        assert reopened.find(batch_id="B-2") == ["IDX-003"]
+    finally:
+        reopened.close()
+
+def test_out_of_order_events_merge_from_the_side_buffer_without_a_resort(monkeypatch):
+    monkeypatch.setattr(_TimeSeries, "MIN_BUFFER", 8)
+    rng = random.Random(7)
+    index, arrivals = EventTimeIndex(), []
+    for event_index in range(600):
+        # Mostly increasing with frequent backdated rows and same-instant ties
+        epoch = event_index * 10 if rng.random() < 0.7 else rng.randrange(0, event_index * 10 + 1, 5)
+        index.add(f"C{event_index % 7}", event_index, epoch, "Depot" if event_index % 3 else "Base")
+        arrivals.append((epoch, f"C{event_index % 7}", event_index))
+        if event_index % 50 == 0:
+            assert [row[1:] for row in sorted(arrivals, key=lambda row: row[0])] == list(index.range(0, 10 ** 6))
+
+    for start, end in ((0, 10 ** 6), (1000, 2500), (4000, 4000)):
+        expected = [row[1:] for row in sorted(arrivals, key=lambda row: row[0]) if start <= row[0] <= end]
+        assert list(index.range(start, end)) == expected
+    assert list(EventTimeIndex.from_state(index.to_state()).range(0, 10 ** 6)) == list(index.range(0, 10 ** 6))
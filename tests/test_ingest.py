@@ -0,0 +1,53 @@
+import json
+
+import pytest
+
+from supply_chain_tracker import SupplyChainTracker
+
+ROW = {
+    "component_id": "ING-001", "component_name": "Controller", "manufacturer": "IIT_MADRAS",
+    "manufacturing_date": "2024-03-01", "batch_id": "B-7", "indigenous_certification": True,
+    "security_clearance": "SECRET"
+}
+
+@pytest.fixture
+def tracker():
+    tracker = SupplyChainTracker(load_samples=False)
+    yield tracker
+    tracker.close()
+
+def test_jsonl_rows_with_wrong_types_are_reported(tracker, tmp_path):
+    rows = [
+        ROW,
+        dict(ROW, component_id="ING-002", manufacturing_date=5),
+        dict(ROW, component_id="ING-003", manufacturer=["IIT_MADRAS"]),
+        dict(ROW, component_id="ING-004", indigenous_certification=1),
+        dict(ROW, component_id="ING-005", indigenous_certification="yes"),
+    ]
+    path = tmp_path / "manifest.jsonl"
+    path.write_text("\n".join(json.dumps(row) for row in rows))
+
+    result = tracker.ingest_components(str(path))
+    assert result["ingested"] == 2
+    assert [error["error"] for error in result["errors"]] == [
+        "Invalid manufacturing_date: 5",
+        "Invalid manufacturer: ['IIT_MADRAS']",
+        "Invalid indigenous_certification: 1",
+    ]
+    assert [error["row"] for error in result["errors"]] == [2, 3, 4]
+    assert tracker.components_db["ING-005"].indigenous_certification
+
+def test_csv_rows_are_validated(tracker, tmp_path):
+    path = tmp_path / "manifest.csv"
+    header = ",".join(ROW)
+    path.write_text(
+        f"{header}\n"
+        "ING-010,Controller,IIT_MADRAS,2024-03-01,B-7,true,SECRET\n"
+        "ING-011,Controller,NOPE,2024-03-01,B-7,true,SECRET\n"
+        "ING-012,Controller,IIT_MADRAS,2024-03-01,B-7,maybe,SECRET\n"
+    )
+    result = tracker.ingest_components(str(path))
+    assert result["ingested"] == 1
+    assert [error["error"] for error in result["errors"]] == [
+        "Unknown manufacturer: NOPE", "Invalid indigenous_certification: maybe"
+    ]
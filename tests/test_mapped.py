@@ -0,0 +1,65 @@
+import pytest
+
+from ledger_mapped import MappedLedgerStorage
+from supply_chain_tracker import SupplyChainTracker
+
+EVENT = {"stage": "DISTRIBUTION", "handler": "H", "location": "Depot", "action": "MOVED"}
+
+@pytest.fixture
+def export(tmp_path):
+    tracker = SupplyChainTracker()
+    component_id = next(iter(tracker.components_db.keys()))
+    tracker.add_custody_event(component_id, EVENT)
+    tracker.create_shipment("PAL-1", [component_id], "H", "Dock")
+    path = str(tmp_path / "audit.ledger")
+    tracker.export_mapped_ledger(path)
+    expected = {
+        cid: (tracker.get_component_tracking(cid), tracker.components_db[cid])
+        for cid in tracker.components_db.keys()
+    }
+    report = tracker.get_supply_chain_report()["summary"]
+    tracker.close()
+    return path, expected, report
+
+def test_audit_tracker_serves_the_exported_ledger(export):
+    path, expected, report = export
+    audit = SupplyChainTracker(MappedLedgerStorage(path))
+    try:
+        for component_id, (tracking, entry) in expected.items():
+            assert audit.components_db[component_id].to_entry() == entry
+            assert audit.get_component_tracking(component_id) == tracking
+            assert audit.verify_component_authenticity(component_id, full_chain=True)["authentic"]
+        assert audit.get_supply_chain_report()["summary"] == report
+        assert "NOPE" not in audit.components_db
+        with pytest.raises(ValueError):
+            audit.add_custody_event(next(iter(expected)), EVENT)
+    finally:
+        audit.close()
+
+def test_tampered_mapped_event_fails_verification(export):
+    path, expected, _ = export
+    component_id = next(iter(expected))
+    with open(path, "r+b") as f:
+        data = f.read()
+        # Strings are deduplicated, so this edits the location of every "Depot" event
+        position = data.rindex(EVENT["location"].encode())
+        f.seek(position)
+        f.write(b"d")
+
+    audit = SupplyChainTracker(MappedLedgerStorage(path))
+    try:
+        assert audit.components_db[component_id].custody_chain[-1]["location"] == "depot"
+        assert not audit.verify_component_authenticity(component_id, full_chain=True)["authentic"]
+    finally:
+        audit.close()
+
+@pytest.mark.parametrize("damage", ["empty", "magic", "truncate"])
+def test_damaged_mapped_files_are_refused(export, damage):
+    path = export[0]
+    with open(path, "rb") as f:
+        data = f.read()
+    data = {"empty": b"", "magic": b"XXXXXXXX" + data[8:], "truncate": data[:len(data) // 2]}[damage]
+    with open(path, "wb") as f:
+        f.write(data)
+    with pytest.raises(ValueError):
+        MappedLedgerStorage(path)
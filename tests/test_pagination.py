@@ -0,0 +1,66 @@
+import pytest
+
+from supply_chain_tracker import SupplyChainTracker
+
+COMPONENT = "PAGE-001"
+
+def event(stage, day, action="MOVED"):
+    return {"stage": stage, "handler": "H", "location": f"Site {day}", "action": action,
+            "timestamp": f"2024-06-{day:02d}T10:00:00"}
+
+@pytest.fixture
+def tracker():
+    tracker = SupplyChainTracker(load_samples=False)
+    tracker.register_component({
+        "component_id": COMPONENT, "component_name": "Sensor", "manufacturer": "IIT_MADRAS",
+        "manufacturing_date": "2024-06-01", "batch_id": "B-1", "indigenous_certification": True,
+        "security_clearance": "SECRET"
+    })
+    # Own events and shipment events interleave by time
+    tracker.add_custody_event(COMPONENT, event("QUALITY_CONTROL", 2))
+    tracker.create_shipment("PAL-1", [COMPONENT], "H", "Dock", timestamp="2024-06-03T10:00:00")
+    tracker.add_shipment_event("PAL-1", event("DISTRIBUTION", 5))
+    tracker.add_custody_event(COMPONENT, event("QUALITY_CONTROL", 4, "RESEALED"))
+    tracker.add_shipment_event("PAL-1", event("DISTRIBUTION", 6))
+    tracker.add_custody_event(COMPONENT, event("INSTALLATION", 7))
+    yield tracker
+    tracker.close()
+
+def all_pages(tracker, limit, **kwargs):
+    pages, cursor = [], None
+    while True:
+        page = tracker.get_custody_page(COMPONENT, limit=limit, cursor=cursor, **kwargs)
+        pages.append(page["events"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return pages
+
+def strip_position(events):
+    return [{name: value for name, value in event.items() if name != "position"} for event in events]
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 100])
+def test_pages_walk_the_tracked_timeline(tracker, limit):
+    timeline = tracker.get_component_tracking(COMPONENT)["custody_chain"]
+    oldest = [event for page in all_pages(tracker, limit, newest_first=False) for event in page]
+    newest = [event for page in all_pages(tracker, limit) for event in page]
+    assert strip_position(oldest) == timeline
+    assert strip_position(newest) == timeline[::-1]
+    assert [event["position"] for event in oldest] == list(range(len(timeline)))
+    assert all(len(page) <= limit for page in all_pages(tracker, limit))
+
+def test_stage_filter_and_resume_after_appends(tracker):
+    page = tracker.get_custody_page(COMPONENT, limit=2, newest_first=False, stages=["QUALITY_CONTROL"])
+    assert [event["action"] for event in page["events"]] == ["MOVED", "RESEALED"]
+
+    first = tracker.get_custody_page(COMPONENT, limit=3, newest_first=False)
+    tracker.add_custody_event(COMPONENT, event("OPERATIONAL", 8))
+    rest = tracker.get_custody_page(COMPONENT, limit=100, newest_first=False, cursor=first["next_cursor"])
+    assert [e["position"] for e in first["events"] + rest["events"]] == list(range(8))
+    assert rest["events"][-1]["stage"] == "OPERATIONAL"
+
+def test_bad_limit_and_unknown_component(tracker):
+    with pytest.raises(ValueError):
+        tracker.get_custody_page(COMPONENT, limit=0)
+    assert tracker.get_custody_page("NOPE") is None
+    assert tracker.render_custody_events("NOPE") is None
+    assert len(list(tracker.render_custody_events(COMPONENT, limit=2))) == 2
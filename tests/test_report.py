@@ -0,0 +1,40 @@
+from supply_chain_tracker import SupplyChainTracker
+
+def component(component_id, manufacturer="IIT_MADRAS", clearance="SECRET", indigenous=True):
+    return {
+        "component_id": component_id, "component_name": "Module", "manufacturer": manufacturer,
+        "manufacturing_date": "2024-09-01", "batch_id": "B-1", "indigenous_certification": indigenous,
+        "security_clearance": clearance
+    }
+
+def report_state(tracker):
+    report = tracker.get_supply_chain_report()
+    return report["summary"], report["manufacturer_breakdown"], report["security_clearance_distribution"]
+
+def rebuilt(tracker):
+    return SupplyChainTracker(storage=tracker.components_db, load_samples=False, keyring=tracker.keyring)
+
+def test_running_aggregates_match_a_rebuild_after_replacements():
+    tracker = SupplyChainTracker()
+    baseline = report_state(tracker)[0]["total_components"]
+    tracker.register_component(component("RPT-1", "C_DAC", "TOP_SECRET", indigenous=False))
+    tracker.register_component(component("RPT-2"))
+    tracker.register_component(component("RPT-1", "BEL_INDIA", "CONFIDENTIAL"))  # replaces the first record
+    tracker.add_custody_event("RPT-2", {"stage": "DISTRIBUTION", "handler": "H", "location": "L", "action": "A"})
+
+    summary, breakdown, clearances = report_state(tracker)
+    assert report_state(rebuilt(tracker)) == (summary, breakdown, clearances)
+    # The replaced record's contribution is gone
+    assert summary["total_components"] == baseline + 2
+    assert summary["indigenous_components"] == summary["total_components"]
+
+def test_refresh_aggregates_after_a_manufacturer_edit():
+    tracker = SupplyChainTracker()
+    verified = report_state(tracker)[0]["verified_components"]
+    affected = len(tracker.find(manufacturer="IIT_MADRAS"))
+    assert affected
+
+    del tracker.manufacturers_db["IIT_MADRAS"]
+    tracker.refresh_aggregates()
+    assert report_state(tracker)[0]["verified_components"] == verified - affected
+    assert report_state(tracker)[1].get("UNKNOWN") == affected
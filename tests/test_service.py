@@ -0,0 +1,121 @@
+import asyncio
+import json
+
+import pytest
+
+from ledger_hashsig import HashSigner
+from supply_chain_tracker import SupplyChainTracker
+from tracker_service import TrackerService
+
+COMPONENT = {
+    "component_id": "SVC-001", "component_name": "Radio", "manufacturer": "IIT_MADRAS",
+    "manufacturing_date": "2024-06-01", "batch_id": "B-1", "indigenous_certification": True,
+    "security_clearance": "SECRET"
+}
+
+@pytest.fixture
+def service():
+    tracker = SupplyChainTracker(load_samples=False, concurrent=True)
+    yield TrackerService(tracker)
+    tracker.close()
+
+def call(service, method, target, data=None):
+    body = json.dumps(data).encode() if data is not None else b""
+    status, payload = asyncio.run(service._dispatch(method, target, {}, body))
+    return status.value, payload
+
+def raw_exchange(service, request: bytes) -> bytes:
+    """Send raw bytes to a running service and read until it closes the connection"""
+    async def run():
+        service.port = 0
+        await service.start()
+        try:
+            reader, writer = await asyncio.open_connection(service.host, service.port)
+            writer.write(request)
+            await writer.drain()
+            response = await asyncio.wait_for(reader.read(), 5)
+            writer.close()
+            return response
+        finally:
+            await service.close()
+    return asyncio.run(run())
+
+def test_register_then_duplicate_is_a_conflict(service):
+    status, payload = call(service, "POST", "/components", COMPONENT)
+    assert status == 201
+    call(service, "POST", "/components/SVC-001/events",
+         {"stage": "DISTRIBUTION", "handler": "H", "location": "Depot", "action": "MOVED"})
+
+    status, payload = call(service, "POST", "/components", dict(COMPONENT, batch_id="B-2"))
+    assert status == 409
+    assert "already exists" in payload["error"]
+    # The original record and its history are untouched
+    component = service.tracker.components_db["SVC-001"]
+    assert component.batch_id == "B-1" and len(component.custody_chain) == 2
+
+def test_duplicate_shipment_is_a_conflict(service):
+    call(service, "POST", "/components", COMPONENT)
+    shipment = {"shipment_id": "PAL-1", "component_ids": ["SVC-001"], "handler": "H", "location": "Dock"}
+    assert call(service, "POST", "/shipments", shipment)[0] == 201
+    assert call(service, "POST", "/shipments", shipment)[0] == 409
+
+def test_missing_body_field_and_unknown_manufacturer_are_distinguished(service):
+    incomplete = {name: value for name, value in COMPONENT.items() if name != "batch_id"}
+    assert call(service, "POST", "/components", incomplete) == (400, {"error": "Missing field: batch_id"})
+    assert call(service, "POST", "/components", dict(COMPONENT, manufacturer="NOPE")) == (
+        400, {"error": "Unknown manufacturer: NOPE"}
+    )
+    status, payload = call(service, "POST", "/components/SVC-001/events", {"stage": "DISTRIBUTION"})
+    assert status == 400 and payload["error"].startswith("Missing field: handler")
+
+def test_negative_content_length_gets_a_400(service):
+    response = raw_exchange(service, b"POST /components HTTP/1.1\r\nHost: x\r\nContent-Length: -1\r\n\r\n")
+    assert response.startswith(b"HTTP/1.1 400 ")
+    assert b"Invalid Content-Length" in response
+
+def test_keep_alive_requests_are_answered_in_order(service):
+    response = raw_exchange(
+        service,
+        b"GET /health HTTP/1.1\r\nHost: x\r\n\r\n"
+        b"GET /components/NOPE HTTP/1.1\r\nHost: x\r\nConnection: close\r\n\r\n"
+    )
+    first, second = response.split(b"HTTP/1.1 ")[1:]
+    assert first.startswith(b"200 ") and second.startswith(b"404 ")
+
+def test_wrongly_typed_component_fields_are_a_400_not_a_truthy_value(service):
+    assert call(service, "POST", "/components", dict(COMPONENT, indigenous_certification="false"))[0] == 201
+    assert service.tracker.components_db["SVC-001"].indigenous_certification is False
+    summary = service.tracker.get_supply_chain_report()["summary"]
+    assert summary["indigenous_components"] == 0
+
+    for field, value in (("component_id", 123), ("batch_id", None), ("indigenous_certification", "maybe")):
+        status, payload = call(service, "POST", "/components", {**COMPONENT, "component_id": "SVC-002", field: value})
+        assert status == 400, payload
+    assert service.tracker.get_supply_chain_report()["summary"]["total_components"] == 1
+
+def test_wrongly_typed_event_and_shipment_fields_are_a_400(service):
+    call(service, "POST", "/components", COMPONENT)
+    event = {"stage": "DISTRIBUTION", "handler": "H", "location": "Depot", "action": "MOVED"}
+    for field, value in (("action", None), ("location", 7), ("verified_by", ["QA"]), ("timestamp", 1)):
+        status, payload = call(service, "POST", "/components/SVC-001/events", dict(event, **{field: value}))
+        assert status == 400 and field in payload["error"], payload
+    assert len(service.tracker.components_db["SVC-001"].custody_chain) == 1
+
+    shipment = {"shipment_id": "PAL-1", "component_ids": "SVC-001", "handler": "H", "location": "Dock"}
+    assert call(service, "POST", "/shipments", shipment)[0] == 400
+    assert call(service, "POST", "/shipments", dict(shipment, component_ids=[1]))[0] == 400
+
+def test_an_exhausted_pq_key_is_a_503():
+    signer = HashSigner.generate(top_height=1, subtree_height=1)
+    tracker = SupplyChainTracker(load_samples=False, concurrent=True, pq_signer=signer)
+    try:
+        service = TrackerService(tracker)
+        assert call(service, "POST", "/components", COMPONENT)[0] == 201
+        while signer.remaining:
+            signer.sign(b"spent")
+        event = {"stage": "DISTRIBUTION", "handler": "H", "location": "Depot", "action": "MOVED"}
+        status, payload = call(service, "POST", "/components/SVC-001/events", event)
+        assert status == 503 and "exhausted" in payload["error"]
+        assert call(service, "POST", "/components", dict(COMPONENT, component_id="SVC-002"))[0] == 503
+    finally:
+        tracker.close()
@@ -0,0 +1,55 @@
+import pytest
+
+from ledger_storage import AppendOnlyLogStorage
+from supply_chain_tracker import SupplyChainTracker
+
+MEMBERS = ["SHP-1", "SHP-2"]
+
+def component(component_id, batch_id="B-1"):
+    return {
+        "component_id": component_id, "component_name": "Antenna", "manufacturer": "IIT_MADRAS",
+        "manufacturing_date": "2024-06-01", "batch_id": batch_id, "indigenous_certification": True,
+        "security_clearance": "SECRET"
+    }
+
+def event(stage):
+    return {"stage": stage, "handler": "H", "location": "Depot", "action": "MOVED"}
+
+def open_tracker(directory):
+    return SupplyChainTracker(storage=AppendOnlyLogStorage(str(directory)), load_samples=False)
+
+@pytest.fixture
+def tracker(tmp_path):
+    tracker = open_tracker(tmp_path)
+    for component_id in MEMBERS:
+        tracker.register_component(component(component_id))
+    tracker.create_shipment("PAL-1", MEMBERS, "H", "Dock")
+    tracker.add_shipment_event("PAL-1", event("IN_TRANSIT"))
+    yield tracker
+    tracker.close()
+
+def test_members_inherit_shipment_events(tracker):
+    for component_id in MEMBERS:
+        stages = [e["stage"] for e in tracker.get_component_tracking(component_id)["custody_chain"]]
+        assert stages[-1] == "IN_TRANSIT"
+        assert tracker.verify_component_authenticity(component_id)["inherited_events"] == 2
+
+def test_a_replaced_component_leaves_its_old_shipments(tracker, tmp_path):
+    tracker.register_component(component("SHP-1", batch_id="B-2"))
+    assert tracker.verify_component_authenticity("SHP-1")["inherited_events"] == 0
+    assert [e["action"] for e in tracker.get_component_tracking("SHP-1")["custody_chain"]] == ["COMPONENT_CREATED"]
+    assert tracker.find(stage="MANUFACTURING") == ["SHP-1"]
+
+    # The other member keeps the pallet; the new record can be packed again
+    tracker.add_shipment_event("PAL-1", event("WAREHOUSE"))
+    assert tracker.find(stage="WAREHOUSE") == ["SHP-2"]
+    tracker.create_shipment("PAL-2", ["SHP-1"], "H", "Dock")
+    tracker.close()
+
+    reopened = open_tracker(tmp_path)
+    try:
+        assert reopened.shipments.shipments_of("SHP-1") == ["PAL-2"]
+        assert reopened.verify_component_authenticity("SHP-1")["inherited_events"] == 1
+        assert reopened.verify_component_authenticity("SHP-2")["inherited_events"] == 3
+    finally:
+        reopened.close()
@@ -0,0 +1,67 @@
+from dataclasses import replace
+
+import pytest
+
+from ledger_signing import ManufacturerKeyring
+
+from ledger_storage import AppendOnlyLogStorage
+from supply_chain_tracker import SupplyChainTracker
+
+def test_report_counts_only_components_with_valid_signatures(tmp_path):
+    tracker = SupplyChainTracker(storage=AppendOnlyLogStorage(str(tmp_path)))
+    total = len(tracker.components_db)
+    target = next(iter(tracker.components_db.keys()))
+    tracker.close()
+
+    # Swap in a record whose hash and chain still check out but whose signature is forged
+    storage = AppendOnlyLogStorage(str(tmp_path))
+    storage.put_component(replace(storage[target], digital_signature="00" * 64))
+    storage.close()
+
+    reopened = SupplyChainTracker(storage=AppendOnlyLogStorage(str(tmp_path)))
+    try:
+        summary = reopened.get_supply_chain_report()["summary"]
+        result = reopened.verify_component_authenticity(target)
+        assert result["chain_integrity"] and result["hash_verification"]
+        assert not result["signature_verification"] and not result["authentic"]
+        assert summary["verified_components"] == total - 1
+        authentic = [r.authentic for r in reopened.verify_many(reopened.components_db.keys(), workers=1)]
+        assert sum(authentic) == summary["verified_components"]
+    finally:
+        reopened.close()
+
+def test_events_on_a_forged_record_keep_it_unverified(tmp_path):
+    tracker = SupplyChainTracker(storage=AppendOnlyLogStorage(str(tmp_path)))
+    target = next(iter(tracker.components_db.keys()))
+    verified = tracker.get_supply_chain_report()["summary"]["verified_components"]
+    tracker.close()
+    storage = AppendOnlyLogStorage(str(tmp_path))
+    storage.put_component(replace(storage[target], digital_signature="00" * 64))
+    storage.close()
+
+    reopened = SupplyChainTracker(storage=AppendOnlyLogStorage(str(tmp_path)))
+    try:
+        reopened.add_custody_event(target, {"stage": "DISTRIBUTION", "handler": "H", "location": "L", "action": "A"})
+        assert reopened.get_supply_chain_report()["summary"]["verified_components"] == verified - 1
+    finally:
+        reopened.close()
+
+def test_keyring_never_mints_a_key_for_an_unknown_signer(tmp_path):
+    keyring = ManufacturerKeyring()
+    with pytest.raises(ValueError, match="No signing key"):
+        keyring.sign("MALLORY", b"message")
+    assert keyring.public_key("MALLORY") is None
+
+    tracker = SupplyChainTracker(storage=AppendOnlyLogStorage(str(tmp_path)))
+    try:
+        signers = set(tracker.keyring.public_keys())
+        component_id = next(iter(tracker.components_db.keys()))
+        tracker.create_shipment("PAL-1", [component_id], "MALLORY", "Dock")
+        tracker.add_shipment_event("PAL-1", {"stage": "DISTRIBUTION", "handler": "MALLORY", "location": "L",
+                                             "action": "MOVED"})
+        assert "MALLORY" not in tracker.keyring.public_keys()
+        assert set(tracker.keyring.public_keys()) <= signers | {"TRACKER_SHIPMENTS"}
+        assert tracker.get_shipment("PAL-1")["verified"]
+        assert tracker.verify_component_authenticity(component_id)["shipment_verification"]
+    finally:
+        tracker.close()
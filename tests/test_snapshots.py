@@ -0,0 +1,130 @@
+import os
+import pickle
+import zlib
+
+import pytest
+
+from ledger_storage import AppendOnlyLogStorage
+from supply_chain_tracker import (
+    SupplyChainTracker, TRACKER_SNAPSHOT_FILE, TRACKER_SNAPSHOT_HEADER, TRACKER_SNAPSHOT_MAGIC
+)
+
+def open_tracker(directory, **kwargs):
+    return SupplyChainTracker(storage=AppendOnlyLogStorage(str(directory)), **kwargs)
+
+def state_of(tracker):
+    report = tracker.get_supply_chain_report()
+    return (
+        report["summary"], report["manufacturer_breakdown"],
+        sorted(tracker.find(manufacturer="IIT_MADRAS")),
+        {cid: len(tracker.components_db[cid].custody_chain) for cid in tracker.components_db.keys()},
+    )
+
+@pytest.fixture
+def ledger(tmp_path):
+    """A closed ledger with sample components, extra events and its snapshots"""
+    tracker = open_tracker(tmp_path)
+    for component_id in list(tracker.components_db.keys())[:3]:
+        tracker.add_custody_event(component_id, {
+            "stage": "DISTRIBUTION", "handler": "H", "location": "Depot", "action": "MOVED"
+        })
+    expected = state_of(tracker)
+    tracker.close()
+    return tmp_path, expected
+
+def test_close_snapshots_and_reopen_restores(ledger, monkeypatch):
+    directory, expected = ledger
+    assert os.path.exists(directory / TRACKER_SNAPSHOT_FILE)
+
+    def no_rebuild(self):
+        raise AssertionError("reopen rebuilt instead of restoring the snapshot")
+    monkeypatch.setattr(SupplyChainTracker, "_rebuild_aggregates", no_rebuild)
+    tracker = open_tracker(directory)
+    try:
+        assert state_of(tracker) == expected
+    finally:
+        tracker.close()
+
+@pytest.mark.parametrize("damage", ["truncate", "flip", "empty", "old_format"])
+def test_damaged_tracker_snapshot_falls_back_to_rebuild(ledger, damage):
+    directory, expected = ledger
+    path = directory / TRACKER_SNAPSHOT_FILE
+    data = path.read_bytes()
+    if damage == "truncate":
+        data = data[:len(data) // 2]
+    elif damage == "flip":
+        data = data[:-10] + bytes([data[-10] ^ 0xFF]) + data[-9:]
+    elif damage == "empty":
+        data = b""
+    else:
+        data = b"TSNAP001" + data[TRACKER_SNAPSHOT_HEADER.size:]
+    path.write_bytes(data)
+
+    tracker = open_tracker(directory)
+    try:
+        assert state_of(tracker) == expected
+    finally:
+        tracker.close()
+    # The rebuilt state was snapshotted again on close
+    assert path.read_bytes()[:8] == TRACKER_SNAPSHOT_MAGIC
+
+def test_snapshot_naming_a_global_is_refused(ledger, tmp_path):
+    directory, expected = ledger
+    marker = tmp_path / "executed"
+    payload = pickle.dumps(_Exploit(str(marker)), protocol=4)
+    header = TRACKER_SNAPSHOT_HEADER.pack(TRACKER_SNAPSHOT_MAGIC, zlib.crc32(payload), len(payload))
+    (directory / TRACKER_SNAPSHOT_FILE).write_bytes(header + payload)
+
+    tracker = open_tracker(directory)
+    try:
+        assert state_of(tracker) == expected
+    finally:
+        tracker.close()
+    assert not marker.exists()
+
+class _Exploit:
+    def __init__(self, path):
+        self.path = path
+
+    def __reduce__(self):
+        return open, (self.path, "w")
+
+@pytest.mark.parametrize("damage", ["truncate", "flip", "empty"])
+def test_damaged_ledger_snapshot_reindexes_the_log(ledger, damage):
+    directory, expected = ledger
+    path = directory / AppendOnlyLogStorage.SNAPSHOT_FILE
+    data = path.read_bytes()
+    if damage == "truncate":
+        data = data[:len(data) - 7]
+    elif damage == "flip":
+        data = data[:30] + bytes([data[30] ^ 0xFF]) + data[31:]
+    else:
+        data = b""
+    path.write_bytes(data)
+
+    tracker = open_tracker(directory)
+    try:
+        assert state_of(tracker) == expected
+        # A fresh, valid snapshot replaced the damaged one
+        assert tracker.components_db.snapshot_end == os.path.getsize(directory / AppendOnlyLogStorage.LOG_FILE)
+    finally:
+        tracker.close()
+
+def test_snapshot_every_bounds_the_replayed_tail(tmp_path):
+    storage = AppendOnlyLogStorage(str(tmp_path), snapshot_on_close=False)
+    tracker = SupplyChainTracker(storage=storage, snapshot_every=5, snapshot_on_close=False)
+    component_id = next(iter(tracker.components_db.keys()))
+    for sequence in range(12):
+        tracker.add_custody_event(component_id, {
+            "stage": "DISTRIBUTION", "handler": "H", "location": "Depot", "action": f"MOVE_{sequence}"
+        })
+    assert tracker._writes_since_snapshot < 5
+    expected = state_of(tracker)
+    tracker.components_db.close()  # crash after the last automatic snapshot
+
+    reopened = open_tracker(tmp_path)
+    try:
+        assert len(list(reopened.components_db.changes_since_snapshot())) <= 1
+        assert state_of(reopened) == expected
+    finally:
+        reopened.close()
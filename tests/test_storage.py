@@ -0,0 +1,125 @@
+import os
+import threading
+import time
+
+from ledger_models import SupplyChainEntry, CustodyEvent
+from ledger_storage import AppendOnlyLogStorage
+
+def make_entry(component_id, events=1):
+    chain = [
+        CustodyEvent("MANUFACTURING", "MFG", f"2024-01-01T00:00:0{i}", "Chennai", f"STEP_{i}", "QA")
+        for i in range(events)
+    ]
+    return SupplyChainEntry(component_id, "Part", "IIT_MADRAS", "2024-01-01", "B1", "h" * 64, "s" * 128,
+                            chain, True, "SECRET")
+
+def add_event(storage, component_id, action):
+    storage.append_event(component_id, CustodyEvent("DISTRIBUTION", "H", "2024-02-01T00:00:00", "Delhi", action, "QA"))
+
+def chains(storage):
+    return {component_id: [dict(event) for event in storage[component_id].custody_chain] for component_id in storage}
+
+def test_close_checkpoints_index(tmp_path):
+    storage = AppendOnlyLogStorage(str(tmp_path))
+    storage.put_components([make_entry(f"C{i}", 2) for i in range(5)])
+    add_event(storage, "C1", "MOVED")
+    expected = chains(storage)
+    storage.close()
+
+    assert os.path.getsize(tmp_path / AppendOnlyLogStorage.INDEX_FILE) == 0
+    reopened = AppendOnlyLogStorage(str(tmp_path))
+    try:
+        assert reopened.snapshot_end == os.path.getsize(tmp_path / AppendOnlyLogStorage.LOG_FILE)
+        assert chains(reopened) == expected
+    finally:
+        reopened.close()
+
+def test_reopen_without_close_replays_journal(tmp_path):
+    storage = AppendOnlyLogStorage(str(tmp_path), snapshot_on_close=False)
+    storage.put_component(make_entry("C0"))
+    storage.close()
+    crashed = AppendOnlyLogStorage(str(tmp_path), snapshot_on_close=False)
+    add_event(crashed, "C0", "AFTER_CHECKPOINT")
+    crashed.flush()
+
+    # A second process opening the directory sees the un-checkpointed tail
+    recovered = AppendOnlyLogStorage(str(tmp_path), snapshot_on_close=False)
+    try:
+        assert [event["action"] for event in recovered["C0"].custody_chain] == ["STEP_0", "AFTER_CHECKPOINT"]
+    finally:
+        recovered.close()
+        crashed.close()
+
+def test_torn_log_tail_is_dropped(tmp_path):
+    storage = AppendOnlyLogStorage(str(tmp_path))
+    storage.put_component(make_entry("C0", 3))
+    storage.close()
+    log_path = tmp_path / AppendOnlyLogStorage.LOG_FILE
+    size = os.path.getsize(log_path)
+    with open(log_path, "ab") as f:
+        f.write(b"\x10\x00\x00\x00garbage")
+
+    reopened = AppendOnlyLogStorage(str(tmp_path))
+    try:
+        assert len(reopened["C0"].custody_chain) == 3
+        assert os.path.getsize(log_path) == size
+    finally:
+        reopened.close()
+
+def test_writes_after_snapshot_are_replayed(tmp_path):
+    storage = AppendOnlyLogStorage(str(tmp_path), snapshot_on_close=False)
+    storage.put_components([make_entry("C0"), make_entry("C1")])
+    storage.snapshot()
+    add_event(storage, "C0", "TAIL")
+    storage.put_component(make_entry("C2"))
+    expected = chains(storage)
+    storage.close()
+
+    reopened = AppendOnlyLogStorage(str(tmp_path))
+    try:
+        assert chains(reopened) == expected
+        changed = {component_id: appended for component_id, _, appended in reopened.changes_since_snapshot()}
+        assert changed == {"C0": True, "C2": False}
+    finally:
+        reopened.close()
+
+def test_durable_writes_share_fsyncs_and_survive_a_crash(tmp_path, monkeypatch):
+    storage = AppendOnlyLogStorage(str(tmp_path), fsync_every=10**6, snapshot_on_close=False)
+    storage.put_components([make_entry(f"C{i}") for i in range(8)])
+    fsyncs = []
+    real_fsync = os.fsync
+
+    def slow_fsync(fd):
+        fsyncs.append(fd)
+        time.sleep(0.002)
+        real_fsync(fd)
+    monkeypatch.setattr(os, "fsync", slow_fsync)
+    early = []
+
+    def writer(number):
+        for sequence in range(10):
+            token = storage.append_event(f"C{number}", CustodyEvent(
+                "DISTRIBUTION", "H", "2024-02-01T00:00:00", "Delhi", f"MOVE_{sequence}", "QA"
+            ))
+            storage.wait_durable(token)
+            if storage._durable_end < token:
+                early.append(token)
+    threads = [threading.Thread(target=writer, args=(number,)) for number in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert early == []
+    # One fsync of the log and one of the index per group, fewer groups than writes
+    assert len(fsyncs) // 2 < 80
+
+    # Crash: never closed, no snapshot; a new process replays the synced tail
+    recovered = AppendOnlyLogStorage(str(tmp_path), snapshot_on_close=False)
+    try:
+        for number in range(8):
+            assert [event["action"] for event in recovered[f"C{number}"].custody_chain][1:] == [
+                f"MOVE_{sequence}" for sequence in range(10)
+            ]
+    finally:
+        recovered.close()
+        storage.close()
@@ -0,0 +1,63 @@
+import pytest
+
+from ledger_cache import VerificationCache
+from supply_chain_tracker import SupplyChainTracker
+
+EVENT = {"stage": "DISTRIBUTION", "handler": "H", "location": "Depot", "action": "MOVED"}
+
+@pytest.fixture
+def tracker():
+    tracker = SupplyChainTracker()
+    yield tracker
+    tracker.close()
+
+def test_writes_and_shipment_events_retire_cached_results(tracker):
+    component_id = next(iter(tracker.components_db.keys()))
+    first = tracker.verify_component_authenticity(component_id)
+    assert tracker.verify_component_authenticity(component_id) == first
+    assert tracker.verification_cache_stats()["hits"] == 1
+
+    tracker.add_custody_event(component_id, EVENT)
+    result = tracker.verify_component_authenticity(component_id)
+    assert result["custody_events"] == first["custody_events"] + 1
+    assert tracker.verification_cache_stats()["hits"] == 1
+
+    tracker.create_shipment("PAL-1", [component_id], "H", "Dock")
+    assert tracker.verify_component_authenticity(component_id)["inherited_events"] == 1
+    tracker.add_shipment_event("PAL-1", EVENT)
+    assert tracker.verify_component_authenticity(component_id)["inherited_events"] == 2
+
+def test_callers_cannot_edit_a_cached_result(tracker):
+    component_id = next(iter(tracker.components_db.keys()))
+    tracker.create_shipment("PAL-1", [component_id], "H", "Dock")
+    for _ in range(2):  # the miss that fills the cache, then a hit
+        result = tracker.verify_component_authenticity(component_id)
+        result["shipments"].append("FORGED")
+        result["authentic"] = False
+    cached = tracker.verify_component_authenticity(component_id)
+    assert cached["shipments"] == ["PAL-1"] and cached["authentic"]
+    assert tracker.verification_cache_stats()["hits"] == 2
+
+def test_full_chain_checks_bypass_the_cache(tracker):
+    component_id = next(iter(tracker.components_db.keys()))
+    tracker.verify_component_authenticity(component_id)
+    chain = tracker.components_db[component_id].custody_chain
+    chain[0] = type(chain[0]).from_dict(dict(chain[0], location="ELSEWHERE"))
+    assert tracker.verify_component_authenticity(component_id)["authentic"]  # cached until the next write
+    assert not tracker.verify_component_authenticity(component_id, full_chain=True)["authentic"]
+
+def test_lru_eviction_and_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("ledger_cache.time.monotonic", lambda: now[0])
+    cache = VerificationCache(max_entries=2, ttl_seconds=5)
+    for name in ("A", "B", "C"):
+        cache.put(name, 1, {"id": name})
+    assert cache.get("A", 1) is None and cache.get("C", 1) == {"id": "C"}
+    assert cache.get("C", 2) is None  # the chain grew
+    now[0] += 6
+    assert cache.get("B", 1) is None
+    assert cache.stats()["evictions"] == 1
+
+    disabled = VerificationCache(max_entries=0)
+    disabled.put("A", 1, {})
+    assert disabled.get("A", 1) is None
@@ -0,0 +1,40 @@
+import pytest
+
+from ledger_models import CustodyEvent
+from supply_chain_tracker import SupplyChainTracker
+
+@pytest.fixture
+def tracker():
+    tracker = SupplyChainTracker()
+    yield tracker
+    tracker.close()
+
+def tamper(tracker, component_id):
+    chain = tracker.components_db[component_id].custody_chain
+    chain[-1] = CustodyEvent.from_dict(dict(chain[-1], handler="FORGED"))
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_verify_many_matches_single_checks(tracker, workers):
+    component_ids = list(tracker.components_db.keys())
+    tamper(tracker, component_ids[1])
+    results = tracker.verify_many(component_ids + ["NOPE"], workers=workers, chunk_size=2)
+
+    assert [result.component_id for result in results] == component_ids + ["NOPE"]
+    for result in results[:-1]:
+        single = tracker.verify_component_authenticity(result.component_id, full_chain=True)
+        assert (result.found, result.authentic, result.chain_valid) == (True, single["authentic"],
+                                                                      single["chain_integrity"])
+    assert not results[1].authentic and not results[1].chain_valid
+    assert not results[-1].found and not results[-1].authentic
+
+def test_tampered_shipment_fails_its_members(tracker):
+    component_ids = list(tracker.components_db.keys())
+    tracker.create_shipment("PAL-1", component_ids[:2], "H", "Dock")
+    tracker.add_shipment_event("PAL-1", {"stage": "DISTRIBUTION", "handler": "H", "location": "L", "action": "A"})
+    chain = tracker.shipments.get("PAL-1").custody_chain
+    chain[-1] = CustodyEvent.from_dict(dict(chain[-1], location="ELSEWHERE"))
+
+    results = list(tracker.verify_many(component_ids, workers=1, as_iterator=True))
+    assert [result.shipments_valid for result in results] == [False, False] + [True] * (len(component_ids) - 2)
+    assert [result.authentic for result in results[:2]] == [False, False]
+    assert all(result.authentic for result in results[2:])
@@ -0,0 +1,70 @@
+from dataclasses import replace
+
+import pytest
+
+from ledger_models import CustodyEvent, verify_chain_segment
+from ledger_wire import (
+    WIRE_HEADER, WIRE_MAGIC, decode_component, decode_events, encode_component, encode_events
+)
+from supply_chain_tracker import SupplyChainTracker
+
+# Every fallback: a stage outside STAGES, a non-ISO timestamp, non-hex and
+# uppercase-hex digests and a hash-based signature
+ODD_EVENT = CustodyEvent.from_dict({
+    "stage": "CUSTOMS_HOLD", "handler": "Customs ✓", "timestamp": "yesterday", "location": "Port|Gate 4",
+    "action": "HELD", "verified_by": "", "signature": "not-hex", "attestation": "AB" * 64,
+    "pq_signature": "ab" * 40
+})
+
+@pytest.fixture
+def tracker():
+    tracker = SupplyChainTracker()
+    yield tracker
+    tracker.close()
+
+def test_components_round_trip_and_still_verify(tracker):
+    for component_id in tracker.components_db.keys():
+        entry = tracker.components_db[component_id]
+        decoded = decode_component(encode_component(entry))
+        assert decoded.to_entry() == entry
+        assert decoded.custody_chain[-1]["signature"] == entry.custody_chain[-1]["signature"]
+        assert verify_chain_segment(decoded.verification_hash, decoded.component_id, decoded.custody_chain)
+
+def test_fallback_fields_round_trip(tracker):
+    entry = tracker.components_db[next(iter(tracker.components_db.keys()))]
+    odd = replace(entry, verification_hash="short", digital_signature="", indigenous_certification=False,
+                  custody_chain=list(entry.custody_chain) + [ODD_EVENT])
+    assert decode_component(encode_component(odd)).to_entry() == odd
+
+    chain = decode_events(encode_events([ODD_EVENT, entry.custody_chain[0]]))
+    assert len(chain) == 2
+    assert dict(chain[0]) == dict(ODD_EVENT) and dict(chain[-1]) == dict(entry.custody_chain[0])
+    assert chain[0].epoch is None and chain[1].epoch == entry.custody_chain[0].epoch
+
+def test_tampered_event_bytes_fail_chain_verification(tracker):
+    entry = tracker.components_db[next(iter(tracker.components_db.keys()))]
+    data = bytearray(encode_component(entry))
+    location = entry.custody_chain[-1]["location"].encode()
+    position = data.rfind(location)
+    data[position] ^= 0x01
+    decoded = decode_component(bytes(data))
+    assert decoded.custody_chain[-1]["location"] != entry.custody_chain[-1]["location"]
+    assert not verify_chain_segment(decoded.verification_hash, decoded.component_id, decoded.custody_chain)
+
+@pytest.mark.parametrize("damage", ["truncate", "magic", "version", "kind"])
+def test_damaged_messages_are_rejected(tracker, damage):
+    entry = tracker.components_db[next(iter(tracker.components_db.keys()))]
+    data = bytearray(encode_component(entry))
+    magic, version, kind, count, table_offset = WIRE_HEADER.unpack_from(data)
+    if damage == "truncate":
+        data = data[:-1]
+    elif damage == "magic":
+        data[:4] = b"XXXX"
+    elif damage == "version":
+        WIRE_HEADER.pack_into(data, 0, WIRE_MAGIC, version + 1, kind, count, table_offset)
+    else:
+        with pytest.raises(ValueError):
+            decode_events(bytes(data))
+        return
+    with pytest.raises(ValueError):
+        decode_component(bytes(data))
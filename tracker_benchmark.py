@@ -0,0 +1,521 @@
+#!/usr/bin/env python3
+"""
+Supply Chain Tracker Benchmarks
+Indigenous Hardware Verification System
+
+Synthesizes N components with M custody events each and times the tracker
+hot paths: register_component, add_custody_event (per call and through
+add_custody_events_bulk), verify_component_authenticity (cold full-chain
+checks and cached repeats, timed separately) and get_supply_chain_report.
+Each operation reports ops/sec, p50/p99 latency and how much the resident
+set grew while it ran; with --trace-memory it also reports the peak of
+Python allocations above the operation's starting level (tracemalloc slows
+every allocation, so compare throughput only between runs with the same
+setting). Results are written as JSON so two runs can be compared with
+--compare.
+
+    python tracker_benchmark.py --components 1000,100000 --events 4 --output bench.json
+    python tracker_benchmark.py --components 100000 --compare bench.json
+    python tracker_benchmark.py --components 100000 --trace-memory
+    python tracker_benchmark.py --stress --threads 16 --components 1000 --events 50
+    python tracker_benchmark.py --signatures --verify-calls 2000
+    python tracker_benchmark.py --wire --components 1000 --events 20
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from typing import Dict, List, Optional
+
+from supply_chain_tracker import SupplyChainTracker
+from ledger_storage import AppendOnlyLogStorage
+from ledger_models import event_signing_message
+from ledger_signing import BACKEND, ed25519_public_key, ed25519_sign, ed25519_verify, ed25519_verify_batch
+from ledger_hashsig import HashSigner, signature_size, verify_hash_signature
+from ledger_wire import encode_component, decode_component
+
+RESULT_SCHEMA = 2
+BULK_CHUNK = 1000
+
+STAGES = ["QUALITY_CONTROL", "DISTRIBUTION", "INSTALLATION", "OPERATIONAL"]
+LOCATIONS = [
+    "BPRD Testing Facility - New Delhi",
+    "Central Warehouse - New Delhi",
+    "Delhi Police HQ - Sector 1",
+    "Mumbai Control Center - Bandra East",
+    "Chennai Station - T.Nagar",
+    "Bangalore Tech Center - Electronic City"
+]
+CLEARANCES = ["TOP_SECRET", "SECRET", "CONFIDENTIAL"]
+
+class LatencySample:
+    """Reservoir of per-call latencies, so 1e7-call phases keep bounded memory"""
+
+    def __init__(self, capacity: int, rng: random.Random):
+        self.capacity = capacity
+        self.rng = rng
+        self.samples: List[int] = []
+        self.count = 0
+
+    def add(self, nanoseconds: int):
+        self.count += 1
+        if len(self.samples) < self.capacity:
+            self.samples.append(nanoseconds)
+        else:
+            slot = self.rng.randrange(self.count)
+            if slot < self.capacity:
+                self.samples[slot] = nanoseconds
+
+    def percentile(self, fraction: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] / 1000
+
+def current_rss_kb() -> Optional[int]:
+    """Current resident set size in KiB (None where /proc is unavailable)
+
+    Not ``ru_maxrss``: that is the process's lifetime high-water mark, so
+    every operation after the largest one would report the same figure.
+    """
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE") // 1024
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)), check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def synthetic_component(index: int, manufacturers: List[str], rng: random.Random) -> Dict:
+    return {
+        "component_id": f"BENCH-{index:09d}",
+        "component_name": f"Benchmark Component {index}",
+        "manufacturer": rng.choice(manufacturers),
+        "manufacturing_date": "2024-09-01",
+        "batch_id": f"BATCH_BENCH_{index // 1000:06d}",
+        "indigenous_certification": True,
+        "security_clearance": rng.choice(CLEARANCES)
+    }
+
+def synthetic_event(sequence: int, rng: random.Random) -> Dict:
+    return {
+        "stage": STAGES[sequence % len(STAGES)],
+        "handler": "BPRD_LOGISTICS_DIVISION",
+        "location": rng.choice(LOCATIONS),
+        "action": "BENCHMARK_EVENT",
+        "verified_by": "SYSTEM_AUTOMATED"
+    }
+
+def time_operation(calls, latency_capacity: int, rng: random.Random) -> Dict:
+    """Run zero-argument callables back to back, timing each one
+
+    ``rss_growth_kb`` is the resident set after the operation minus before
+    it (freed memory the allocator keeps still counts). ``traced_peak_kb``
+    is the highest Python allocation level reached during the operation
+    above its starting level, when tracemalloc is tracing (else None).
+    """
+    sample = LatencySample(latency_capacity, rng)
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.reset_peak()
+        traced_start = tracemalloc.get_traced_memory()[0]
+    rss_start = current_rss_kb()
+    started = time.perf_counter()
+    for call in calls:
+        t0 = time.perf_counter_ns()
+        call()
+        sample.add(time.perf_counter_ns() - t0)
+    elapsed = time.perf_counter() - started
+    rss_end = current_rss_kb()
+    traced_peak_kb = (tracemalloc.get_traced_memory()[1] - traced_start) // 1024 if tracing else None
+    return {
+        "ops": sample.count,
+        "seconds": round(elapsed, 4),
+        "ops_per_sec": round(sample.count / elapsed, 1) if elapsed > 0 else 0.0,
+        "p50_us": round(sample.percentile(0.50), 2),
+        "p99_us": round(sample.percentile(0.99), 2),
+        "rss_growth_kb": rss_end - rss_start if rss_start is not None and rss_end is not None else None,
+        "traced_peak_kb": traced_peak_kb
+    }
+
+def run_scenario(components: int, events: int, storage: str, verify_calls: int,
+                 report_calls: int, latency_capacity: int, seed: int, trace_memory: bool = False) -> Dict:
+    rng = random.Random(seed)
+    if trace_memory:
+        tracemalloc.start()
+    workdir = None
+    if storage == "log":
+        workdir = tempfile.TemporaryDirectory(prefix="tracker_bench_")
+        tracker = SupplyChainTracker(AppendOnlyLogStorage(workdir.name), load_samples=False)
+    else:
+        tracker = SupplyChainTracker(load_samples=False)
+
+    manufacturers = sorted(tracker.manufacturers_db)
+    ids = [f"BENCH-{i:09d}" for i in range(components)]
+    operations = {}
+    try:
+        operations["register_component"] = time_operation(
+            (lambda i=i: tracker.register_component(synthetic_component(i, manufacturers, rng))
+             for i in range(components)),
+            latency_capacity, rng
+        )
+        operations["add_custody_event"] = time_operation(
+            (lambda cid=cid, seq=seq: tracker.add_custody_event(cid, synthetic_event(seq, rng))
+             for seq in range(events) for cid in ids),
+            latency_capacity, rng
+        )
+        # Same event volume again through the bulk API, 1,000 pairs per call, each
+        # component's M events together as in simulate_deployment_tracking
+        pairs = [(cid, synthetic_event(seq, rng)) for cid in ids for seq in range(events)]
+        operations["add_custody_events_bulk_x1000"] = time_operation(
+            (lambda chunk=pairs[i:i + BULK_CHUNK]: tracker.add_custody_events_bulk(chunk)
+             for i in range(0, len(pairs), BULK_CHUNK)),
+            latency_capacity, rng
+        )
+        del pairs
+        # Cold checks re-hash every event and re-check every signature (full_chain
+        # bypasses the verification cache and the chain watermarks)
+        operations["verify_component_cold"] = time_operation(
+            (lambda: tracker.verify_component_authenticity(rng.choice(ids), full_chain=True)
+             for _ in range(verify_calls)),
+            latency_capacity, rng
+        )
+        # Repeat checks of components whose results fit in the cache, warmed beforehand
+        hot_ids = ids[:tracker.verification_cache.max_entries] or ids
+        for cid in hot_ids:
+            tracker.verify_component_authenticity(cid)
+        hits, misses = tracker.verification_cache.hits, tracker.verification_cache.misses
+        operations["verify_component_cached"] = time_operation(
+            (lambda: tracker.verify_component_authenticity(rng.choice(hot_ids)) for _ in range(verify_calls)),
+            latency_capacity, rng
+        )
+        lookups = tracker.verification_cache.hits + tracker.verification_cache.misses - hits - misses
+        operations["verify_component_cached"]["cache_hit_rate"] = round(
+            (tracker.verification_cache.hits - hits) / lookups, 4
+        ) if lookups else 0.0
+        # Counterfeit/unregistered scans, answered from the id filter
+        operations["verify_unknown_component"] = time_operation(
+            (lambda i=i: tracker.verify_component_authenticity(f"UNKNOWN-{i:09d}") for i in range(verify_calls)),
+            latency_capacity, rng
+        )
+        operations["get_supply_chain_report"] = time_operation(
+            (tracker.get_supply_chain_report for _ in range(report_calls)),
+            latency_capacity, rng
+        )
+    finally:
+        tracker.close()
+        if workdir is not None:
+            workdir.cleanup()
+        if trace_memory:
+            tracemalloc.stop()
+
+    return {
+        "components": components,
+        "events_per_component": events,
+        "storage": storage,
+        "trace_memory": trace_memory,
+        "operations": operations
+    }
+
+def run_signature_benchmark(calls: int, latency_capacity: int, seed: int) -> Dict:
+    """Time Ed25519 (single and batch verify) against the stateful hash-based scheme on event digests"""
+    rng = random.Random(seed)
+    messages = [event_signing_message(f"{rng.getrandbits(256):064x}") for _ in range(calls)]
+    ed_seed = bytes(rng.getrandbits(8) for _ in range(32))
+    ed_public = ed25519_public_key(ed_seed)
+    ed_signatures = []
+    operations = {
+        "ed25519_sign": time_operation(
+            (lambda m=m: ed_signatures.append(ed25519_sign(ed_seed, m)) for m in messages), latency_capacity, rng
+        )
+    }
+    ed_items = list(zip([ed_public] * calls, messages, ed_signatures))
+    operations["ed25519_verify"] = time_operation(
+        (lambda item=item: ed25519_verify(*item) for item in ed_items), latency_capacity, rng
+    )
+    batches = [ed_items[i:i + 64] for i in range(0, calls, 64)]
+    operations["ed25519_verify_batch64"] = time_operation(
+        (lambda batch=batch: ed25519_verify_batch(batch) for batch in batches), latency_capacity, rng
+    )
+
+    signer = HashSigner.generate()
+    try:
+        hash_public = signer.public_key
+        hash_signatures = []
+        operations["hashsig_sign"] = time_operation(
+            (lambda m=m: hash_signatures.append(signer.sign(m)) for m in messages), latency_capacity, rng
+        )
+        operations["hashsig_verify"] = time_operation(
+            (lambda m=m, sig=sig: verify_hash_signature(hash_public, m, sig)
+             for m, sig in zip(messages, hash_signatures)),
+            latency_capacity, rng
+        )
+    finally:
+        signer.close()
+    return {
+        "backend": BACKEND,
+        "calls": calls,
+        "signature_bytes": {"ed25519": 64, "hashsig": signature_size(8, 8)},
+        "operations": operations
+    }
+
+def _component_json(component) -> bytes:
+    """JSON body for a component and its chain, as the HTTP service builds it"""
+    record = {name: getattr(component, name) for name in (
+        "component_id", "component_name", "manufacturer", "manufacturing_date", "batch_id",
+        "verification_hash", "digital_signature", "indigenous_certification", "security_clearance"
+    )}
+    record["custody_chain"] = [dict(event) for event in component.custody_chain]
+    return json.dumps(record, separators=(",", ":")).encode()
+
+def run_wire_benchmark(components: int, events: int, latency_capacity: int, seed: int) -> Dict:
+    """Time JSON against the ledger_wire binary format for encoding and decoding component records"""
+    tracker = SupplyChainTracker(load_samples=False)
+    rng = random.Random(seed)
+    manufacturers = sorted(tracker.manufacturers_db)
+    ids = [tracker.register_component(synthetic_component(i, manufacturers, rng)).component_id
+           for i in range(components)]
+    tracker.add_custody_events_bulk(
+        [(component_id, synthetic_event(sequence, rng)) for component_id in ids for sequence in range(events)]
+    )
+    entries = [tracker.components_db[component_id] for component_id in ids]
+
+    json_bodies, wire_bodies = [], []
+    operations = {
+        "json_encode": time_operation(
+            (lambda e=e: json_bodies.append(_component_json(e)) for e in entries), latency_capacity, rng
+        ),
+        "wire_encode": time_operation(
+            (lambda e=e: wire_bodies.append(encode_component(e)) for e in entries), latency_capacity, rng
+        ),
+        "json_decode": time_operation(
+            (lambda body=body: json.loads(body) for body in json_bodies), latency_capacity, rng
+        ),
+        # Views decode nothing up front: open the message and read the chain tail's signature
+        "wire_decode_view": time_operation(
+            (lambda body=body: decode_component(body).custody_chain[-1].signature for body in wire_bodies),
+            latency_capacity, rng
+        ),
+        "wire_decode_full": time_operation(
+            (lambda body=body: decode_component(body).to_entry() for body in wire_bodies), latency_capacity, rng
+        )
+    }
+    tracker.close()
+    return {
+        "components": components,
+        "events_per_component": len(entries[0].custody_chain) if entries else 0,
+        "bytes": {"json": sum(map(len, json_bodies)), "wire": sum(map(len, wire_bodies))},
+        "operations": operations
+    }
+
+def stress_concurrent_writers(threads: int, components: int, events: int, storage: str, seed: int) -> Dict:
+    """Hammer a concurrent-mode tracker with parallel add_custody_event calls and check nothing was lost
+
+    Every thread posts ``events`` events to every component (in its own
+    shuffled order), so threads collide on the same components as well as
+    running side by side on different ones. Afterwards each chain must hold
+    exactly its genesis event plus threads * events events and re-verify
+    from genesis.
+    """
+    workdir = None
+    if storage == "log":
+        workdir = tempfile.TemporaryDirectory(prefix="tracker_stress_")
+        tracker = SupplyChainTracker(AppendOnlyLogStorage(workdir.name), load_samples=False, concurrent=True)
+    else:
+        tracker = SupplyChainTracker(load_samples=False, concurrent=True)
+
+    rng = random.Random(seed)
+    manufacturers = sorted(tracker.manufacturers_db)
+    ids = [tracker.register_component(synthetic_component(i, manufacturers, rng)).component_id
+           for i in range(components)]
+    failures = []
+    start = threading.Barrier(threads)
+
+    def writer(worker: int):
+        order = list(ids)
+        random.Random(seed + worker).shuffle(order)
+        start.wait()
+        for seq in range(events):
+            for component_id in order:
+                event = synthetic_event(seq, rng)
+                event["handler"] = f"STRESS_WORKER_{worker}"
+                if not tracker.add_custody_event(component_id, event):
+                    failures.append(component_id)
+
+    pool = [threading.Thread(target=writer, args=(worker,)) for worker in range(threads)]
+    started = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    expected = 1 + threads * events
+    lost = sum(max(0, expected - len(tracker.components_db[cid].custody_chain)) for cid in ids)
+    broken = [cid for cid in ids if not tracker.verify_component_authenticity(cid, full_chain=True)["authentic"]]
+    indexed = len(tracker.event_times)
+    report = tracker.get_supply_chain_report()["summary"]
+    tracker.close()
+    if workdir is not None:
+        workdir.cleanup()
+
+    total_events = threads * events * components
+    return {
+        "threads": threads,
+        "components": components,
+        "events": total_events,
+        "seconds": round(elapsed, 4),
+        "events_per_sec": round(total_events / elapsed, 1) if elapsed > 0 else 0.0,
+        "lost_events": lost,
+        "rejected_events": len(failures),
+        "broken_chains": len(broken),
+        "time_index_consistent": indexed == components * expected,
+        "verified_components": report["verified_components"],
+        "ok": (not lost and not failures and not broken and indexed == components * expected
+               and report["verified_components"] == components)
+    }
+
+def compare_results(current: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Describe operations whose throughput fell more than ``tolerance`` below the baseline"""
+    baseline_runs = {
+        (run["components"], run["events_per_component"], run["storage"]): run
+        for run in baseline.get("results", [])
+    }
+    regressions = []
+    for run in current["results"]:
+        key = (run["components"], run["events_per_component"], run["storage"])
+        previous = baseline_runs.get(key)
+        if previous is None:
+            continue
+        for name, stats in run["operations"].items():
+            before = previous["operations"].get(name, {}).get("ops_per_sec")
+            if not before:
+                continue
+            ratio = stats["ops_per_sec"] / before
+            line = f"{name} N={key[0]} M={key[1]} {key[2]}: {before:,.0f} -> {stats['ops_per_sec']:,.0f} ops/s ({ratio:.2f}x)"
+            print(f"   {line}")
+            if ratio < 1 - tolerance:
+                regressions.append(line)
+    return regressions
+
+def parse_sizes(text: str) -> List[int]:
+    return [int(float(size)) for size in text.split(",") if size.strip()]
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark SupplyChainTracker hot paths")
+    parser.add_argument("--components", default="1000,10000",
+                        help="comma-separated component counts, e.g. 1e3,1e5,1e7")
+    parser.add_argument("--events", type=int, default=4, help="custody events per component")
+    parser.add_argument("--storage", choices=["memory", "log"], default="memory")
+    parser.add_argument("--verify-calls", type=int, default=10000)
+    parser.add_argument("--report-calls", type=int, default=1000)
+    parser.add_argument("--latency-samples", type=int, default=100000,
+                        help="latency reservoir size per operation")
+    parser.add_argument("--seed", type=int, default=1337)
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--compare", help="baseline results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="allowed ops/sec drop before --compare fails")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="also report each operation's peak Python allocations (slows the run)")
+    parser.add_argument("--stress", action="store_true",
+                        help="run the concurrent-writer stress check instead of the benchmarks")
+    parser.add_argument("--threads", type=int, default=8, help="writer threads for --stress")
+    parser.add_argument("--signatures", action="store_true",
+                        help="compare Ed25519 and hash-based signature costs (--verify-calls messages)")
+    parser.add_argument("--wire", action="store_true",
+                        help="compare JSON and the binary wire format on component records")
+    args = parser.parse_args(argv)
+
+    if args.wire:
+        for components in parse_sizes(args.components):
+            run = run_wire_benchmark(components, args.events, args.latency_samples, args.seed)
+            sizes = run["bytes"]
+            print(f"📡 {components:,} components x {run['events_per_component']} events: "
+                  f"JSON {sizes['json']:,} bytes, wire {sizes['wire']:,} bytes "
+                  f"({sizes['wire'] / max(sizes['json'], 1):.0%})")
+            for name, stats in run["operations"].items():
+                print(f"   {name:32s} {stats['ops_per_sec']:>12,.0f} ops/s  "
+                      f"p50 {stats['p50_us']:>9.1f}µs  p99 {stats['p99_us']:>9.1f}µs")
+        return 0
+
+    if args.signatures:
+        run = run_signature_benchmark(args.verify_calls, args.latency_samples, args.seed)
+        print(f"🔏 {run['calls']:,} event signatures (Ed25519 backend: {run['backend']}, "
+              f"{run['signature_bytes']['ed25519']} vs {run['signature_bytes']['hashsig']:,} bytes)")
+        for name, stats in run["operations"].items():
+            print(f"   {name:32s} {stats['ops_per_sec']:>12,.0f} ops/s  "
+                  f"p50 {stats['p50_us']:>9.1f}µs  p99 {stats['p99_us']:>9.1f}µs")
+        return 0
+
+    if args.stress:
+        for components in parse_sizes(args.components):
+            print(f"🧵 Stress: {args.threads} threads x {args.events} events x {components:,} components ({args.storage})")
+            outcome = stress_concurrent_writers(args.threads, components, args.events, args.storage, args.seed)
+            print(f"   {outcome['events']:,} events in {outcome['seconds']}s "
+                  f"({outcome['events_per_sec']:,.0f}/s), lost {outcome['lost_events']}, "
+                  f"broken chains {outcome['broken_chains']}")
+            if not outcome["ok"]:
+                print(f"❌ Concurrency check failed: {outcome}")
+                return 1
+        print("✅ No lost events under parallel load")
+        return 0
+
+    results = {
+        "schema": RESULT_SCHEMA,
+        "generated_at": datetime.datetime.now().isoformat(),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": []
+    }
+
+    for components in parse_sizes(args.components):
+        print(f"📦 N={components:,} components, M={args.events} events each ({args.storage})")
+        run = run_scenario(components, args.events, args.storage, args.verify_calls,
+                           args.report_calls, args.latency_samples, args.seed, args.trace_memory)
+        for name, stats in run["operations"].items():
+            print(f"   {name:32s} {stats['ops_per_sec']:>12,.0f} ops/s  "
+                  f"p50 {stats['p50_us']:>9.1f}µs  p99 {stats['p99_us']:>9.1f}µs  "
+                  f"RSS {stats['rss_growth_kb'] or 0:+,} KiB"
+                  + (f"  alloc peak {stats['traced_peak_kb']:,} KiB" if stats["traced_peak_kb"] is not None else "")
+                  + (f"  cache hits {stats['cache_hit_rate']:.1%}" if "cache_hit_rate" in stats else ""))
+        results["results"].append(run)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"📈 Comparing against {args.compare}:")
+        regressions = compare_results(results, baseline, args.tolerance)
+        if regressions:
+            print("❌ Regressions beyond tolerance:")
+            for line in regressions:
+                print(f"   • {line}")
+            return 1
+        print("✅ No regressions beyond tolerance")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Supply Chain Tracker HTTP Service
+Indigenous Hardware Verification System
+
+Asyncio HTTP/1.1 JSON front end for SupplyChainTracker, for warehouse
+scanners posting custody events. Connections are kept alive and pipelined
+requests are answered in order; tracker calls (SHA-256 hashing, storage
+I/O) run on a thread pool against a concurrent-mode tracker so the event
+loop never blocks on them.
+
+    POST /components                      register_component (409 if the id is already registered)
+    POST /components/{id}/events          add_custody_event
+    GET  /components/{id}/events          get_custody_page (?limit=50&cursor=N&order=newest|oldest&stage=S)
+    GET  /components/{id}                 component tracking (entry + verification + chain); with
+                                          "Accept: application/x-ledger-wire" the entry and its own
+                                          chain in the ledger_wire binary format instead
+    GET  /components/{id}/verify          verify_component_authenticity
+    POST /shipments                       create_shipment ({"shipment_id", "component_ids", "handler", "location"};
+                                          409 if the id exists)
+    POST /shipments/{id}/events           add_shipment_event (inherited by every member)
+    GET  /shipments/{id}                  shipment manifest, status and chain
+    GET  /batches/{batch_id}/units        recall_batch (top-level units containing the batch)
+    GET  /report                          get_supply_chain_report
+    GET  /health
+
+Writes answer 503 once the tracker's hash-based signing key is exhausted.
+"""
+
+import argparse
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from supply_chain_tracker import SupplyChainTracker, DuplicateIdError
+from ledger_storage import AppendOnlyLogStorage
+from ledger_hashsig import KeyExhaustedError
+from ledger_wire import WIRE_CONTENT_TYPE
+
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 1024 * 1024
+MAX_PAGE_EVENTS = 1000
+
+# Body fields each POST requires; a missing one is a 400 naming it
+COMPONENT_FIELDS = ("component_id", "component_name", "manufacturer", "manufacturing_date",
+                    "batch_id", "indigenous_certification", "security_clearance")
+EVENT_FIELDS = ("stage", "handler", "location", "action")
+SHIPMENT_FIELDS = ("shipment_id", "component_ids", "handler", "location")
+
+class HTTPError(Exception):
+    def __init__(self, status: HTTPStatus, message: str = ""):
+        super().__init__(message or status.phrase)
+        self.status = status
+
+class TrackerService:
+    """Serve a SupplyChainTracker over keep-alive HTTP/1.1 with JSON bodies"""
+
+    def __init__(self, tracker: SupplyChainTracker, host: str = "127.0.0.1", port: int = 8080,
+                 workers: int = 8, idle_timeout: float = 30.0):
+        if not tracker.concurrent:
+            raise ValueError("TrackerService needs a tracker created with concurrent=True")
+        self.tracker = tracker
+        self.host = host
+        self.port = port
+        self.idle_timeout = idle_timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tracker")
+        self._server: Optional[asyncio.AbstractServer] = None
+        # Open connections: writer -> future resolved when its handler exits
+        self._connections: Dict[asyncio.StreamWriter, asyncio.Future] = {}
+
+    async def start(self):
+        self._server = await asyncio.start_server(
+            self._handle_connection, self.host, self.port, limit=MAX_HEADER_BYTES
+        )
+        # Report the real port when 0 asked the OS to pick one
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            # Closing the transports wakes idle keep-alive handlers with EOF
+            for writer in list(self._connections):
+                writer.transport.close()
+            await asyncio.gather(*self._connections.values(), return_exceptions=True)
+            await self._server.wait_closed()
+        self._executor.shutdown(wait=True)
+
+    # ------------------------------------------------------------------
+    # Connection handling
+    # ------------------------------------------------------------------
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        finished = self._connections[writer] = asyncio.get_running_loop().create_future()
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(self._read_request(reader), self.idle_timeout)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except HTTPError as exc:
+                    self._write_response(writer, exc.status, {"error": str(exc)}, keep_alive=False)
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+
+                method, path, headers, body, keep_alive = request
+                status, payload = await self._dispatch(method, path, headers, body)
+                self._write_response(writer, status, payload, keep_alive)
+                # Pipelined requests already buffered in the reader are answered
+                # before we block on the socket; drain only applies backpressure
+                await writer.drain()
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+            del self._connections[writer]
+            finished.set_result(None)
+
+    async def _read_request(self, reader: asyncio.StreamReader):
+        """Parse one request; None on a clean EOF between requests"""
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError as exc:
+            if not exc.partial:
+                return None
+            raise
+        except asyncio.LimitOverrunError:
+            raise HTTPError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE)
+
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, version = lines[0].split(" ", 2)
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Malformed request line")
+
+        headers = {}
+        for line in lines[1:]:
+            if not line:
+                continue
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get("content-length", "0"))
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+        if length < 0:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+        if length > MAX_BODY_BYTES:
+            raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+        body = await reader.readexactly(length) if length else b""
+
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+        return method.upper(), target, headers, body, keep_alive
+
+    def _write_response(self, writer: asyncio.StreamWriter, status: HTTPStatus, payload, keep_alive: bool):
+        # bytes payloads are already encoded in the binary wire format
+        if isinstance(payload, bytes):
+            body, content_type = payload, WIRE_CONTENT_TYPE
+        else:
+            body, content_type = json.dumps(payload, separators=(",", ":")).encode(), "application/json"
+        head = (
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+
+    # ------------------------------------------------------------------
+    # Routing
+    # ------------------------------------------------------------------
+
+    async def _dispatch(self, method: str, target: str, headers: Dict[str, str], body: bytes) -> Tuple[HTTPStatus, object]:
+        url = urlsplit(target)
+        parts = [unquote(part) for part in url.path.strip("/").split("/")]
+        try:
+            return await self._route(method, parts, parse_qs(url.query), headers, body)
+        except HTTPError as exc:
+            return exc.status, {"error": str(exc)}
+        except DuplicateIdError as exc:
+            return HTTPStatus.CONFLICT, {"error": str(exc)}
+        except KeyExhaustedError as exc:
+            # The server cannot sign anything until it is given a new key
+            return HTTPStatus.SERVICE_UNAVAILABLE, {"error": str(exc)}
+        except ValueError as exc:
+            return HTTPStatus.BAD_REQUEST, {"error": str(exc)}
+        except Exception as exc:  # keep the connection serving other requests
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"{type(exc).__name__}: {exc}"}
+
+    async def _route(self, method: str, parts, query: Dict[str, List[str]], headers: Dict[str, str],
+                     body: bytes) -> Tuple[HTTPStatus, object]:
+        if parts == ["health"]:
+            self._allow(method, "GET")
+            return HTTPStatus.OK, {"status": "OK", "components": len(self.tracker.components_db)}
+
+        if parts == ["report"]:
+            self._allow(method, "GET")
+            return HTTPStatus.OK, await self._offload(self.tracker.get_supply_chain_report)
+
+        if parts == ["components"]:
+            self._allow(method, "POST")
+            entry = await self._offload(
+                self.tracker.register_component, self._json_body(body, COMPONENT_FIELDS), False
+            )
+            return HTTPStatus.CREATED, {
+                "component_id": entry.component_id,
+                "verification_hash": entry.verification_hash,
+                "digital_signature": entry.digital_signature
+            }
+
+        if len(parts) == 2 and parts[0] == "components":
+            self._allow(method, "GET")
+            if WIRE_CONTENT_TYPE in headers.get("accept", ""):
+                encoded = await self._offload(self.tracker.get_component_wire, parts[1])
+                if encoded is None:
+                    raise HTTPError(HTTPStatus.NOT_FOUND, f"Component {parts[1]} not found")
+                return HTTPStatus.OK, encoded
+            tracking = await self._offload(self.tracker.get_component_tracking, parts[1])
+            if tracking is None:
+                raise HTTPError(HTTPStatus.NOT_FOUND, f"Component {parts[1]} not found")
+            return HTTPStatus.OK, tracking
+
+        if len(parts) == 3 and parts[0] == "components" and parts[2] == "verify":
+            self._allow(method, "GET")
+            verification = await self._offload(self.tracker.verify_component_authenticity, parts[1])
+            status = (HTTPStatus.NOT_FOUND if verification["verification_status"] == "COMPONENT_NOT_FOUND"
+                      else HTTPStatus.OK)
+            return status, verification
+
+        if parts == ["shipments"]:
+            self._allow(method, "POST")
+            data = self._json_body(body, SHIPMENT_FIELDS)
+            summary = await self._offload(
+                self.tracker.create_shipment, data["shipment_id"], data["component_ids"],
+                data["handler"], data["location"]
+            )
+            return HTTPStatus.CREATED, summary
+
+        if len(parts) == 2 and parts[0] == "shipments":
+            self._allow(method, "GET")
+            shipment = await self._offload(self.tracker.get_shipment, parts[1])
+            if shipment is None:
+                raise HTTPError(HTTPStatus.NOT_FOUND, f"Shipment {parts[1]} not found")
+            return HTTPStatus.OK, shipment
+
+        if len(parts) == 3 and parts[0] == "shipments" and parts[2] == "events":
+            self._allow(method, "POST")
+            if not await self._offload(self.tracker.add_shipment_event, parts[1], self._json_body(body, EVENT_FIELDS)):
+                raise HTTPError(HTTPStatus.NOT_FOUND, f"Shipment {parts[1]} not found")
+            return HTTPStatus.CREATED, {"shipment_id": parts[1], "recorded": True}
+
+        if len(parts) == 3 and parts[0] == "batches" and parts[2] == "units":
+            self._allow(method, "GET")
+            units = await self._offload(self.tracker.recall_batch, parts[1])
+            return HTTPStatus.OK, {"batch_id": parts[1], "units": units}
+
+        if len(parts) == 3 and parts[0] == "components" and parts[2] == "events" and method == "GET":
+            order = query.get("order", ["newest"])[-1]
+            if order not in ("newest", "oldest"):
+                raise HTTPError(HTTPStatus.BAD_REQUEST, f"order must be newest or oldest, got {order}")
+            try:
+                limit = min(int(query.get("limit", ["50"])[-1]), MAX_PAGE_EVENTS)
+                cursor = int(query["cursor"][-1]) if "cursor" in query else None
+            except ValueError:
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "limit and cursor must be integers")
+            page = await self._offload(
+                self.tracker.get_custody_page, parts[1], limit, cursor, order == "newest", query.get("stage")
+            )
+            if page is None:
+                raise HTTPError(HTTPStatus.NOT_FOUND, f"Component {parts[1]} not found")
+            return HTTPStatus.OK, page
+
+        if len(parts) == 3 and parts[0] == "components" and parts[2] == "events":
+            self._allow(method, "POST")
+            if not await self._offload(self.tracker.add_custody_event, parts[1], self._json_body(body, EVENT_FIELDS)):
+                raise HTTPError(HTTPStatus.NOT_FOUND, f"Component {parts[1]} not found")
+            return HTTPStatus.CREATED, {"component_id": parts[1], "recorded": True}
+
+        raise HTTPError(HTTPStatus.NOT_FOUND, "No such endpoint")
+
+    @staticmethod
+    def _allow(method: str, expected: str):
+        if method != expected:
+            raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED)
+
+    @staticmethod
+    def _json_body(body: bytes, required: Tuple[str, ...] = ()) -> Dict:
+        try:
+            data = json.loads(body)
+        except (ValueError, UnicodeDecodeError):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Body must be JSON")
+        if not isinstance(data, dict):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Body must be a JSON object")
+        missing = [name for name in required if name not in data]
+        if missing:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"Missing field: {', '.join(missing)}")
+        return data
+
+    async def _offload(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the supply chain tracker over HTTP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=8, help="threads for tracker calls")
+    parser.add_argument("--ledger-dir", help="persist to an append-only ledger in this directory")
+    args = parser.parse_args(argv)
+
+    storage = AppendOnlyLogStorage(args.ledger_dir) if args.ledger_dir else None
+    tracker = SupplyChainTracker(storage, concurrent=True)
+    service = TrackerService(tracker, args.host, args.port, args.workers)
+
+    async def run():
+        await service.start()
+        print(f"🌐 Supply chain tracker service listening on http://{service.host}:{service.port}")
+        try:
+            await service.serve_forever()
+        finally:
+            await service.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        print("\n🛑 Service shutdown initiated...")
+    finally:
+        tracker.close()
+
+if __name__ == "__main__":
+    main()